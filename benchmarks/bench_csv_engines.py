@@ -0,0 +1,130 @@
+"""Compare the CSV engines of CSVSFTPStream on a generated OrderDetails.csv.
+
+Usage:
+    python -m benchmarks.bench_csv_engines --rows 200000
+
+The file is generated in memory from the order_details schema and served from a
+stub SFTP client, so only parsing and record building are measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from unittest.mock import MagicMock
+
+from tap_toast_sftp.client import SCHEMAS_DIR
+from tap_toast_sftp.streams.base import CSV_ENGINES, pa_csv
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+
+
+class StubSFTPClient:
+    """Serve one in-memory file for every path."""
+
+    def __init__(self, content: bytes):
+        """Initialize the client.
+
+        Args:
+            content: The file content to serve.
+        """
+        self.content = content
+
+    def get_cached_file_content(self, location_id: str, date_folder: str, file_path: str) -> bytes:
+        """Return the file content."""
+        return self.content
+
+    def iter_file_chunks(self, path: str, chunk_size: int = 1024 * 1024, timeout: float = 60):
+        """Yield the file content in chunks."""
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def release_file_content(self, *args, **kwargs) -> None:
+        """Do nothing, there is no cache to release."""
+
+
+def generate_order_details(rows: int, seed: int = 0) -> bytes:
+    """Generate an OrderDetails.csv with a column per schema property.
+
+    Args:
+        rows: The number of data rows.
+        seed: The random seed.
+
+    Returns:
+        The CSV file content.
+    """
+    schema = json.loads((SCHEMAS_DIR / "order_details.json").read_text())
+    properties = [name for name in schema["properties"] if name not in ("location_id", "date")]
+    header = [name.replace("_", " ").title() for name in properties]
+
+    rng = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for i in range(rows):
+        row = []
+        for name in properties:
+            if name == "order_id":
+                row.append(str(100000000 + i))
+            elif rng.random() < 0.2:
+                # Toast exports leave plenty of cells empty
+                row.append("")
+            elif schema["properties"][name].get("format") == "date-time":
+                row.append(f"5/14/25 {rng.randint(1, 12)}:{rng.randint(0, 59):02d} PM")
+            else:
+                row.append(f"{rng.random() * 100:.2f}")
+        writer.writerow(row)
+    return buffer.getvalue().encode("utf-8")
+
+
+def run(engine: str, content: bytes, streaming: bool, coerce: bool = False) -> tuple[int, float]:
+    """Parse the file once with an engine.
+
+    Args:
+        engine: The csv_engine setting.
+        content: The file content.
+        streaming: Whether to use the csv_streaming mode.
+        coerce: Whether to use the coerce_types mode.
+
+    Returns:
+        The number of records and the elapsed seconds.
+    """
+    tap = MagicMock()
+    tap.config = {
+        "locations": [{"id": "1"}],
+        "csv_engine": engine,
+        "csv_streaming": streaming,
+        "coerce_types": coerce,
+    }
+    stream = OrderDetailsStream(tap=tap, shared_sftp_client=StubSFTPClient(content))
+
+    started_at = time.perf_counter()
+    count = sum(1 for _ in stream.process_csv_file("1", "20250514"))
+    return count, time.perf_counter() - started_at
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Number of rows to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine, the best is reported")
+    parser.add_argument("--streaming", action="store_true", help="Use the csv_streaming mode")
+    parser.add_argument("--coerce", action="store_true", help="Use the coerce_types mode")
+    args = parser.parse_args()
+
+    content = generate_order_details(args.rows)
+    print(f"OrderDetails.csv: {args.rows} rows, {len(content) / (1024 * 1024):.1f} MB")
+
+    for engine in CSV_ENGINES:
+        if engine == "pyarrow" and pa_csv is None:
+            print(f"{engine:>8}: skipped, pyarrow is not installed")
+            continue
+        best = min(run(engine, content, args.streaming, args.coerce)[1] for _ in range(args.repeat))
+        print(f"{engine:>8}: {best:.2f} s ({args.rows / best:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
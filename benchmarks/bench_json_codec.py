@@ -0,0 +1,125 @@
+"""Compare JSON decoding and hash encoding on a MenuExportV2 file.
+
+Usage:
+    python -m benchmarks.bench_json_codec --file MenuExportV2_1.json
+    python -m benchmarks.bench_json_codec --items 20000
+
+Without --file, a menu export with the structure of a Toast MenuExportV2 file is
+generated in memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import time
+import typing as t
+from pathlib import Path
+
+from tap_toast_sftp import codec
+from tap_toast_sftp.streams.menu_streams import flatten_menus
+
+
+def generate_menu_export(items: int, seed: int = 0) -> bytes:
+    """Generate a MenuExportV2 document.
+
+    Args:
+        items: The number of menu items, spread over menus and groups.
+        seed: The random seed.
+
+    Returns:
+        The JSON file content.
+    """
+    rng = random.Random(seed)
+
+    def guid() -> str:
+        return "%08x-%04x-%04x-%04x-%012x" % tuple(rng.getrandbits(bits) for bits in (32, 16, 16, 16, 48))
+
+    def option_group() -> dict:
+        return {
+            "guid": guid(),
+            "name": rng.choice(["Toppings", "Sides", "Temperature", "Sauces"]),
+            "minSelections": 0,
+            "maxSelections": rng.randint(1, 5),
+            "items": [
+                {"guid": guid(), "name": f"Option {i}", "price": round(rng.random() * 3, 2), "optionGroups": []}
+                for i in range(rng.randint(2, 8))
+            ],
+        }
+
+    def item(i: int) -> dict:
+        return {
+            "guid": guid(),
+            "name": f"Item {i}",
+            "description": "Toasted brioche bun, aged cheddar, house pickles and crème fraîche",
+            "posName": f"ITEM{i}",
+            "sku": str(rng.randint(10000, 99999)),
+            "visibility": ["POS", "TOAST_ONLINE_ORDERING"],
+            "prices": [{"amount": round(rng.random() * 30, 2), "currency": "USD"}],
+            "optionGroups": [option_group() for _ in range(rng.randint(0, 3))],
+        }
+
+    menus = []
+    for m in range(max(1, items // 500)):
+        groups = [
+            {"guid": guid(), "name": f"Group {g}", "items": [item(m * 500 + g * 25 + i) for i in range(25)]}
+            for g in range(20)
+        ]
+        menus.append({"guid": guid(), "name": f"Menu {m}", "groups": groups})
+    document = {"restaurantGuid": guid(), "lastUpdated": "2025-05-14T05:54:00.000+0000", "menus": menus}
+    return json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+
+def best_of(repeat: int, func: t.Callable[[], t.Any]) -> float:
+    """Run a function several times.
+
+    Args:
+        repeat: The number of runs.
+        func: The function to time.
+
+    Returns:
+        The fastest run in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", type=Path, help="A MenuExport or MenuExportV2 file to decode")
+    parser.add_argument("--items", type=int, default=10000, help="Number of menu items to generate")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case, the best is reported")
+    args = parser.parse_args()
+
+    content = args.file.read_bytes() if args.file else generate_menu_export(args.items)
+    print(f"Menu export: {len(content) / (1024 * 1024):.1f} MB, decoding backend: {codec.JSON_BACKEND}")
+
+    baseline = best_of(args.repeat, lambda: json.loads(content.decode("utf-8")))
+    fast = best_of(args.repeat, lambda: codec.loads_json(content))
+    print(f"  decode  json.loads(str): {baseline:.3f} s")
+    print(f"  decode  loads_json(bytes): {fast:.3f} s ({baseline / fast:.1f}x)")
+
+    # Hash input of the menu rows, as generate_hash_id builds it
+    document = codec.loads_json(content)
+    menus = document if isinstance(document, list) else document["menus"]
+    rows = [row for entity_rows in flatten_menus(menus, "1", "20250514").values() for row in entity_rows]
+    hash_inputs = [{k: str(v) for k, v in sorted(row.items()) if v is not None and v != ""} for row in rows]
+
+    baseline = best_of(
+        args.repeat,
+        lambda: [hashlib.md5(json.dumps(h, sort_keys=True).encode("utf-8")).hexdigest() for h in hash_inputs],
+    )
+    fast = best_of(args.repeat, lambda: [hashlib.md5(codec.dumps_for_hash(h)).hexdigest() for h in hash_inputs])
+    print(f"  hash    json.dumps: {baseline:.3f} s for {len(hash_inputs)} rows")
+    print(f"  hash    dumps_for_hash: {fast:.3f} s ({baseline / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,681 @@
+"""SFTP client running asyncssh on a background event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import typing as t
+from concurrent.futures import CancelledError, Future
+from functools import partial
+
+import paramiko
+from singer_sdk.exceptions import ConfigValidationError, FatalAPIError, RetriableAPIError
+
+from tap_toast_sftp.client import SFTPClient
+
+# asyncssh is optional, install the "asyncio" extra to use the asyncio transport
+try:
+    import asyncssh
+except ImportError:  # pragma: no cover - depends on the environment
+    asyncssh = None
+
+
+class AsyncSFTPClient(SFTPClient):
+    """SFTP client for the asyncio transport.
+
+    Remote operations run as coroutines on an event loop owned by the client,
+    spread over a few SSH connections. Every operation keeps the blocking
+    interface of SFTPClient, so the streams call it from their threads as
+    before, while list_dirs and prefetch_files put hundreds of listings and
+    downloads in flight at once without a thread each. The listing and file
+    content caches are shared with the paramiko transport.
+    """
+
+    def __init__(self, config: dict) -> None:
+        """Initialize the asyncio SFTP client.
+
+        Args:
+            config: The tap configuration.
+
+        Raises:
+            ConfigValidationError: If asyncssh is not installed.
+        """
+        if asyncssh is None:
+            raise ConfigValidationError(
+                "The asyncio transport needs asyncssh, install tap-toast-sftp with the 'asyncio' extra"
+            )
+        super().__init__(config)
+        # Number of SSH connections the SFTP requests are spread over
+        self.connection_count = max(1, int(config.get("sftp_connections") or 2))
+        # Maximum number of listings, stats and downloads in flight at once
+        self.max_requests = max(1, int(config.get("sftp_max_requests") or 128))
+
+        self._loop: t.Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: t.Optional[threading.Thread] = None
+        # Open connections and their SFTP sessions, used round robin
+        # Structure: [(SSHClientConnection, SFTPClient)]
+        self._connections = []
+        self._next_connection = 0
+        # Created on the event loop once it runs
+        self._request_semaphore: t.Optional[asyncio.Semaphore] = None
+        self._reconnect_lock: t.Optional[asyncio.Lock] = None
+        # Downloads scheduled by prefetch_files, cancelled on disconnect
+        self._prefetch_tasks: set[asyncio.Task] = set()
+        # Futures of the scheduled downloads, failed on disconnect if still pending
+        # Structure: {(location_id, date_folder, file_path): Future[bytes]}
+        self._prefetch_downloads = {}
+
+    def _run(self, coroutine: t.Awaitable) -> t.Any:
+        """Run a coroutine on the client's event loop and wait for its result.
+
+        Args:
+            coroutine: The coroutine to run.
+
+        Returns:
+            The result of the coroutine.
+
+        Raises:
+            ConnectionError: If the client is disconnected.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Avoids "coroutine was never awaited" warnings
+            if asyncio.iscoroutine(coroutine):
+                coroutine.close()
+            raise ConnectionError("The SFTP client is disconnected")
+        try:
+            return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+        except CancelledError:
+            # Cancelled by a disconnect while this thread was waiting
+            raise ConnectionError("The SFTP client was disconnected during the request")
+
+    @staticmethod
+    async def _gather(coroutines: t.Iterable[t.Awaitable]) -> list[t.Any]:
+        """Run coroutines concurrently on the event loop.
+
+        Args:
+            coroutines: The coroutines to run.
+
+        Returns:
+            The result or raised exception of each coroutine, in order.
+        """
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    def _start_loop(self) -> None:
+        """Start the event loop thread if it is not running."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="sftp-asyncio",
+            daemon=True,
+        )
+        self._loop_thread.start()
+
+    def _is_transport_active(self) -> bool:
+        """Check whether every SSH connection is still open.
+
+        Returns:
+            True if the connections are open, False otherwise.
+        """
+        return bool(self._connections) and not any(conn.is_closed() for conn, _ in self._connections)
+
+    def connect(self) -> None:
+        """Open the SSH connections and their SFTP sessions with retry logic."""
+        with self._connect_lock:
+            if self._connections:
+                if not self._is_transport_active():
+                    # Only the dropped connections are reopened, so requests and
+                    # scheduled downloads on the others carry on
+                    self.logger.warning("SSH connection is no longer active. Reconnecting...")
+                    self._run(self._reopen_closed_connections())
+                return
+            self._start_loop()
+
+            # Retry parameters
+            max_retries = 5
+            retry_delay = 2  # seconds
+            retries = 0
+
+            while True:
+                try:
+                    self._run(self._open_connections())
+                    self.logger.info(
+                        f"Opened {self.connection_count} SSH connections for up to "
+                        f"{self.max_requests} concurrent SFTP requests"
+                    )
+                    return
+                except asyncssh.PermissionDenied as e:
+                    self.logger.error(f"Authentication failed: {e}")
+                    raise FatalAPIError(f"Authentication failed: {e}")
+                except asyncssh.KeyImportError as e:
+                    self.logger.error(f"Invalid private key format: {e}")
+                    raise FatalAPIError(
+                        f"Invalid private key format: {e}. Please ensure your key is properly formatted with newlines."
+                    )
+                except (asyncssh.Error, OSError, asyncio.TimeoutError) as e:
+                    retries += 1
+                    if retries >= max_retries:
+                        self.logger.error(f"Failed to connect to SFTP server after {max_retries} attempts: {e}")
+                        raise RetriableAPIError(f"Failed to connect to SFTP server: {e}")
+
+                    self.logger.warning(f"Connection attempt {retries} failed: {e}. Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                    # Exponential backoff
+                    retry_delay *= 2
+
+    async def _open_connection(self) -> tuple[t.Any, t.Any]:
+        """Open one SSH connection and an SFTP session on it.
+
+        Returns:
+            The connection and its SFTP session.
+        """
+        connect_kwargs = {
+            "host": self.host,
+            "port": self.port,
+            "username": self.username,
+            # Host keys are not verified, like the paramiko transport's AutoAddPolicy
+            "known_hosts": None,
+        }
+        if self.private_key:
+            connect_kwargs["client_keys"] = [asyncssh.import_private_key(self.private_key)]
+        else:
+            connect_kwargs["password"] = self.password
+
+        conn = await asyncio.wait_for(asyncssh.connect(**connect_kwargs), 30)
+        try:
+            sftp = await asyncio.wait_for(conn.start_sftp_client(), 30)
+        except BaseException:
+            conn.close()
+            raise
+        return conn, sftp
+
+    async def _open_connections(self) -> None:
+        """Open connection_count connections concurrently."""
+        if self._request_semaphore is None:
+            self._request_semaphore = asyncio.Semaphore(self.max_requests)
+            self._reconnect_lock = asyncio.Lock()
+        results = await self._gather(self._open_connection() for _ in range(self.connection_count))
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            for result in results:
+                if not isinstance(result, BaseException):
+                    result[0].close()
+            raise errors[0]
+        self._connections = list(results)
+
+    async def _reopen_connection(self, index: int) -> t.Any:
+        """Reopen a connection if it was lost.
+
+        Args:
+            index: The position of the connection.
+
+        Returns:
+            The connection's SFTP session.
+        """
+        async with self._reconnect_lock:
+            # Another request may have reopened it while we waited
+            conn, sftp = self._connections[index]
+            if conn.is_closed():
+                self.logger.warning("SSH connection was lost, reopening it")
+                conn, sftp = self._connections[index] = await self._open_connection()
+            return sftp
+
+    async def _reopen_closed_connections(self) -> None:
+        """Reopen every lost connection."""
+        for index, (conn, _) in enumerate(self._connections):
+            if conn.is_closed():
+                await self._reopen_connection(index)
+
+    async def _get_sftp(self) -> t.Any:
+        """Pick the SFTP session of the next connection, reopening it if it was lost.
+
+        Returns:
+            An asyncssh SFTP session.
+        """
+        index = self._next_connection % len(self._connections)
+        self._next_connection += 1
+        conn, sftp = self._connections[index]
+        if conn.is_closed():
+            return await self._reopen_connection(index)
+        return sftp
+
+    def disconnect(self) -> None:
+        """Close the SSH connections and stop the event loop."""
+        with self._connect_lock:
+            if self._loop is None:
+                return
+            try:
+                self._run(self._close_connections())
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop_thread.join()
+                # Requests sent while the connections were closing
+                leftover = asyncio.all_tasks(self._loop)
+                for task in leftover:
+                    task.cancel()
+                if leftover:
+                    self._loop.run_until_complete(self._gather(leftover))
+                self._loop.close()
+                self._loop = None
+                self._loop_thread = None
+                self._request_semaphore = None
+                self._reconnect_lock = None
+
+    async def _close_connections(self) -> None:
+        """Cancel scheduled downloads and pending requests and close every connection.
+
+        Threads still waiting in _run get a ConnectionError instead of waiting
+        on a stopped event loop forever.
+        """
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Downloads whose task was not created yet
+        for key, download in list(self._prefetch_downloads.items()):
+            self._fail_prefetch(key, download)
+        connections = self._connections
+        self._connections = []
+        for conn, _ in connections:
+            conn.close()
+        for conn, _ in connections:
+            try:
+                await conn.wait_closed()
+            except Exception as e:
+                self.logger.debug(f"Error closing SSH connection: {e}")
+
+    async def _call_async(
+        self,
+        description: str,
+        operation: t.Callable[[t.Any], t.Awaitable],
+        timeout: float,
+        max_retries: int,
+    ) -> t.Any:
+        """Run an operation on one of the SFTP sessions, retrying transient errors.
+
+        The request semaphore bounds the operations in flight over all connections.
+        A retry waits for its backoff without holding a slot.
+
+        Args:
+            description: Short description of the operation for log messages.
+            operation: Coroutine function receiving the SFTP session.
+            timeout: Maximum time for each attempt in seconds.
+            max_retries: Maximum number of attempts.
+
+        Returns:
+            The result of the operation.
+
+        Raises:
+            FileNotFoundError: If the remote path does not exist.
+        """
+        retry_delay = 2  # seconds
+        retries = 0
+
+        while True:
+            try:
+                async with self._request_semaphore:
+                    sftp = await self._get_sftp()
+                    return await asyncio.wait_for(operation(sftp), timeout)
+            except asyncssh.SFTPNoSuchFile as e:
+                raise FileNotFoundError(f"No such file: {e}") from e
+            except asyncio.TimeoutError as e:
+                self.logger.warning(f"Attempt to {description} timed out after {timeout} seconds")
+                error = e
+            except (asyncssh.Error, OSError, EOFError) as e:
+                error = e
+
+            retries += 1
+            if retries >= max_retries:
+                self.logger.error(f"Failed to {description} after {max_retries} attempts: {error}")
+                raise error
+
+            self.logger.warning(f"Attempt {retries} to {description} failed: {error}. Retrying in {retry_delay} seconds...")
+            await asyncio.sleep(retry_delay)
+            # Exponential backoff
+            retry_delay *= 2
+
+    @staticmethod
+    def _to_attributes(name: t.Any) -> paramiko.SFTPAttributes:
+        """Convert an asyncssh directory entry to the entries SFTPClient returns.
+
+        Args:
+            name: The asyncssh SFTPName.
+
+        Returns:
+            SFTPAttributes with the filename, mode, size and times set.
+        """
+        attributes = paramiko.SFTPAttributes()
+        attributes.filename = name.filename
+        attributes.st_mode = name.attrs.permissions
+        attributes.st_size = name.attrs.size
+        attributes.st_mtime = name.attrs.mtime
+        attributes.st_atime = name.attrs.atime
+        return attributes
+
+    async def _list_dir_async(self, path: str) -> list[paramiko.SFTPAttributes]:
+        """List a remote directory with attributes.
+
+        Args:
+            path: The directory path.
+
+        Returns:
+            The listed entries, without "." and "..".
+        """
+        names = await self._call_async(
+            f"list files in {path}",
+            lambda sftp: sftp.readdir(path),
+            timeout=30,
+            max_retries=3,
+        )
+        return [self._to_attributes(name) for name in names if name.filename not in (".", "..")]
+
+    def _fetch_dir_attrs(self, path: str) -> list[paramiko.SFTPAttributes]:
+        """List a remote directory with attributes on the event loop.
+
+        Args:
+            path: The directory path.
+
+        Returns:
+            The listed entries.
+        """
+        return self._run(self._list_dir_async(path))
+
+    def list_dirs(self, paths: t.Iterable[str]) -> dict[str, list[paramiko.SFTPAttributes]]:
+        """List several directories at once.
+
+        Cached listings are answered from memory, the others are all sent
+        together, bounded by sftp_max_requests.
+
+        Args:
+            paths: The directory paths.
+
+        Returns:
+            Mapping of each path to its entries, empty for missing or failed directories.
+        """
+        listings = {}
+        missing = []
+        for path in paths:
+            cached = self._get_cached_listing(path)
+            if cached is None:
+                missing.append(path)
+            else:
+                listings[path] = cached
+        if not missing:
+            return listings
+
+        self.connect()
+        self.logger.info(f"Listing {len(missing)} directories concurrently")
+        results = self._run(self._gather(self._list_dir_async(path) for path in missing))
+        for path, result in zip(missing, results):
+            if isinstance(result, FileNotFoundError):
+                self.logger.warning(f"Directory not found: {path}")
+                listings[path] = []
+            elif isinstance(result, Exception):
+                self.logger.error(f"Error listing files in {path}: {result}")
+                listings[path] = []
+            else:
+                self._cache_listing(path, result)
+                listings[path] = result
+        return listings
+
+    def _fetch_is_directory(self, path: str) -> bool:
+        """Stat a remote path on the event loop and check its directory bit.
+
+        Args:
+            path: The path to check.
+
+        Returns:
+            True if the path is a directory.
+        """
+        attrs = self._run(self._call_async(
+            f"check if {path} is a directory",
+            lambda sftp: sftp.stat(path),
+            timeout=15,
+            max_retries=3,
+        ))
+        return attrs.permissions is not None and attrs.permissions & 0o40000 != 0
+
+    def _open_remote_file(self, sftp: t.Any, path: str) -> t.Any:
+        """Open a remote file with the pipelined read options.
+
+        Args:
+            sftp: The asyncssh SFTP session.
+            path: The file path.
+
+        Returns:
+            The asyncssh file opener, usable with await or async with.
+        """
+        # asyncssh pipelines reads larger than one block, like paramiko's prefetch
+        return sftp.open(
+            path,
+            "rb",
+            block_size=self.prefetch_request_size,
+            max_requests=self.prefetch_max_requests if self.prefetch else 1,
+        )
+
+    async def _download_async(self, path: str, timeout: float) -> bytes:
+        """Download a whole remote file, retrying transient errors.
+
+        Args:
+            path: The file path.
+            timeout: Maximum time for each download attempt in seconds.
+
+        Returns:
+            The file content as bytes.
+        """
+        async def read(sftp: t.Any) -> bytes:
+            async with self._open_remote_file(sftp, path) as remote_file:
+                return await remote_file.read()
+
+        started_at = time.monotonic()
+        content = await self._call_async(f"read file {path}", read, timeout=timeout, max_retries=5)
+        self._log_transfer_rate(path, len(content), time.monotonic() - started_at)
+        return content
+
+    def _fetch_file(self, path: str, timeout: float) -> bytes:
+        """Download a whole remote file on the event loop.
+
+        Args:
+            path: The file path.
+            timeout: Maximum time for each download attempt in seconds.
+
+        Returns:
+            The file content as bytes.
+        """
+        return self._run(self._download_async(path, timeout))
+
+    def iter_file_chunks(
+        self,
+        path: str,
+        chunk_size: int = 1024 * 1024,
+        timeout: float = 60,
+    ) -> t.Iterator[bytes]:
+        """Stream a remote file in chunks as they arrive.
+
+        Each chunk is read with pipelined requests on the event loop while the
+        caller processes the previous one. Like the paramiko client, a transient
+        error reopens the file and resumes at the byte offset reached, and once
+        the retries run out the caller must treat the whole file as failed.
+
+        Args:
+            path: The file path.
+            chunk_size: The number of bytes per chunk.
+            timeout: Maximum time in seconds for each read.
+
+        Yields:
+            The file content in chunks of up to chunk_size bytes.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        self.connect()
+        self.logger.info(f"Starting to stream file: {path}")
+
+        started_at = time.monotonic()
+        total_bytes = 0
+        max_retries = 5
+        retry_delay = 2  # seconds
+        retries = 0
+        remote_file = self._open_stream_file(path, timeout)
+        try:
+            while True:
+                try:
+                    chunk = self._run(asyncio.wait_for(remote_file.read(chunk_size, total_bytes), timeout))
+                except asyncssh.SFTPNoSuchFile as e:
+                    raise FileNotFoundError(f"No such file: {e}") from e
+                except (asyncssh.Error, OSError, EOFError, asyncio.TimeoutError) as e:
+                    retries += 1
+                    if retries >= max_retries:
+                        self.logger.error(f"Failed to stream file {path} after {max_retries} attempts: {e}")
+                        raise
+                    self.logger.warning(
+                        f"Attempt {retries} to stream file {path} failed at byte {total_bytes}: {e}. "
+                        f"Resuming in {retry_delay} seconds..."
+                    )
+                    time.sleep(retry_delay)
+                    # Exponential backoff
+                    retry_delay *= 2
+                    self._close_stream_file(remote_file, path)
+                    remote_file = self._open_stream_file(path, timeout)
+                    continue
+                if not chunk:
+                    break
+                total_bytes += len(chunk)
+                yield chunk
+        finally:
+            self._close_stream_file(remote_file, path)
+        self._log_transfer_rate(path, total_bytes, time.monotonic() - started_at)
+
+    def _open_stream_file(self, path: str, timeout: float) -> t.Any:
+        """Open a remote file for streaming, retrying transient errors.
+
+        Args:
+            path: The file path.
+            timeout: Maximum time for each attempt in seconds.
+
+        Returns:
+            The opened asyncssh file.
+        """
+        return self._run(self._call_async(
+            f"open file {path}",
+            lambda sftp: self._open_remote_file(sftp, path),
+            timeout=timeout,
+            max_retries=3,
+        ))
+
+    def _close_stream_file(self, remote_file: t.Any, path: str) -> None:
+        """Close a streamed remote file, ignoring errors of a dropped connection.
+
+        Args:
+            remote_file: The opened asyncssh file.
+            path: The file path.
+        """
+        try:
+            self._run(remote_file.close())
+        except Exception as e:
+            self.logger.debug(f"Error closing remote file {path}: {e}")
+
+    def prefetch_files(self, keys: t.Iterable[tuple[str, str, str]]) -> None:
+        """Schedule the download of several files into the file content cache at once.
+
+        Returns right away. Each download is registered like a download started
+        by get_cached_file_content, so a stream reading the file before its
+        download is done waits for it instead of downloading it again. Files
+        that are cached or already downloading are skipped.
+
+        Args:
+            keys: The (location_id, date_folder, file_path) cache keys of the files.
+        """
+        scheduled = []
+        with self._file_cache_lock:
+            for key in keys:
+                if key in self._file_content_cache or key in self._file_downloads:
+                    continue
+                download = self._file_downloads[key] = self._prefetch_downloads[key] = Future()
+                self.file_cache_misses += 1
+                scheduled.append((key, download))
+        if not scheduled:
+            return
+
+        self.connect()
+        self.logger.info(f"Scheduling {len(scheduled)} file downloads")
+        for key, download in scheduled:
+            self._loop.call_soon_threadsafe(self._start_prefetch_task, key, download)
+
+    def _start_prefetch_task(self, key: tuple[str, str, str], download: Future) -> None:
+        """Start a scheduled download as a task of the event loop.
+
+        Args:
+            key: The (location_id, date_folder, file_path) cache key.
+            download: The future waited on by readers of the file.
+        """
+        if download.done():
+            # Failed by a disconnect before the task was created
+            return
+        task = self._loop.create_task(self._prefetch_file(key, download))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(partial(self._prefetch_done, key, download))
+
+    def _prefetch_done(self, key: tuple[str, str, str], download: Future, task: asyncio.Task) -> None:
+        """Make sure a download's future is resolved once its task is over.
+
+        A task cancelled before it ran never resolves the future itself.
+
+        Args:
+            key: The (location_id, date_folder, file_path) cache key.
+            download: The future waited on by readers of the file.
+            task: The finished task.
+        """
+        self._prefetch_tasks.discard(task)
+        self._fail_prefetch(key, download)
+
+    def _fail_prefetch(
+        self,
+        key: tuple[str, str, str],
+        download: Future,
+        error: t.Optional[Exception] = None,
+    ) -> None:
+        """Unregister a scheduled download, failing its future if it is still pending.
+
+        Without an error, readers get a ConnectionError, an ordinary exception
+        the streams handle like any other failed download, instead of a
+        CancelledError.
+
+        Args:
+            key: The (location_id, date_folder, file_path) cache key.
+            download: The future waited on by readers of the file.
+            error: The error the download failed with, if any.
+        """
+        with self._file_cache_lock:
+            if self._file_downloads.get(key) is download:
+                del self._file_downloads[key]
+            if self._prefetch_downloads.get(key) is download:
+                del self._prefetch_downloads[key]
+        if not download.done():
+            download.set_exception(error or ConnectionError(f"Download of {key[2]} was cancelled"))
+
+    async def _prefetch_file(self, key: tuple[str, str, str], download: Future) -> None:
+        """Download a file into the file content cache and resolve its future.
+
+        Missing files resolve to empty content and failing files fail the future,
+        like get_file_content. A cancelled download is failed by _prefetch_done.
+
+        Args:
+            key: The (location_id, date_folder, file_path) cache key.
+            download: The future waited on by readers of the file.
+        """
+        file_path = key[2]
+        try:
+            content = await self._download_async(file_path, timeout=300)
+        except FileNotFoundError:
+            self.logger.warning(f"File not found: {file_path}")
+            content = b""
+        except Exception as e:
+            self.logger.error(f"Error reading file {file_path}: {e}")
+            self._fail_prefetch(key, download, e)
+            return
+        self._cache_file_content(key, content)
+        download.set_result(content)
@@ -3,10 +3,14 @@
 from __future__ import annotations
 
 import io
+import multiprocessing
 import typing as t
 import csv
+import fnmatch
 import json
 import os
+import posixpath
+import stat
 import hashlib
 import uuid
 from importlib import resources
@@ -15,13 +19,20 @@ from pathlib import Path
 import paramiko
 import logging
 import time
+import queue
 import socket
 import typing as t
-import concurrent.futures
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import partial
 from singer_sdk.streams import Stream
 from singer_sdk.exceptions import ConfigValidationError, FatalAPIError, RetriableAPIError
 
+from tap_toast_sftp.codec import dumps_for_hash
+from tap_toast_sftp.record_cache import RecordCache
+
 if t.TYPE_CHECKING:
     from singer_sdk.helpers.types import Context
 
@@ -32,9 +43,23 @@ SCHEMAS_DIR = resources.files(__package__) / "schemas"
 class SFTPClient:
     """SFTP client for connecting to Toast SFTP server."""
 
-    # Class-level cache for file contents to avoid redundant downloads
-    # Structure: {location_id: {date_folder: {file_path: content}}}
-    _file_content_cache = {}
+    @classmethod
+    def for_config(cls, config: dict) -> "SFTPClient":
+        """Create the SFTP client of the configured transport.
+
+        Args:
+            config: The tap configuration.
+
+        Returns:
+            An SFTPClient for the paramiko transport, or an AsyncSFTPClient for
+            the asyncio transport.
+        """
+        if config.get("transport") == "asyncio":
+            # Imported here since the asyncio client module builds on this one
+            from tap_toast_sftp.async_client import AsyncSFTPClient
+
+            return AsyncSFTPClient(config)
+        return cls(config)
 
     def __init__(self, config: dict) -> None:
         """Initialize the SFTP client.
@@ -47,6 +72,12 @@ class SFTPClient:
         self.port = config.get("sftp_port", 22)
         self.private_key = config.get("sftp_private_key")
         self.password = config.get("sftp_password")
+        # Maximum number of SFTP channels opened over the SSH transport
+        self.max_sessions = max(1, int(config.get("sftp_max_sessions") or 4))
+        # Pipelined (prefetch) download options
+        self.prefetch = config.get("sftp_prefetch", True)
+        self.prefetch_max_requests = int(config.get("sftp_prefetch_max_requests") or 64)
+        self.prefetch_request_size = int(config.get("sftp_prefetch_request_size") or 32768)
         self.logger = logging.getLogger("tap-toast-sftp.sftp_client")
 
         # Validate that either private key or password is provided
@@ -61,6 +92,49 @@ class SFTPClient:
 
         self._client = None
 
+        # Pool of SFTP sessions (channels) multiplexed over the SSH transport.
+        # Sessions are opened lazily up to max_sessions and handed out one
+        # thread at a time through session().
+        self._pool_lock = threading.Condition()
+        self._idle_sessions: list[paramiko.SFTPClient] = []
+        self._session_count = 0
+        # Bumped by every disconnect. Sessions are tagged with the generation of
+        # the transport they were opened on, so a session checked out before a
+        # reconnect does not free a slot of the new transport when it is returned.
+        self._pool_generation = 0
+        self._session_generations: dict[paramiko.SFTPClient, int] = {}
+        self._connect_lock = threading.RLock()
+
+        # Directory listing cache shared by every stream using this client
+        # Structure: {normalized_path: (expires_at, [SFTPAttributes])}
+        self.listing_cache_ttl = float(config.get("listing_cache_ttl", 300) or 0)
+        self._listing_cache = {}
+        self._listing_cache_lock = threading.Lock()
+        self.listing_cache_hits = 0
+        self.listing_cache_misses = 0
+
+        # Byte-budgeted LRU cache for file contents to avoid redundant downloads
+        # Structure: OrderedDict{(location_id, date_folder, file_path): content}, oldest first
+        self.file_cache_max_bytes = int(float(config.get("file_cache_max_mb", 512) or 0) * 1024 * 1024)
+        self._file_content_cache = OrderedDict()
+        self._file_cache_lock = threading.Lock()
+        self.file_cache_bytes = 0
+        self.file_cache_hits = 0
+        self.file_cache_misses = 0
+        self.file_cache_evictions = 0
+        self.file_cache_releases = 0
+        # Downloads in progress, so concurrent misses for the same file wait for one
+        # download instead of each starting their own
+        # Structure: {(location_id, date_folder, file_path): Future[bytes]}
+        self._file_downloads = {}
+
+        # Number of selected streams reading each file, used to free cached files
+        # as soon as their last consumer is done with them
+        # Structure: {file_name_or_pattern: consumer_count}
+        self._file_consumers = {}
+        # Structure: {(location_id, date_folder, file_path): remaining_consumers}
+        self._file_consumers_remaining = {}
+
     def _normalize_private_key(self, key_str: str) -> str:
         """Normalize SSH private key by ensuring proper newlines.
 
@@ -147,9 +221,26 @@ class SFTPClient:
 
     def connect(self) -> None:
         """Connect to the SFTP server with retry logic."""
-        if self._client is not None:
-            return
+        with self._connect_lock:
+            if self._client is not None:
+                if self._is_transport_active():
+                    return
+                # The transport died underneath us, start over with a fresh connection
+                self.logger.warning("SSH transport is no longer active. Reconnecting...")
+                self.disconnect()
+            self._connect()
+
+    def _is_transport_active(self) -> bool:
+        """Check whether the underlying SSH transport is still usable.
+
+        Returns:
+            True if the transport is connected and active, False otherwise.
+        """
+        transport = self._client.get_transport() if self._client is not None else None
+        return transport is not None and transport.is_active()
 
+    def _connect(self) -> None:
+        """Open the SSH connection and the first SFTP session of the pool."""
         self._client = paramiko.SSHClient()
         self._client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
@@ -208,7 +299,12 @@ class SFTPClient:
         while retries < max_retries:
             try:
                 self._client.connect(**connect_kwargs)
-                self._sftp = self._client.open_sftp()
+                # Open the first session right away so connection problems surface here
+                session = self._client.open_sftp()
+                with self._pool_lock:
+                    self._idle_sessions.append(session)
+                    self._session_count += 1
+                    self._session_generations[session] = self._pool_generation
                 return
             except paramiko.ssh_exception.AuthenticationException as e:
                 self.logger.error(f"Authentication failed: {e}")
@@ -226,74 +322,355 @@ class SFTPClient:
 
     def disconnect(self) -> None:
         """Disconnect from the SFTP server."""
-        if self._client:
-            self._sftp.close()
-            self._client.close()
-            self._client = None
+        with self._connect_lock:
+            with self._pool_lock:
+                idle_sessions = self._idle_sessions
+                self._idle_sessions = []
+                # Sessions still checked out belong to the old transport and are
+                # closed with it, they no longer count against max_sessions
+                self._session_count = 0
+                self._pool_generation += 1
+                self._session_generations = {}
+                self._pool_lock.notify_all()
+            for session in idle_sessions:
+                self._close_session(session)
+            if self._client:
+                # Closing the transport also closes any session still checked out
+                self._client.close()
+                self._client = None
+
+    def _close_session(self, session: paramiko.SFTPClient) -> None:
+        """Close a single SFTP session, ignoring errors from dead channels.
+
+        Args:
+            session: The SFTP session to close.
+        """
+        try:
+            session.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing SFTP session: {e}")
+
+    def _is_session_healthy(self, session: paramiko.SFTPClient) -> bool:
+        """Check whether a pooled SFTP session can still be used.
+
+        Args:
+            session: The SFTP session to check.
+
+        Returns:
+            True if the session's channel and transport are still open.
+        """
+        channel = session.get_channel()
+        return (
+            channel is not None
+            and not channel.closed
+            and channel.get_transport() is not None
+            and channel.get_transport().is_active()
+        )
+
+    def _checkout_session(self) -> paramiko.SFTPClient:
+        """Take a session from the pool, opening a new one if the pool is not full.
+
+        Blocks until a session is returned by another thread when all
+        max_sessions sessions are in use.
+
+        Returns:
+            An SFTP session reserved for the calling thread.
+        """
+        while True:
+            self.connect()
+            with self._pool_lock:
+                while True:
+                    if self._idle_sessions:
+                        session = self._idle_sessions.pop()
+                        if self._is_session_healthy(session):
+                            return session
+                        # Drop the dead session and let the loop open a replacement
+                        self.logger.warning("Discarding unhealthy SFTP session from pool")
+                        self._session_count -= 1
+                        self._session_generations.pop(session, None)
+                        self._close_session(session)
+                        continue
+                    if self._session_count < self.max_sessions:
+                        # Reserve the slot before releasing the lock to open the channel
+                        self._session_count += 1
+                        generation = self._pool_generation
+                        break
+                    self._pool_lock.wait()
+
+            try:
+                self.connect()
+                session = self._client.open_sftp()
+            except Exception:
+                with self._pool_lock:
+                    # A disconnect in the meantime already released the slot
+                    if generation == self._pool_generation:
+                        self._session_count -= 1
+                        self._pool_lock.notify()
+                raise
+
+            with self._pool_lock:
+                if generation == self._pool_generation:
+                    self._session_generations[session] = generation
+                    self.logger.debug(f"Opened SFTP session {self._session_count}/{self.max_sessions}")
+                    return session
+            # The connection was reset while the session was opened, its slot is gone
+            self._close_session(session)
+
+    def _return_session(self, session: paramiko.SFTPClient, discard: bool = False) -> None:
+        """Give a session back to the pool.
+
+        Args:
+            session: The SFTP session to return.
+            discard: Close the session instead of reusing it (e.g. after an error).
+        """
+        with self._pool_lock:
+            if self._session_generations.get(session) != self._pool_generation:
+                # Opened before a reconnect, its slot was released by disconnect
+                discard = True
+            elif discard or not self._is_session_healthy(session):
+                self._session_count -= 1
+                del self._session_generations[session]
+                discard = True
+            else:
+                self._idle_sessions.append(session)
+            self._pool_lock.notify()
+        if discard:
+            self._close_session(session)
+
+    @contextmanager
+    def session(self, timeout: t.Optional[float] = None) -> t.Iterator[paramiko.SFTPClient]:
+        """Check out an SFTP session for exclusive use by the calling thread.
+
+        paramiko SFTP sessions must not be shared between threads, so every
+        remote operation runs on a session checked out from the pool. Sessions
+        that raise anything other than a "no such file" or "permission denied"
+        status are closed instead of being returned, since a timed out request
+        leaves the session waiting for a response that may still arrive.
+
+        Args:
+            timeout: Channel timeout in seconds. Any blocking read on the channel
+                raises socket.timeout once it has waited this long.
+
+        Yields:
+            A paramiko SFTP session.
+        """
+        session = self._checkout_session()
+        try:
+            session.get_channel().settimeout(timeout)
+            yield session
+        except (FileNotFoundError, PermissionError):
+            self._return_session(session)
+            raise
+        except BaseException:
+            self._return_session(session, discard=True)
+            raise
+        else:
+            self._return_session(session)
+
+    def _call_with_retries(
+        self,
+        description: str,
+        operation: t.Callable[[paramiko.SFTPClient], t.Any],
+        timeout: float,
+        max_retries: int,
+    ) -> t.Any:
+        """Run an operation on a pooled session, retrying transient errors.
+
+        Timeouts are enforced on the session's channel, so a stuck operation
+        raises socket.timeout in the calling thread instead of being abandoned
+        on a helper thread. The timed out session is closed before retrying on
+        a fresh one, leaving the rest of the pool untouched.
+
+        Args:
+            description: Short description of the operation for log messages.
+            operation: Callable receiving the checked out SFTP session.
+            timeout: Channel timeout in seconds.
+            max_retries: Maximum number of attempts.
+
+        Returns:
+            The result of the operation.
+
+        Raises:
+            FileNotFoundError: If the remote path does not exist.
+        """
+        retry_delay = 2  # seconds
+        retries = 0
+
+        while True:
+            try:
+                with self.session(timeout=timeout) as sftp:
+                    return operation(sftp)
+            except FileNotFoundError:
+                raise
+            except socket.timeout as e:
+                self.logger.warning(f"Attempt to {description} timed out after {timeout} seconds")
+                error = e
+            except (paramiko.ssh_exception.SSHException, socket.error, IOError, EOFError) as e:
+                error = e
+
+            retries += 1
+            if retries >= max_retries:
+                self.logger.error(f"Failed to {description} after {max_retries} attempts: {error}")
+                raise error
+
+            self.logger.warning(f"Attempt {retries} to {description} failed: {error}. Retrying in {retry_delay} seconds...")
+            time.sleep(retry_delay)
+            # Exponential backoff
+            retry_delay *= 2
 
     def list_files(self, path: str) -> list[str]:
         """List files in a directory with retry logic and timeout handling.
 
+        Uses the same cached listing as list_dir_attrs, so a directory listed by
+        either method is answered from memory until its TTL expires.
+
         Args:
             path: The directory path.
 
         Returns:
             A list of file names.
         """
+        return [entry.filename for entry in self.list_dir_attrs(path)]
+
+    def list_dir_attrs(self, path: str, ttl: t.Optional[float] = None) -> list[paramiko.SFTPAttributes]:
+        """List a directory with file attributes in a single round trip.
+
+        Unlike a plain listdir, the returned entries carry st_mode, st_size and
+        st_mtime, so callers can tell directories from files without an extra
+        stat per entry. Successful listings are cached for the run.
+
+        Args:
+            path: The directory path.
+            ttl: Seconds to keep this listing cached. Defaults to listing_cache_ttl.
+
+        Returns:
+            A list of SFTPAttributes whose filename is set.
+        """
+        cached = self._get_cached_listing(path)
+        if cached is not None:
+            self.logger.debug(f"Using cached listing for {path}")
+            return cached
+
         self.connect()
         self.logger.info(f"Starting to list files in directory: {path}")
 
-        # Retry parameters
-        max_retries = 3
-        retry_delay = 2  # seconds
-        retries = 0
+        try:
+            result = self._fetch_dir_attrs(path)
+            self.logger.info(f"Successfully listed {len(result)} files in {path}")
+            self._cache_listing(path, result, ttl)
+            return list(result)
+        except FileNotFoundError:
+            self.logger.warning(f"Directory not found: {path}")
+            return []
+        except Exception as e:
+            self.logger.error(f"Error listing files in {path}: {e}")
+            return []
 
-        # Set a timeout for the listdir operation
-        timeout = 30  # seconds
+    def _fetch_dir_attrs(self, path: str) -> list[paramiko.SFTPAttributes]:
+        """List a remote directory with attributes, bypassing the listing cache.
 
-        while retries < max_retries:
-            try:
-                # Use a separate thread with a timeout to prevent hanging
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(self._sftp.listdir, path)
-                    try:
-                        result = future.result(timeout=timeout)
-                        self.logger.info(f"Successfully listed {len(result)} files in {path}")
-                        return result
-                    except concurrent.futures.TimeoutError:
-                        self.logger.warning(f"Listing files in {path} timed out after {timeout} seconds")
-                        # Cancel the future if possible
-                        future.cancel()
-                        # Try to recover the connection
-                        self.disconnect()
-                        self.connect()
-                        retries += 1
-                        if retries >= max_retries:
-                            self.logger.error(f"Failed to list files in {path} after {max_retries} attempts due to timeout")
-                            return []
-                        self.logger.warning(f"Retrying list files (attempt {retries}) in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-            except FileNotFoundError:
-                self.logger.warning(f"Directory not found: {path}")
-                return []
-            except (socket.timeout, paramiko.ssh_exception.SSHException, socket.error, IOError) as e:
-                retries += 1
-                if retries >= max_retries:
-                    self.logger.error(f"Failed to list files in {path} after {max_retries} attempts: {e}")
-                    return []
+        Args:
+            path: The directory path.
 
-                self.logger.warning(f"List files attempt {retries} failed: {e}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                # Exponential backoff
-                retry_delay *= 2
-            except Exception as e:
-                self.logger.error(f"Error listing files in {path}: {e}")
-                return []
+        Returns:
+            The listed entries.
+        """
+        return self._call_with_retries(
+            f"list files in {path}",
+            lambda sftp: sftp.listdir_attr(path),
+            timeout=30,
+            max_retries=3,
+        )
 
-        # If we get here, all retries failed
-        return []
+    def list_dirs(self, paths: t.Iterable[str]) -> dict[str, list[paramiko.SFTPAttributes]]:
+        """List several directories with attributes.
+
+        The paramiko transport lists them one after another. The asyncio transport
+        overrides this to send every listing at once.
+
+        Args:
+            paths: The directory paths.
+
+        Returns:
+            Mapping of each path to its entries, empty for missing directories.
+        """
+        return {path: self.list_dir_attrs(path) for path in paths}
+
+    def prefetch_files(self, keys: t.Iterable[tuple[str, str, str]]) -> None:
+        """Start downloading files into the file content cache ahead of their use.
+
+        The paramiko transport downloads files when they are first read, so this
+        does nothing. The asyncio transport overrides it to schedule every
+        download at once.
+
+        Args:
+            keys: The (location_id, date_folder, file_path) cache keys of the files.
+        """
+
+    def _get_cached_listing(self, path: str) -> t.Optional[list[paramiko.SFTPAttributes]]:
+        """Look up a directory listing in the listing cache.
+
+        Args:
+            path: The directory path.
+
+        Returns:
+            A copy of the cached entries, or None on a miss or expired entry.
+        """
+        key = posixpath.normpath(path)
+        with self._listing_cache_lock:
+            entry = self._listing_cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.listing_cache_hits += 1
+                return list(entry[1])
+            if entry is not None:
+                del self._listing_cache[key]
+            self.listing_cache_misses += 1
+            return None
+
+    def _cache_listing(
+        self,
+        path: str,
+        entries: list[paramiko.SFTPAttributes],
+        ttl: t.Optional[float] = None,
+    ) -> None:
+        """Store a successful directory listing in the listing cache.
+
+        Args:
+            path: The directory path.
+            entries: The listed entries.
+            ttl: Seconds to keep the listing. Defaults to listing_cache_ttl.
+        """
+        ttl = self.listing_cache_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._listing_cache_lock:
+            self._listing_cache[posixpath.normpath(path)] = (time.monotonic() + ttl, list(entries))
+
+    def invalidate_listing_cache(self, path: t.Optional[str] = None) -> None:
+        """Drop cached directory listings.
+
+        Args:
+            path: Optional directory path to invalidate. Clears every listing if omitted.
+        """
+        with self._listing_cache_lock:
+            if path is None:
+                self._listing_cache = {}
+                self.logger.info("Cleared directory listing cache")
+            else:
+                self._listing_cache.pop(posixpath.normpath(path), None)
+
+    def get_listing_cache_stats(self) -> dict:
+        """Get hit/miss counters of the directory listing cache.
+
+        Returns:
+            A dictionary with the number of hits, misses and cached paths.
+        """
+        with self._listing_cache_lock:
+            return {
+                "hits": self.listing_cache_hits,
+                "misses": self.listing_cache_misses,
+                "entries": len(self._listing_cache),
+            }
 
     def is_directory(self, path: str) -> bool:
         """Check if a path is a directory with retry logic and timeout handling.
@@ -306,55 +683,277 @@ class SFTPClient:
         """
         self.connect()
 
-        # Retry parameters
-        max_retries = 3
+        try:
+            return self._fetch_is_directory(path)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            self.logger.error(f"Error checking if {path} is a directory: {e}")
+            return False
+
+    def _fetch_is_directory(self, path: str) -> bool:
+        """Stat a remote path and check its directory bit.
+
+        Args:
+            path: The path to check.
+
+        Returns:
+            True if the path is a directory.
+
+        Raises:
+            FileNotFoundError: If the path does not exist.
+        """
+        return self._call_with_retries(
+            f"check if {path} is a directory",
+            lambda sftp: sftp.stat(path).st_mode & 0o40000 != 0,
+            timeout=15,
+            max_retries=3,
+        )
+
+    def _start_prefetch(
+        self,
+        remote_file: paramiko.SFTPFile,
+        timeout: float,
+        offset: int = 0,
+    ) -> t.Callable[[], None]:
+        """Pipeline read requests for the rest of the file ahead of the reads.
+
+        Instead of waiting a full round trip for every read, paramiko keeps up to
+        prefetch_max_requests requests of prefetch_request_size bytes in flight
+        and buffers the responses for the following read() calls.
+
+        paramiko cannot cancel a prefetch, and its thread raises once the channel
+        is closed under it. So the thread is handed the requests one at a time,
+        and the returned function ends it before the file is abandoned. This
+        relies on SFTPFile internals of paramiko 3.3 and later. When they are
+        missing, the public SFTPFile.prefetch is used, which cannot be stopped.
+
+        Args:
+            remote_file: The opened remote file, positioned at offset.
+            timeout: Seconds to wait for the thread when the prefetch is stopped.
+            offset: The position to prefetch from.
+
+        Returns:
+            A function that stops the prefetch and waits for its thread to finish.
+        """
+        file_size = remote_file.stat().st_size
+        # paramiko reads MAX_REQUEST_SIZE bytes per request, tune it per file
+        remote_file.MAX_REQUEST_SIZE = self.prefetch_request_size
+
+        if not all(
+            hasattr(remote_file, name) for name in ("_prefetch_thread", "_prefetch_extents", "_prefetch_lock")
+        ):
+            self.logger.debug("paramiko has no stoppable prefetch, using SFTPFile.prefetch")
+            remote_file.prefetch(file_size, max_concurrent_requests=self.prefetch_max_requests)
+            return lambda: None
+
+        stopped = threading.Event()
+
+        def in_flight() -> int:
+            with remote_file._prefetch_lock:
+                return len(remote_file._prefetch_extents)
+
+        def requests() -> t.Iterator[tuple[int, int]]:
+            position = offset
+            while position < file_size:
+                # Throttled here instead of in paramiko's thread, so a stopped
+                # prefetch never has a request left to send
+                while in_flight() >= self.prefetch_max_requests:
+                    if stopped.wait(paramiko.common.io_sleep):
+                        return
+                if stopped.is_set():
+                    return
+                length = min(self.prefetch_request_size, file_size - position)
+                yield position, length
+                position += length
+
+        # Like SFTPFile.prefetch, but with a handle on the thread
+        remote_file._prefetching = True
+        remote_file._prefetch_done = False
+        thread = threading.Thread(target=remote_file._prefetch_thread, args=(requests(), None), daemon=True)
+        thread.start()
+
+        def stop() -> None:
+            stopped.set()
+            # The thread ends as soon as the request being sent is out
+            thread.join(timeout)
+            if thread.is_alive():
+                self.logger.warning("Timed out stopping the prefetch of an abandoned file")
+
+        return stop
+
+    def _log_transfer_rate(self, path: str, num_bytes: int, elapsed: float) -> None:
+        """Log the size and achieved throughput of a download.
+
+        Args:
+            path: The file path.
+            num_bytes: The number of bytes read.
+            elapsed: The download time in seconds.
+        """
+        rate = num_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        self.logger.info(
+            f"Successfully read {num_bytes} bytes from {path} in {elapsed:.2f} seconds ({rate:.2f} MB/s)"
+        )
+
+    def _read_file(self, sftp: paramiko.SFTPClient, path: str, timeout: float) -> bytes:
+        """Read a whole remote file in chunks on the given session.
+
+        Args:
+            sftp: The checked out SFTP session.
+            path: The file path.
+            timeout: Maximum total time for the download in seconds.
+
+        Returns:
+            The file content as bytes.
+
+        Raises:
+            socket.timeout: If the download takes longer than timeout.
+        """
+        # Set chunk size for reading large files
+        chunk_size = 1024 * 1024  # 1MB chunks
+        deadline = time.monotonic() + timeout
+
+        started_at = time.monotonic()
+        buffer = io.BytesIO()
+        total_bytes = 0
+        remote_file = sftp.open(path, "rb")
+        stop_prefetch = None
+        try:
+            if self.prefetch:
+                stop_prefetch = self._start_prefetch(remote_file, timeout)
+            while True:
+                chunk = remote_file.read(chunk_size)
+                if not chunk:
+                    break
+                buffer.write(chunk)
+                total_bytes += len(chunk)
+                # Log progress for large files
+                if total_bytes % (10 * chunk_size) == 0:  # Log every 10MB
+                    self.logger.info(f"Read {total_bytes / (1024 * 1024):.2f} MB from {path}")
+                if time.monotonic() > deadline:
+                    raise socket.timeout(f"Reading {path} exceeded {timeout} seconds")
+        except BaseException:
+            self._abandon_remote_file(sftp, stop_prefetch)
+            raise
+        finally:
+            remote_file.close()
+        self._log_transfer_rate(path, total_bytes, time.monotonic() - started_at)
+        return buffer.getvalue()
+
+    def _abandon_remote_file(self, sftp: paramiko.SFTPClient, stop_prefetch: t.Optional[t.Callable[[], None]]) -> None:
+        """Prepare a remote file that was not read to the end for closing.
+
+        The prefetch is stopped first, then the channel is closed, so closing the
+        file handle fails fast instead of waiting for responses to the abandoned
+        requests. The session is discarded afterwards.
+
+        Args:
+            sftp: The session the file was opened on.
+            stop_prefetch: The function returned by _start_prefetch, if prefetching.
+        """
+        if stop_prefetch is not None:
+            stop_prefetch()
+        sftp.get_channel().close()
+
+    def _stream_remote_file(self, path: str, offset: int, chunk_size: int, timeout: float) -> t.Iterator[bytes]:
+        """Read a remote file in chunks from an offset on one session.
+
+        Args:
+            path: The file path.
+            offset: The position to start reading at.
+            chunk_size: The number of bytes per chunk.
+            timeout: Channel timeout in seconds for each read.
+
+        Yields:
+            The file content after offset in chunks of up to chunk_size bytes.
+        """
+        with self.session(timeout=timeout) as sftp:
+            remote_file = sftp.open(path, "rb")
+            stop_prefetch = None
+            try:
+                remote_file.seek(offset)
+                if self.prefetch:
+                    stop_prefetch = self._start_prefetch(remote_file, timeout, offset)
+                while True:
+                    chunk = remote_file.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            except BaseException:
+                self._abandon_remote_file(sftp, stop_prefetch)
+                raise
+            finally:
+                remote_file.close()
+
+    def iter_file_chunks(
+        self,
+        path: str,
+        chunk_size: int = 1024 * 1024,
+        timeout: float = 60,
+    ) -> t.Iterator[bytes]:
+        """Stream a remote file in chunks as they arrive.
+
+        The session stays checked out until the file has been read to the end or
+        the generator is closed, so callers can process each chunk while the rest
+        of the file is still downloading. There is no overall deadline, since the
+        caller sets the pace, but every blocking read is bounded by timeout.
+
+        A transient error does not restart the file. Reading resumes on a fresh
+        session at the byte offset reached, so the caller gets every byte exactly
+        once. If the retries run out the error is raised, and the caller must
+        treat the whole file as failed, since part of it was already yielded.
+
+        Args:
+            path: The file path.
+            chunk_size: The number of bytes per chunk.
+            timeout: Channel timeout in seconds for each read.
+
+        Yields:
+            The file content in chunks of up to chunk_size bytes.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        self.connect()
+        self.logger.info(f"Starting to stream file: {path}")
+
+        started_at = time.monotonic()
+        total_bytes = 0
+        max_retries = 5
         retry_delay = 2  # seconds
         retries = 0
 
-        # Set a timeout for the stat operation
-        timeout = 15  # seconds
-
-        while retries < max_retries:
+        while True:
+            chunks = self._stream_remote_file(path, total_bytes, chunk_size, timeout)
             try:
-                # Use a separate thread with a timeout to prevent hanging
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(lambda: self._sftp.stat(path).st_mode & 0o40000 != 0)
-                    try:
-                        result = future.result(timeout=timeout)
-                        return result
-                    except concurrent.futures.TimeoutError:
-                        self.logger.warning(f"Checking if {path} is a directory timed out after {timeout} seconds")
-                        # Cancel the future if possible
-                        future.cancel()
-                        # Try to recover the connection
-                        self.disconnect()
-                        self.connect()
-                        retries += 1
-                        if retries >= max_retries:
-                            self.logger.error(f"Failed to check if {path} is a directory after {max_retries} attempts due to timeout")
-                            return False
-                        self.logger.warning(f"Retrying directory check (attempt {retries}) in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
+                for chunk in chunks:
+                    total_bytes += len(chunk)
+                    yield chunk
+                break
             except FileNotFoundError:
-                return False
-            except (socket.timeout, paramiko.ssh_exception.SSHException, socket.error, IOError) as e:
-                retries += 1
-                if retries >= max_retries:
-                    self.logger.error(f"Failed to check if {path} is a directory after {max_retries} attempts: {e}")
-                    return False
-
-                self.logger.warning(f"Directory check attempt {retries} failed: {e}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                # Exponential backoff
-                retry_delay *= 2
-            except Exception as e:
-                self.logger.error(f"Error checking if {path} is a directory: {e}")
-                return False
+                raise
+            except socket.timeout as e:
+                self.logger.warning(f"Attempt to stream file {path} timed out after {timeout} seconds")
+                error = e
+            except (paramiko.ssh_exception.SSHException, socket.error, IOError, EOFError) as e:
+                error = e
+            finally:
+                # Stops the read on its session when the caller abandons the file
+                chunks.close()
+
+            retries += 1
+            if retries >= max_retries:
+                self.logger.error(f"Failed to stream file {path} after {max_retries} attempts: {error}")
+                raise error
 
-        # If we get here, all retries failed
-        return False
+            self.logger.warning(
+                f"Attempt {retries} to stream file {path} failed at byte {total_bytes}: {error}. "
+                f"Resuming in {retry_delay} seconds..."
+            )
+            time.sleep(retry_delay)
+            # Exponential backoff
+            retry_delay *= 2
+        self._log_transfer_rate(path, total_bytes, time.monotonic() - started_at)
 
     def get_file_content(self, path: str) -> bytes:
         """Get the content of a file with retry logic and timeout handling.
@@ -363,81 +962,47 @@ class SFTPClient:
             path: The file path.
 
         Returns:
-            The file content as bytes.
+            The file content as bytes, empty if the file does not exist.
+
+        Raises:
+            Exception: If the file could not be read once retries ran out. A
+                failed download must not look like an empty file, or the
+                location would be bookmarked without its records.
         """
         self.connect()
         self.logger.info(f"Starting to read file: {path}")
 
-        # Retry parameters
-        max_retries = 5  # Increased from 3 to 5
-        retry_delay = 2  # seconds
-        retries = 0
-
         # Set a timeout for the file read operation
         timeout = 300  # Increased from 60 to 300 seconds (5 minutes)
 
-        # Set chunk size for reading large files
-        chunk_size = 1024 * 1024  # 1MB chunks
+        try:
+            return self._fetch_file(path, timeout)
+        except FileNotFoundError:
+            self.logger.warning(f"File not found: {path}")
+            return b""  # Return empty bytes instead of raising an error
+        except Exception as e:
+            self.logger.error(f"Error reading file {path}: {e}")
+            raise
 
-        while retries < max_retries:
-            try:
-                # Use a separate thread with a timeout to prevent hanging
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    # Define a function to read the file in chunks
-                    def read_file_chunked():
-                        buffer = io.BytesIO()
-                        total_bytes = 0
-                        with self._sftp.open(path, "rb") as f:
-                            while True:
-                                chunk = f.read(chunk_size)
-                                if not chunk:
-                                    break
-                                buffer.write(chunk)
-                                total_bytes += len(chunk)
-                                # Log progress for large files
-                                if total_bytes % (10 * chunk_size) == 0:  # Log every 10MB
-                                    self.logger.info(f"Read {total_bytes / (1024 * 1024):.2f} MB from {path}")
-                        return buffer.getvalue()
-
-                    future = executor.submit(read_file_chunked)
-                    try:
-                        result = future.result(timeout=timeout)
-                        self.logger.info(f"Successfully read {len(result)} bytes from {path}")
-                        return result
-                    except concurrent.futures.TimeoutError:
-                        self.logger.warning(f"Reading file {path} timed out after {timeout} seconds")
-                        # Cancel the future if possible
-                        future.cancel()
-                        # Try to recover the connection
-                        self.disconnect()
-                        self.connect()
-                        retries += 1
-                        if retries >= max_retries:
-                            self.logger.error(f"Failed to read file {path} after {max_retries} attempts due to timeout")
-                            return b""
-                        self.logger.warning(f"Retrying file read (attempt {retries}) in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-            except FileNotFoundError:
-                self.logger.warning(f"File not found: {path}")
-                return b""  # Return empty bytes instead of raising an error
-            except (socket.timeout, paramiko.ssh_exception.SSHException, socket.error, IOError) as e:
-                retries += 1
-                if retries >= max_retries:
-                    self.logger.error(f"Failed to read file {path} after {max_retries} attempts: {e}")
-                    return b""  # Return empty bytes instead of raising an error
+    def _fetch_file(self, path: str, timeout: float) -> bytes:
+        """Download a whole remote file, retrying transient errors.
 
-                self.logger.warning(f"File read attempt {retries} failed: {e}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                # Exponential backoff
-                retry_delay *= 2
-            except Exception as e:
-                self.logger.error(f"Error reading file {path}: {e}")
-                return b""
+        Args:
+            path: The file path.
+            timeout: Maximum time for each download attempt in seconds.
+
+        Returns:
+            The file content as bytes.
 
-        # If we get here, all retries failed
-        return b""
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        return self._call_with_retries(
+            f"read file {path}",
+            lambda sftp: self._read_file(sftp, path, timeout),
+            timeout=timeout,
+            max_retries=5,
+        )
 
     def __enter__(self):
         """Enter context manager."""
@@ -451,6 +1016,10 @@ class SFTPClient:
     def get_cached_file_content(self, location_id: str, date_folder: str, file_path: str) -> bytes:
         """Get file content from cache if available, otherwise download and cache it.
 
+        The cache holds at most file_cache_max_bytes of content. When a new file
+        does not fit, the least recently used files are evicted first. Threads
+        asking for a file that is already being downloaded wait for that download.
+
         Args:
             location_id: The location ID.
             date_folder: The date folder name.
@@ -459,22 +1028,69 @@ class SFTPClient:
         Returns:
             The file content as bytes.
         """
-        # Initialize cache structure if needed
-        if location_id not in self._file_content_cache:
-            self._file_content_cache[location_id] = {}
-        if date_folder not in self._file_content_cache[location_id]:
-            self._file_content_cache[location_id][date_folder] = {}
-
-        # Check if content is already cached
-        if file_path in self._file_content_cache[location_id][date_folder]:
-            self.logger.debug(f"Using cached content for {file_path}")
-            return self._file_content_cache[location_id][date_folder][file_path]
+        key = (location_id, date_folder, file_path)
+
+        # Check if content is already cached or being downloaded
+        with self._file_cache_lock:
+            content = self._file_content_cache.get(key)
+            if content is not None:
+                self._file_content_cache.move_to_end(key)
+                self.file_cache_hits += 1
+                self.logger.debug(f"Using cached content for {file_path}")
+                return content
+            download = self._file_downloads.get(key)
+            in_progress = download is not None
+            if in_progress:
+                self.file_cache_hits += 1
+            else:
+                download = self._file_downloads[key] = Future()
+                self.file_cache_misses += 1
+
+        if in_progress:
+            self.logger.debug(f"Waiting for another thread downloading {file_path}")
+            return download.result()
 
         # Download and cache content
         self.logger.info(f"Downloading and caching content for {file_path}")
-        content = self.get_file_content(file_path)
-        self._file_content_cache[location_id][date_folder][file_path] = content
-        return content
+        try:
+            content = self.get_file_content(file_path)
+            self._cache_file_content(key, content)
+            download.set_result(content)
+            return content
+        except BaseException as e:
+            download.set_exception(e)
+            raise
+        finally:
+            with self._file_cache_lock:
+                self._file_downloads.pop(key, None)
+
+    def _cache_file_content(self, key: tuple[str, str, str], content: bytes) -> None:
+        """Store file content in the cache, evicting least recently used files to fit.
+
+        Args:
+            key: The (location_id, date_folder, file_path) cache key.
+            content: The file content.
+        """
+        if len(content) > self.file_cache_max_bytes:
+            self.logger.info(
+                f"Not caching {key[2]}: {len(content)} bytes exceeds the file cache budget of "
+                f"{self.file_cache_max_bytes} bytes"
+            )
+            return
+
+        with self._file_cache_lock:
+            previous = self._file_content_cache.pop(key, None)
+            if previous is not None:
+                self.file_cache_bytes -= len(previous)
+
+            while self._file_content_cache and self.file_cache_bytes + len(content) > self.file_cache_max_bytes:
+                (_, _, evicted_path), evicted = self._file_content_cache.popitem(last=False)
+                self.file_cache_bytes -= len(evicted)
+                self.file_cache_evictions += 1
+                self.logger.debug(f"Evicted {evicted_path} ({len(evicted)} bytes) from file content cache")
+
+            self._file_content_cache[key] = content
+            self.file_cache_bytes += len(content)
 
     def clear_file_cache(self, location_id: str = None, date_folder: str = None):
         """Clear the file content cache.
@@ -483,24 +1099,351 @@ class SFTPClient:
             location_id: Optional location ID to clear cache for specific location.
             date_folder: Optional date folder to clear cache for specific date.
         """
-        if location_id is None:
-            self._file_content_cache = {}
-            self.logger.info("Cleared entire file content cache")
-        elif date_folder is None and location_id in self._file_content_cache:
-            self._file_content_cache[location_id] = {}
+        with self._file_cache_lock:
+            if location_id is None:
+                self._file_content_cache = OrderedDict()
+                self.file_cache_bytes = 0
+                self.logger.info("Cleared entire file content cache")
+                return
+
+            for key in list(self._file_content_cache):
+                if key[0] == location_id and (date_folder is None or key[1] == date_folder):
+                    self.file_cache_bytes -= len(self._file_content_cache.pop(key))
+
+        if date_folder is None:
             self.logger.info(f"Cleared file content cache for location {location_id}")
-        elif (location_id in self._file_content_cache and
-              date_folder in self._file_content_cache[location_id]):
-            self._file_content_cache[location_id][date_folder] = {}
+        else:
             self.logger.info(f"Cleared file content cache for location {location_id}, date {date_folder}")
 
+    def set_file_consumers(self, consumers: dict[str, int]) -> None:
+        """Register how many streams read each file.
+
+        Files matching a registered name or pattern are released from the cache
+        once release_file_content has been called by every consumer. Files not
+        covered by any registration are only evicted by the LRU budget.
+
+        Args:
+            consumers: Mapping of file name or fnmatch pattern to the number of
+                selected streams reading it.
+        """
+        with self._file_cache_lock:
+            self._file_consumers = dict(consumers)
+            self._file_consumers_remaining = {}
+        self.logger.info(f"Registered file consumers: {consumers}")
+
+    def _count_file_consumers(self, file_path: str) -> t.Optional[int]:
+        """Count the registered consumers of a file.
+
+        Args:
+            file_path: The full file path.
+
+        Returns:
+            The number of consuming streams, or None if the file is not registered.
+        """
+        file_name = posixpath.basename(file_path)
+        counts = [
+            count for pattern, count in self._file_consumers.items()
+            if fnmatch.fnmatch(file_name, pattern)
+        ]
+        return sum(counts) if counts else None
+
+    def release_file_content(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        all_consumers: bool = False,
+    ) -> None:
+        """Signal that a stream is done with a file, freeing it after the last consumer.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            all_consumers: Free the file right away, e.g. when its content has
+                been turned into rows for every consumer at once.
+        """
+        key = (location_id, date_folder, file_path)
+        with self._file_cache_lock:
+            if not all_consumers:
+                remaining = self._file_consumers_remaining.get(key)
+                if remaining is None:
+                    remaining = self._count_file_consumers(file_path)
+                    if remaining is None:
+                        return
+                remaining -= 1
+                if remaining > 0:
+                    self._file_consumers_remaining[key] = remaining
+                    return
+
+            self._file_consumers_remaining.pop(key, None)
+            content = self._file_content_cache.pop(key, None)
+            if content is None:
+                return
+            self.file_cache_bytes -= len(content)
+            self.file_cache_releases += 1
+        self.logger.debug(f"Released {file_path} ({len(content)} bytes) from file content cache")
+
+    def get_file_cache_stats(self) -> dict:
+        """Get size and hit/miss/eviction counters of the file content cache.
+
+        Returns:
+            A dictionary of file cache metrics.
+        """
+        with self._file_cache_lock:
+            return {
+                "hits": self.file_cache_hits,
+                "misses": self.file_cache_misses,
+                "evictions": self.file_cache_evictions,
+                "releases": self.file_cache_releases,
+                "entries": len(self._file_content_cache),
+                "bytes": self.file_cache_bytes,
+                "max_bytes": self.file_cache_max_bytes,
+            }
+
+
+# Queue marker put by a location worker once its location is fully processed
+_LOCATION_DONE = object()
+
+
+def location_shard(location_id: str, shard_count: int) -> int:
+    """Get the shard a location belongs to.
+
+    The shard is derived from an MD5 hash of the location ID rather than the
+    built-in hash(), which is salted per process, so every tap replica assigns
+    a location to the same shard.
+
+    Args:
+        location_id: The location ID.
+        shard_count: The number of shards.
+
+    Returns:
+        The shard index, from 0 to shard_count - 1.
+    """
+    digest = hashlib.md5(str(location_id).encode("utf-8")).hexdigest()
+    return int(digest, 16) % shard_count
+
+
+class LocationPipeline:
+    """Processes locations on worker threads ahead of the thread emitting their records.
+
+    Every location has its own queue of record batches, so the emitting thread
+    reads the locations one after another, in order, while the workers already
+    download and parse the following ones. A worker blocks once its location's
+    queue holds location_queue_size batches, which bounds the records buffered
+    ahead of a slow target.
+    """
+
+    def __init__(
+        self,
+        stream: ToastSFTPStream,
+        location_ids: list[str],
+        process_func: t.Callable[[str, str], t.Iterable[dict]],
+        workers: int,
+    ) -> None:
+        """Start processing the locations.
+
+        Args:
+            stream: The stream the locations are processed for.
+            location_ids: The location IDs, in the order they are read.
+            process_func: A function that processes a folder and yields records.
+            workers: The number of locations processed at the same time.
+        """
+        self.stream = stream
+        self.process_func = process_func
+        self.location_ids = list(location_ids)
+        self._stop = threading.Event()
+        # With the asyncio transport, the files of the locations up to
+        # prefetch_window locations ahead of the one being read are downloaded
+        # before a worker gets to them. The window keeps the prefetched files
+        # within the file cache budget, so they are not evicted before use.
+        self.prefetch_window = 2 * workers if stream.transport == "asyncio" else 0
+        # Locations a worker has started or whose files were prefetched, never prefetched again
+        self._prefetch_lock = threading.Lock()
+        self._started: set[str] = set()
+        self._prefetched: set[str] = set()
+        self._prefetch_ahead(0)
+        # Structure: {location_id: Queue[list[dict] | Exception | _LOCATION_DONE]}, unread locations only
+        self._queues = {
+            location_id: queue.Queue(maxsize=stream.location_queue_size)
+            for location_id in location_ids
+        }
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{stream.name}-location")
+        # Submitted in read order, so the location being read always has a worker
+        # The queue is handed over at submission, iter_records may pop it before the worker starts
+        for location_id, output in self._queues.items():
+            self._executor.submit(self._run, location_id, output)
+
+    @property
+    def next_location(self) -> t.Optional[str]:
+        """Get the location to be read next.
+
+        Returns:
+            The first unread location ID, or None once every location was read.
+        """
+        return next(iter(self._queues), None)
+
+    @property
+    def pending(self) -> int:
+        """Get the number of locations not read yet.
+
+        Returns:
+            The number of unread locations.
+        """
+        return len(self._queues)
+
+    def _prefetch_ahead(self, position: int) -> None:
+        """Prefetch the files of the locations in the window after a position.
+
+        Locations already started by a worker are skipped. Their files may already
+        be parsed and released, and prefetching them would download them twice.
+
+        Args:
+            position: The index of the location being read.
+        """
+        if not self.prefetch_window:
+            return
+        window = self.location_ids[position:position + self.prefetch_window]
+        # Held while scheduling, so a worker cannot start and release a file in between
+        with self._prefetch_lock:
+            location_ids = [
+                location_id for location_id in window
+                if location_id not in self._started and location_id not in self._prefetched
+            ]
+            if not location_ids:
+                return
+            self._prefetched.update(location_ids)
+            try:
+                self.stream.prefetch_location_files(location_ids)
+            except Exception as e:
+                # Only an optimization, the workers download what is missing
+                self.stream.logger.warning(f"Could not prefetch files of locations {location_ids}: {e}")
+
+    def _put(self, output: queue.Queue, item: t.Any) -> bool:
+        """Wait for room in a location's queue, giving up once the pipeline is closed.
+
+        Args:
+            output: The location's queue.
+            item: The batch, error or done marker to put.
+
+        Returns:
+            True if the item was put, False if the pipeline was closed.
+        """
+        while not self._stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, location_id: str, output: queue.Queue) -> None:
+        """Process a location on a worker thread.
+
+        Args:
+            location_id: The location ID.
+            output: The location's queue.
+        """
+        with self._prefetch_lock:
+            self._started.add(location_id)
+        try:
+            batch = []
+            for record in self.stream.process_date_folders_parallel(location_id, self.process_func):
+                batch.append(record)
+                if len(batch) >= self.stream.location_batch_size:
+                    if not self._put(output, batch):
+                        return
+                    batch = []
+            if batch:
+                self._put(output, batch)
+        except Exception as e:
+            # Re-raised in the emitting thread, like an error of a sequential run
+            self._put(output, e)
+        finally:
+            self._put(output, _LOCATION_DONE)
+
+    def iter_records(self, location_id: str) -> t.Iterator[dict]:
+        """Read the records of a location as its worker produces them.
+
+        Args:
+            location_id: The location ID.
+
+        Yields:
+            Record-type dictionary objects.
+        """
+        output = self._queues.pop(location_id)
+        self._prefetch_ahead(self.location_ids.index(location_id))
+        while True:
+            item = output.get()
+            if item is _LOCATION_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+
+    def close(self) -> None:
+        """Stop the workers, including those blocked on a full queue."""
+        self._stop.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_file_in_process(
+    stream_class: type[ToastSFTPStream],
+    config: dict,
+    method: str,
+    args: tuple,
+) -> tuple[list[str], list[tuple]]:
+    """Parse a file in a parse worker process.
+
+    Records of a file share their keys, so they are sent back as one key list
+    and a tuple of values per record, which pickles far smaller than dicts.
+
+    Args:
+        stream_class: The class of the stream the file belongs to.
+        config: The tap config.
+        method: The name of the stream's parsing method.
+        args: The arguments of the parsing method, including the file content.
+
+    Returns:
+        The record keys and the values of each record.
+    """
+    stream = stream_class.for_parse_worker(config)
+    keys: list[str] = []
+    rows = []
+    for record in getattr(stream, method)(*args):
+        if not keys:
+            keys = list(record)
+        rows.append(tuple(record.values()))
+    return keys, rows
+
 
 class ToastSFTPStream(Stream):
     """Stream class for ToastSFTP streams."""
 
-    # Class-level cache for processed records
-    # Structure: {stream_name: {context_hash: [records]}}
-    _record_cache = {}
+    # Default number of locations processed concurrently, overridden by the
+    # location_workers setting
+    max_workers = 4
+
+    # Records are handed from location workers to the emitting thread in batches of
+    # location_batch_size through a queue per location holding at most
+    # location_queue_size batches. Workers block while their queue is full, so a
+    # slow target throttles the downloads.
+    location_batch_size = 500
+    location_queue_size = 8
+
+    # Class-level disk-backed cache for processed records, created on first use when
+    # the record_cache setting is enabled
+    _record_cache: t.Optional[RecordCache] = None
+    _record_cache_lock = threading.Lock()
+
+    # Class-level cache of discovered date folders, shared by all streams for the run
+    # Structure: {location_id: [latest_date_folder]}
+    _date_folder_cache = {}
+
+    # Class-level pool of parse worker processes, created on first use when the
+    # parse_processes setting is enabled and shared by all streams
+    _parse_pool: t.Optional[ProcessPoolExecutor] = None
+    _parse_pool_lock = threading.Lock()
 
     def __init__(self, tap=None, shared_sftp_client=None):
         """Initialize the stream.
@@ -516,6 +1459,13 @@ class ToastSFTPStream(Stream):
         self.generate_unique_ids = True
         # Flag to indicate if records have been cached
         self._records_cached = False
+        # Locations processed ahead of their partitions, see process_partition
+        self._location_pipeline: t.Optional[LocationPipeline] = None
+        # Latest date folder synced per location, read from the incoming STATE
+        # Structure: {location_id: date_folder}
+        self._location_bookmarks: dict[str, str] = {}
+        # Locations whose date folder failed, not bookmarked
+        self._failed_locations: set[str] = set()
 
     @property
     def sftp_client(self) -> SFTPClient:
@@ -525,7 +1475,7 @@ class ToastSFTPStream(Stream):
             The SFTP client.
         """
         if self._sftp_client is None:
-            self._sftp_client = SFTPClient(self.config)
+            self._sftp_client = SFTPClient.for_config(self.config)
         return self._sftp_client
 
     def connect_sftp(self) -> None:
@@ -572,13 +1522,40 @@ class ToastSFTPStream(Stream):
         with schema_path.open("r", encoding="utf-8") as schema_file:
             return json.load(schema_file)
 
+    @property
+    def shard(self) -> t.Optional[tuple[int, int]]:
+        """Get the shard of the locations this tap process syncs.
+
+        Returns:
+            The (shard_index, shard_count) settings, or None when sharding is off.
+
+        Raises:
+            ConfigValidationError: If shard_index is not below shard_count.
+        """
+        shard_count = int(self.config.get("shard_count") or 1)
+        shard_index = int(self.config.get("shard_index") or 0)
+        if shard_count <= 1:
+            return None
+        if not 0 <= shard_index < shard_count:
+            raise ConfigValidationError(
+                f"shard_index must be between 0 and shard_count - 1 ({shard_count - 1}), got {shard_index}"
+            )
+        return shard_index, shard_count
+
     def get_location_ids(self) -> list[str]:
         """Get the list of location IDs from the config.
 
+        When sharding is on, only the locations of this process's shard are returned.
+
         Returns:
             List of location ID strings.
         """
-        return [location["id"] for location in self.locations]
+        location_ids = [location["id"] for location in self.locations]
+        shard = self.shard
+        if shard is None:
+            return location_ids
+        shard_index, shard_count = shard
+        return [location_id for location_id in location_ids if location_shard(location_id, shard_count) == shard_index]
 
     def get_cached_file_content(self, location_id: str, date_folder: str, file_path: str) -> bytes:
         """Get file content from cache if available, otherwise download and cache it.
@@ -594,6 +1571,33 @@ class ToastSFTPStream(Stream):
         # Use the SFTP client's cache method
         return self.sftp_client.get_cached_file_content(location_id, date_folder, file_path)
 
+    @property
+    def file_key(self) -> t.Optional[str]:
+        """Get the name or pattern of the files this stream reads.
+
+        Returns:
+            The stream's file_name or file_pattern, if any.
+        """
+        return getattr(self, "file_name", None) or getattr(self, "file_pattern", None)
+
+    def release_file_content(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        all_consumers: bool = False,
+    ) -> None:
+        """Signal that this stream is done with a cached file.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            all_consumers: Free the file regardless of the other consumers.
+        """
+        # Use the SFTP client's reference counting
+        self.sftp_client.release_file_content(location_id, date_folder, file_path, all_consumers)
+
     def clear_file_cache(self, location_id: str = None, date_folder: str = None):
         """Clear the file content cache.
 
@@ -619,58 +1623,70 @@ class ToastSFTPStream(Stream):
         # Replace {location_id} placeholder with actual location ID
         return base_path.replace("{location_id}", location_id)
 
-    def get_date_folders(self, location_id: str) -> list[str]:
+    def get_date_folders(
+        self,
+        location_id: str,
+        listing: t.Optional[list[paramiko.SFTPAttributes]] = None,
+    ) -> list[str]:
         """Get the list of date folders for a specific location.
 
         Only returns the latest date folder based on folder name (expected format: YYYYMMDD).
-        Optimized for performance with large numbers of folders by using a heuristic approach
-        to identify date folders without checking if each item is a directory.
+        The location directory is listed once with attributes, so folder names and
+        their directory bit come back in a single round trip. The result is memoized
+        per location for the whole run, so the other streams reuse it.
 
         Args:
             location_id: The location ID.
+            listing: The location directory's entries, if already listed.
 
         Returns:
             List containing only the latest date folder name, or empty list if none found.
         """
+        if location_id in self._date_folder_cache:
+            return list(self._date_folder_cache[location_id])
+
         location_path = f"/{location_id}"
         self.logger.info(f"Finding latest date folder in {location_path}")
 
         try:
-            # Use the existing SFTP client connection
-            # Get all items in the location directory
-            all_items = self.sftp_client.list_files(location_path)
+            # Get all items in the location directory along with their modes
+            all_items = self.sftp_client.list_dir_attrs(location_path) if listing is None else listing
 
             if not all_items:
+                # Not memoized, the listing may have failed transiently
                 self.logger.info(f"No items found in {location_path}")
                 return []
 
-            # Filter potential date folders based on naming pattern (8 digits)
-            # This avoids having to check if each item is a directory
+            # Filter date folders based on naming pattern (8 digits) and the directory bit.
+            # Servers that do not report modes are trusted on the name alone.
             potential_date_folders = [
-                item for item in all_items
-                if item.isdigit() and len(item) == 8
+                item.filename for item in all_items
+                if item.filename.isdigit() and len(item.filename) == 8
+                and (item.st_mode is None or stat.S_ISDIR(item.st_mode))
             ]
 
             if not potential_date_folders:
                 self.logger.info(f"No potential date folders found in {location_path}")
+                self._date_folder_cache[location_id] = []
                 return []
 
             # Find the latest date folder
             latest_folder = max(potential_date_folders)
 
-            # Verify that the latest folder is actually a directory
-            # We only need to check one folder instead of all of them
-            latest_folder_path = f"{location_path}/{latest_folder}"
-            if not self.sftp_client.is_directory(latest_folder_path):
-                self.logger.warning(f"Latest potential date folder {latest_folder} is not a directory")
-                return []
-
             self.logger.info(f"Found {len(potential_date_folders)} potential date folders. Using latest: {latest_folder}")
+            self._date_folder_cache[location_id] = [latest_folder]
             return [latest_folder]  # Return a list with only the latest folder
         except Exception as e:
             self.logger.error(f"Error getting date folders for location {location_id}: {e}")
             return []
 
+    @classmethod
+    def clear_date_folder_cache(cls) -> None:
+        """Clear the memoized date folders for all locations."""
+        cls._date_folder_cache = {}
+        logger = logging.getLogger("tap-toast-sftp.ToastSFTPStream")
+        logger.info("Cleared date folder cache")
+
     def process_date_folder(
         self,
         location_id: str,
@@ -692,6 +1708,7 @@ class ToastSFTPStream(Stream):
             yield from process_func(location_id, date_folder)
         except Exception as e:
             self.logger.error(f"Error processing date folder {date_folder} for location {location_id}: {e}")
+            self._failed_locations.add(location_id)
 
     def process_date_folders_parallel(
         self,
@@ -719,15 +1736,319 @@ class ToastSFTPStream(Stream):
 
         # We should only have one folder (the latest) due to the updated get_date_folders method
         latest_folder = date_folders[0]
+        bookmark = self._location_bookmarks.get(location_id)
+        if bookmark is not None and latest_folder <= bookmark:
+            self.logger.info(f"Date folder {latest_folder} of location {location_id} was already synced. Skipping.")
+            return
         self.logger.info(f"Processing latest date folder {latest_folder} for location {location_id}")
 
         try:
             yield from self.process_date_folder(location_id, latest_folder, process_func)
         except Exception as e:
             self.logger.error(f"Error processing folder {latest_folder} for location {location_id}: {e}")
+            self._failed_locations.add(location_id)
             # Return empty generator instead of raising an exception
             return
 
+    def _write_state_message(self) -> None:
+        """Write a STATE message with the latest state, unless streams sync concurrently.
+
+        A concurrent sync writes a single STATE message once every stream is done.
+        Skipping intermediate ones also keeps the shared state from being copied
+        while other streams update their bookmarks.
+        """
+        if getattr(self._tap, "is_syncing_concurrently", False):
+            return
+        super()._write_state_message()
+
+    @classmethod
+    def for_parse_worker(cls, config: dict) -> "ToastSFTPStream":
+        """Create a detached stream for parsing files in a parse worker process.
+
+        The stream has no tap and no SFTP client. It only carries the name, config
+        and logger the parsing methods use.
+
+        Args:
+            config: The tap config.
+
+        Returns:
+            The detached stream.
+        """
+        stream = cls.__new__(cls)
+        stream._config = dict(config)
+        stream.logger = logging.getLogger(f"tap-toast-sftp.{cls.name}")
+        stream._sftp_client = None
+        stream._owns_connection = False
+        stream.generate_unique_ids = True
+        return stream
+
+    @property
+    def parse_processes(self) -> int:
+        """Get the number of worker processes files are parsed in.
+
+        Returns:
+            The parse_processes setting, 0 to parse in the tap process.
+        """
+        return max(0, int(self.config.get("parse_processes") or 0))
+
+    def get_parse_pool(self) -> ProcessPoolExecutor:
+        """Get the shared pool of parse worker processes, creating it if needed.
+
+        Returns:
+            The process pool.
+        """
+        with ToastSFTPStream._parse_pool_lock:
+            if ToastSFTPStream._parse_pool is None:
+                self.logger.info(f"Starting {self.parse_processes} parse worker processes")
+                # Forking a process that holds SSH transport threads is unsafe, so
+                # workers start from a fresh interpreter
+                ToastSFTPStream._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return ToastSFTPStream._parse_pool
+
+    def parse_in_process(self, method: str, *args: t.Any) -> t.Iterator[dict]:
+        """Run one of the stream's parsing methods in a parse worker process.
+
+        The calling thread waits without holding the GIL, so files parsed for
+        different locations use several cores at once.
+
+        Args:
+            method: The name of the parsing method.
+            *args: The arguments of the parsing method, including the file content.
+
+        Yields:
+            The parsed records.
+        """
+        future = self.get_parse_pool().submit(parse_file_in_process, type(self), dict(self.config), method, args)
+        keys, rows = future.result()
+        for row in rows:
+            yield dict(zip(keys, row))
+
+    @classmethod
+    def shutdown_parse_pool(cls) -> None:
+        """Stop the parse worker processes."""
+        with ToastSFTPStream._parse_pool_lock:
+            if ToastSFTPStream._parse_pool is not None:
+                ToastSFTPStream._parse_pool.shutdown(wait=True, cancel_futures=True)
+                ToastSFTPStream._parse_pool = None
+                logger = logging.getLogger("tap-toast-sftp.ToastSFTPStream")
+                logger.info("Stopped parse worker processes")
+
+    @property
+    def transport(self) -> str:
+        """Get the SFTP transport.
+
+        Returns:
+            The transport setting, paramiko or asyncio.
+        """
+        return self.config.get("transport") or "paramiko"
+
+    def prefetch_file_paths(self, location_id: str, date_folder: str) -> list[str]:
+        """Get the paths of the files this stream reads whole from a date folder.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+
+        Returns:
+            The file paths to download ahead of processing the folder.
+        """
+        file_name = getattr(self, "file_name", None)
+        return [f"/{location_id}/{date_folder}/{file_name}"] if file_name else []
+
+    def prefetch_locations(self, location_ids: list[str]) -> None:
+        """Find the date folders of every location at once.
+
+        The location directories are listed together, bounded by the client's
+        sftp_max_requests, and the latest date folders are memoized. Listings are
+        small, so every location is listed up front. Files are only prefetched a
+        few locations ahead, see prefetch_location_files.
+
+        Args:
+            location_ids: The location IDs.
+        """
+        pending = [location_id for location_id in location_ids if location_id not in self._date_folder_cache]
+        if pending:
+            listings = self.sftp_client.list_dirs([f"/{location_id}" for location_id in pending])
+            for location_id in pending:
+                self.get_date_folders(location_id, listings.get(f"/{location_id}", []))
+
+    def prefetch_location_files(self, location_ids: list[str]) -> None:
+        """Schedule the download of the files of some locations into the file cache.
+
+        Args:
+            location_ids: The location IDs.
+        """
+        keys = [
+            (location_id, date_folder, file_path)
+            for location_id in location_ids
+            for date_folder in self.get_date_folders(location_id)
+            for file_path in self.prefetch_file_paths(location_id, date_folder)
+        ]
+        if keys:
+            self.sftp_client.prefetch_files(keys)
+
+    @property
+    def location_workers(self) -> int:
+        """Get the number of locations processed concurrently.
+
+        Returns:
+            The location_workers setting, or the stream's max_workers if unset.
+        """
+        return max(1, int(self.config.get("location_workers") or self.max_workers))
+
+    def process_locations(
+        self,
+        location_ids: list[str],
+        process_func: t.Callable[[str, str], t.Iterable[dict]],
+    ) -> t.Iterable[dict]:
+        """Process the latest date folder of every location, several locations at a time.
+
+        Each location is downloaded and parsed on a worker thread. The records are
+        yielded from the calling thread only, since the SDK's message writer is not
+        thread-safe. Locations are emitted one after another, in order, while the
+        workers process the following ones.
+
+        With the asyncio transport, every location is listed up front and the
+        files of the next locations are downloaded before a worker gets to them.
+
+        Args:
+            location_ids: The location IDs.
+            process_func: A function that processes a folder and yields records.
+
+        Yields:
+            Record-type dictionary objects.
+        """
+        if self.transport == "asyncio":
+            self.prefetch_locations(location_ids)
+
+        workers = min(self.location_workers, len(location_ids))
+        if workers <= 1:
+            for location_id in location_ids:
+                yield from self.process_date_folders_parallel(location_id, process_func)
+            return
+
+        self.logger.info(f"Processing {len(location_ids)} locations with {workers} workers")
+        pipeline = LocationPipeline(self, location_ids, process_func, workers)
+        try:
+            for location_id in location_ids:
+                yield from pipeline.iter_records(location_id)
+        finally:
+            # Stops the workers when the consumer stops early or an error is raised
+            pipeline.close()
+
+    @property
+    def partitions(self) -> t.Optional[list[dict]]:
+        """Get the stream partitions, one per location.
+
+        Each location has its own context, so the SDK keeps a bookmark per location
+        and writes STATE after each one. The bookmark is the latest date folder
+        synced, see bookmark_location. The locations of a sharded stream are
+        disjoint from the other shards', so the replicas' STATE never overlap.
+
+        Returns:
+            A context with the location_id of each location.
+        """
+        return [{"location_id": location_id} for location_id in self.get_location_ids()]
+
+    def process_partition(
+        self,
+        context: t.Optional[dict],
+        process_func: t.Callable[[str, str], t.Iterable[dict]],
+    ) -> t.Iterable[dict]:
+        """Process the location of a partition.
+
+        The SDK syncs partitions one after another. So that locations still
+        overlap, the first partition starts a LocationPipeline over its location
+        and the following partitions' locations, and the next partitions read
+        their records from it. Without a location in the context, every location
+        is processed.
+
+        A location whose latest date folder is not newer than its bookmark was
+        already synced and yields no records. Once a location's records were all
+        read, its bookmark is advanced and a STATE message is written, so a sync
+        that fails or is interrupted resumes after the locations finished before it.
+
+        Args:
+            context: The stream partition.
+            process_func: A function that processes a folder and yields records.
+
+        Yields:
+            Record-type dictionary objects.
+        """
+        if not context or "location_id" not in context:
+            yield from self.process_locations(self.get_location_ids(), process_func)
+            return
+
+        location_id = context["location_id"]
+        if self._location_pipeline is None or self._location_pipeline.next_location != location_id:
+            # Locations skipped by the SDK would hold workers forever, start over
+            self.close_location_pipeline()
+            self._location_bookmarks = self.read_location_bookmarks()
+            location_ids = [partition["location_id"] for partition in self.partitions or []]
+            upcoming = location_ids[location_ids.index(location_id):] if location_id in location_ids else [location_id]
+            if self.transport == "asyncio":
+                self.prefetch_locations(upcoming)
+
+            workers = min(self.location_workers, len(upcoming))
+            if workers <= 1:
+                yield from self.process_date_folders_parallel(location_id, process_func)
+                self.bookmark_location(context)
+                self._write_state_message()
+                return
+            self.logger.info(f"Processing {len(upcoming)} locations with {workers} workers")
+            self._location_pipeline = LocationPipeline(self, upcoming, process_func, workers)
+
+        pipeline = self._location_pipeline
+        try:
+            yield from pipeline.iter_records(location_id)
+        except BaseException:
+            # Stops the workers when the sync stops early or an error is raised
+            self.close_location_pipeline()
+            raise
+        self.bookmark_location(context)
+        self._write_state_message()
+        if not pipeline.pending:
+            self.close_location_pipeline()
+
+    def read_location_bookmarks(self) -> dict[str, str]:
+        """Read the latest date folder synced per location from the stream's STATE.
+
+        Returns:
+            Mapping of location ID to its bookmarked date folder.
+        """
+        return {
+            partition["context"]["location_id"]: partition["date_folder"]
+            for partition in self.stream_state.get("partitions", [])
+            if partition.get("date_folder") and "location_id" in partition.get("context", {})
+        }
+
+    def bookmark_location(self, context: dict) -> None:
+        """Record the latest date folder of a fully synced location in its partition's STATE.
+
+        A location whose date folder failed keeps its previous bookmark, so it
+        is synced again on the next run.
+
+        Args:
+            context: The location's partition.
+        """
+        location_id = context["location_id"]
+        if location_id in self._failed_locations:
+            return
+        # Memoized by the sync, so this does not list the location again
+        date_folders = self.get_date_folders(location_id)
+        if date_folders:
+            state = self.get_context_state(context)
+            state["date_folder"] = max(date_folders + [state.get("date_folder") or ""])
+
+    def close_location_pipeline(self) -> None:
+        """Stop processing locations ahead of their partitions."""
+        if self._location_pipeline is not None:
+            self._location_pipeline.close()
+            self._location_pipeline = None
+
     def generate_hash_id(self, record: dict) -> str:
         """Generate a hash-based unique identifier for a record.
 
@@ -747,9 +2068,8 @@ class ToastSFTPStream(Stream):
             if v is not None and v != ""
         }
 
-        # Convert to a string and hash it
-        content_str = json.dumps(hash_content, sort_keys=True)
-        return hashlib.md5(content_str.encode('utf-8')).hexdigest()
+        # Encode and hash it
+        return hashlib.md5(dumps_for_hash(hash_content)).hexdigest()
 
     def generate_uuid(self) -> str:
         """Generate a random UUID.
@@ -820,10 +2140,32 @@ class ToastSFTPStream(Stream):
             return "default"
 
         # Create a sorted, stable representation of the context for hashing
-        context_str = json.dumps(context, sort_keys=True)
-        return hashlib.md5(context_str.encode('utf-8')).hexdigest()
+        return hashlib.md5(dumps_for_hash(context)).hexdigest()
+
+    @property
+    def record_cache_enabled(self) -> bool:
+        """Whether emitted records are cached for re-reads within the run.
+
+        Returns:
+            True if the record_cache setting is enabled.
+        """
+        return bool(self.config.get("record_cache", False))
+
+    def get_record_cache(self) -> RecordCache:
+        """Get the record cache shared by all streams, creating it if needed.
+
+        Returns:
+            The shared RecordCache instance.
+        """
+        with ToastSFTPStream._record_cache_lock:
+            if ToastSFTPStream._record_cache is None:
+                ToastSFTPStream._record_cache = RecordCache(
+                    directory=self.config.get("record_cache_dir"),
+                    batch_size=self.config.get("record_cache_batch_size", 1000),
+                )
+            return ToastSFTPStream._record_cache
 
-    def cache_records(self, records: list[dict], context: t.Optional[dict] = None) -> None:
+    def cache_records(self, records: t.Iterable[dict], context: t.Optional[dict] = None) -> None:
         """Cache records for this stream with the given context.
 
         Args:
@@ -831,46 +2173,49 @@ class ToastSFTPStream(Stream):
             context: The context used to fetch these records.
         """
         context_hash = self._get_context_hash(context)
-
-        # Initialize cache structure if needed
-        if self.name not in self._record_cache:
-            self._record_cache[self.name] = {}
-
-        # Store the records in the cache
-        self._record_cache[self.name][context_hash] = records
+        writer = self.get_record_cache().writer(self.name, context_hash)
+        for record in records:
+            writer.append(record)
+        record_count = writer.commit()
         self._records_cached = True
-        self.logger.info(f"Cached {len(records)} records for stream {self.name} with context hash {context_hash}")
+        self.logger.info(f"Cached {record_count} records for stream {self.name} with context hash {context_hash}")
 
-    def get_cached_records(self, context: t.Optional[dict] = None) -> t.Optional[list[dict]]:
+    def get_cached_records(self, context: t.Optional[dict] = None) -> t.Optional[t.Iterable[dict]]:
         """Get cached records for this stream with the given context.
 
         Args:
             context: The context to get records for.
 
         Returns:
-            The cached records, or None if no cache exists.
+            An iterator over the cached records, or None if no cache exists.
         """
+        if ToastSFTPStream._record_cache is None:
+            return None
+
         context_hash = self._get_context_hash(context)
 
         # Check if records are cached
-        if (self.name in self._record_cache and
-            context_hash in self._record_cache[self.name]):
-            self.logger.info(f"Using {len(self._record_cache[self.name][context_hash])} cached records for stream {self.name}")
-            return self._record_cache[self.name][context_hash]
+        record_count = ToastSFTPStream._record_cache.count(self.name, context_hash)
+        if record_count is None:
+            return None
 
-        return None
+        self.logger.info(f"Using {record_count} cached records for stream {self.name}")
+        return ToastSFTPStream._record_cache.read(self.name, context_hash)
 
     def clear_record_cache(self) -> None:
         """Clear the record cache for this stream."""
-        if self.name in self._record_cache:
-            self._record_cache[self.name] = {}
+        if ToastSFTPStream._record_cache is not None:
+            ToastSFTPStream._record_cache.clear(self.name)
             self._records_cached = False
             self.logger.info(f"Cleared record cache for stream {self.name}")
 
     @classmethod
     def clear_all_record_caches(cls) -> None:
-        """Clear all record caches for all streams."""
-        cls._record_cache = {}
+        """Clear all record caches for all streams and remove the cache file."""
+        with ToastSFTPStream._record_cache_lock:
+            if ToastSFTPStream._record_cache is not None:
+                ToastSFTPStream._record_cache.close()
+                ToastSFTPStream._record_cache = None
         # We can't use self.logger in a class method, but we can create a logger
         # that's consistent with how other loggers are created in this file
         import logging
@@ -887,27 +2232,36 @@ class ToastSFTPStream(Stream):
         stream if partitioning is required for the stream. Most implementations do not
         require partitioning and should ignore the `context` argument.
 
+        Records are only cached when the record_cache setting is enabled. The cache
+        spills to disk in batches, so memory use does not grow with the stream size.
+
         Args:
             context: Stream partition or context dictionary.
 
         Yields:
             Record-type dictionary objects.
         """
+        if not self.record_cache_enabled:
+            yield from self._get_records(context)
+            return
+
         # Check if records are already cached
         cached_records = self.get_cached_records(context)
         if cached_records is not None:
-            for record in cached_records:
-                yield record
+            yield from cached_records
             return
 
-        # If not cached, fetch and cache the records
-        records = []
+        # If not cached, fetch and cache the records as they are emitted
+        context_hash = self._get_context_hash(context)
+        writer = self.get_record_cache().writer(self.name, context_hash)
         for record in self._get_records(context):
-            records.append(record)
+            writer.append(record)
             yield record
 
-        # Cache the records for future use
-        self.cache_records(records, context)
+        # Only a fully emitted context is marked as cached
+        record_count = writer.commit()
+        self._records_cached = True
+        self.logger.info(f"Cached {record_count} records for stream {self.name} with context hash {context_hash}")
 
     def _get_records(
         self,
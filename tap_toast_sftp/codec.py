@@ -0,0 +1,77 @@
+"""JSON codec used for parsing export files and hashing records.
+
+Decoding uses orjson or msgspec when one of them is installed (the ``fastjson``
+extra) and the standard library otherwise. The fast backends decode straight
+from the downloaded bytes. The standard library decodes the bytes to a str
+first, so it briefly holds a decoded copy of the file.
+
+Hash input is always encoded by the standard library. The fast encoders produce
+compact, non-ASCII-escaped output, which would change every generated ID.
+"""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the installed extras
+    msgspec = None
+
+# Decoding backend, the first installed of orjson, msgspec and the standard library
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+    _fast_loads = orjson.loads
+    _fast_errors: tuple = (orjson.JSONDecodeError,)
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+    _fast_loads = msgspec.json.decode
+    _fast_errors = (msgspec.DecodeError,)
+else:
+    JSON_BACKEND = "json"
+    _fast_loads = None
+    _fast_errors = ()
+
+# Encoder for hash input, built once instead of per json.dumps call
+_HASH_ENCODER = json.JSONEncoder(sort_keys=True)
+
+
+def loads_json(data: t.Union[bytes, str]) -> t.Any:
+    """Decode a JSON document.
+
+    Documents the fast backend rejects, like NaN literals, are decoded by the
+    standard library instead.
+
+    Args:
+        data: The JSON document, usually the raw file content.
+
+    Returns:
+        The decoded value.
+    """
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(data)
+        except _fast_errors:
+            pass
+    # json.loads detects the encoding of bytes itself
+    return json.loads(data)
+
+
+def dumps_for_hash(value: t.Any) -> bytes:
+    """Encode a value as the stable input of an MD5 hash.
+
+    The output is byte-identical to ``json.dumps(value, sort_keys=True).encode("utf-8")``.
+
+    Args:
+        value: The value to encode.
+
+    Returns:
+        The encoded value.
+    """
+    return _HASH_ENCODER.encode(value).encode("utf-8")
@@ -0,0 +1,205 @@
+"""Schema-driven type coercion for parsed file values.
+
+The JSON schema of a stream is compiled once into a plan of column kinds
+(integer, number, boolean, date-time). Parsed string values are then converted
+per column, in bulk for the vectorized CSV engines. Values that cannot be
+converted are kept as they are, so no data is lost on unexpected formats.
+"""
+
+from __future__ import annotations
+
+import datetime
+import math
+import typing as t
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Timestamp formats found in Toast exports, tried in order
+DATETIME_FORMATS = (
+    "%m/%d/%y %I:%M %p",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%y %I:%M:%S %p",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%y",
+    "%m/%d/%Y",
+    "%Y-%m-%d",
+)
+
+# Output format for coerced timestamps (ISO 8601 without a timezone, as exported)
+ISO_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+TRUE_VALUES = frozenset(("true", "t", "yes", "y", "1"))
+FALSE_VALUES = frozenset(("false", "f", "no", "n", "0"))
+
+
+def _clean_number(value: str) -> str:
+    """Strip currency symbols and thousands separators from a number."""
+    return value.strip().replace(",", "").replace("$", "")
+
+
+def to_number(value: str) -> t.Any:
+    """Convert a string to a float, keeping it unchanged if it is not a number.
+
+    Args:
+        value: The string value.
+
+    Returns:
+        The float value, None for NaN and infinity, or the original string.
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        try:
+            number = float(_clean_number(value))
+        except ValueError:
+            return value
+    # NaN and infinity are not valid JSON
+    return number if math.isfinite(number) else None
+
+
+def to_integer(value: str) -> t.Any:
+    """Convert a string to an int, keeping it unchanged if it is not an integer.
+
+    Args:
+        value: The string value.
+
+    Returns:
+        The int value, or the original string.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        number = to_number(value)
+        if isinstance(number, float) and number.is_integer():
+            return int(number)
+        return value
+
+
+def to_boolean(value: str) -> t.Any:
+    """Convert a string to a bool, keeping it unchanged if it is not a boolean.
+
+    Args:
+        value: The string value.
+
+    Returns:
+        The bool value, or the original string.
+    """
+    lowered = value.strip().lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    return value
+
+
+@lru_cache(maxsize=65536)
+def to_datetime_string(value: str) -> str:
+    """Convert a Toast timestamp to ISO 8601, keeping it unchanged if unrecognized.
+
+    Exports have minute resolution, so a file repeats a small set of timestamps
+    and results are memoized.
+
+    Args:
+        value: The string value.
+
+    Returns:
+        The ISO 8601 timestamp, or the original string.
+    """
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).strftime(ISO_DATETIME_FORMAT)
+        except ValueError:
+            continue
+    return value
+
+
+# Value converters by column kind
+CONVERTERS: dict[str, t.Callable[[str], t.Any]] = {
+    "integer": to_integer,
+    "number": to_number,
+    "boolean": to_boolean,
+    "date-time": to_datetime_string,
+}
+
+
+def property_kind(property_schema: dict) -> t.Optional[str]:
+    """Get the coercion kind of a schema property.
+
+    Args:
+        property_schema: The JSON schema of the property.
+
+    Returns:
+        "integer", "number", "boolean" or "date-time", or None for values that
+        stay strings.
+    """
+    types = property_schema.get("type", [])
+    if isinstance(types, str):
+        types = [types]
+    types = [type_ for type_ in types if type_ != "null"]
+    if "string" in types:
+        # Strings only change when they carry a date-time format
+        return "date-time" if property_schema.get("format") == "date-time" else None
+    for kind in ("integer", "number", "boolean"):
+        if kind in types:
+            return kind
+    return None
+
+
+def compile_coercion_plan(schema: dict) -> dict[str, str]:
+    """Compile a stream schema into the coercion kind of each typed property.
+
+    Args:
+        schema: The JSON schema of the stream.
+
+    Returns:
+        Mapping of property name to coercion kind, for properties that need one.
+    """
+    plan = {}
+    for name, property_schema in schema.get("properties", {}).items():
+        kind = property_kind(property_schema)
+        if kind is not None:
+            plan[name] = kind
+    return plan
+
+
+def coerce_series(kind: str, series: pd.Series) -> pd.Series:
+    """Convert a column of strings in bulk.
+
+    The whole column is converted at once when every value parses. Otherwise it
+    falls back to the per-value converter, so results match CONVERTERS.
+
+    Args:
+        kind: The coercion kind.
+        series: Object series of strings and None.
+
+    Returns:
+        An object series of converted values, with None for missing values.
+    """
+    present = series.notna()
+    if not present.any():
+        return series.astype(object).where(present, None)
+    values = series[present]
+    try:
+        if kind == "number":
+            converted = values.astype(float)
+            # NaN and infinity are not valid JSON
+            converted = converted.where(np.isfinite(converted))
+        elif kind == "integer":
+            converted = values.astype("int64")
+        elif kind == "date-time":
+            # A file repeats few distinct timestamps, so only the distinct ones are parsed
+            codes, uniques = pd.factorize(values)
+            parsed = np.array([to_datetime_string(value) for value in uniques], dtype=object)
+            converted = pd.Series(parsed[codes], index=values.index)
+        else:
+            raise ValueError(f"No bulk conversion for {kind}")
+    except (ValueError, TypeError, OverflowError):
+        converted = values.map(CONVERTERS[kind])
+    result = series.astype(object)
+    result[present] = converted.astype(object)
+    return result.where(result.notna(), None)
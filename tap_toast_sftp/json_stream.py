@@ -0,0 +1,207 @@
+"""Incremental JSON parsing for large export files.
+
+Parses the elements of a JSON array one at a time while the file downloads, so
+only the raw text and object tree of the current element are held in memory
+instead of the whole document. The standard library's C scanner does the
+actual decoding (``json.JSONDecoder.raw_decode``). This module only walks the
+document structure around the array and feeds the scanner more text when an
+element is not complete yet.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+import typing as t
+
+# Insignificant whitespace between JSON tokens
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JSONStreamReader:
+    """Decode JSON values one at a time from an iterator of byte chunks."""
+
+    def __init__(self, chunks: t.Iterable[bytes], encoding: str = "utf-8"):
+        """Initialize the reader.
+
+        Args:
+            chunks: The byte chunks of the document.
+            encoding: The text encoding of the document.
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._scanner = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, dropping the consumed text.
+
+        Returns:
+            False if the document has no more chunks.
+        """
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._decoder.decode(b"", final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return chunk is not None or bool(text)
+
+    def _read_more(self) -> bool:
+        """Read chunks until the unconsumed text has doubled.
+
+        Doubling keeps the number of retries for a large value logarithmic, so
+        a value spanning many chunks is not re-scanned once per chunk.
+
+        Returns:
+            False if the document has no more chunks.
+        """
+        wanted = 2 * (len(self._buffer) - self._pos) or 1
+        read = False
+        while len(self._buffer) - self._pos < wanted and self._fill():
+            read = True
+        return read
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            The next character, or an empty string at the end of the document.
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """Consume the next character, which must be one of the given characters.
+
+        Args:
+            characters: The allowed characters.
+
+        Returns:
+            The consumed character.
+
+        Raises:
+            ValueError: If the next character is not allowed.
+        """
+        char = self.peek()
+        if not char or char not in characters:
+            raise ValueError(f"Expected one of {characters!r} at offset {self._pos}, found {char!r}")
+        self._pos += 1
+        return char
+
+    def decode(self) -> t.Any:
+        """Decode the next complete JSON value.
+
+        Returns:
+            The decoded value.
+
+        Raises:
+            json.JSONDecodeError: If the value is malformed or the document ends early.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._scanner.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value may just be incomplete, retry once more text is in
+                if not self._read_more():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and type(value) in (int, float) and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> t.Iterator[t.Any]:
+        """Decode the elements of the array starting at the next character.
+
+        Yields:
+            The array elements, one at a time.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.expect(",]") == "]":
+                return
+
+    def iter_values(self, path: t.Sequence[str], bare_array: bool = False) -> t.Iterator[t.Any]:
+        """Decode the value at a path of object keys, one element at a time if it is an array.
+
+        Values of other keys on the way are decoded and discarded. Reading stops as
+        soon as the target value is complete, so the rest of the document is never
+        downloaded.
+
+        Args:
+            path: The object keys leading to the value.
+            bare_array: Accept an array at the top level in place of the path.
+
+        Yields:
+            The array elements, or the value itself if it is not an array.
+
+        Raises:
+            KeyError: If a key of the path is missing.
+            ValueError: If the document does not match the path.
+        """
+        char = self.peek()
+        if not char:
+            return
+        if char == "[" and (not path or bare_array):
+            yield from self.iter_array()
+            return
+        if not path:
+            yield self.decode()
+            return
+
+        self.expect("{")
+        if self.peek() == "}":
+            raise KeyError(path[0])
+        while True:
+            key = self.decode()
+            self.expect(":")
+            if key == path[0]:
+                yield from self.iter_values(path[1:])
+                return
+            self.decode()
+            if self.expect(",}") == "}":
+                raise KeyError(path[0])
+
+
+def iter_json_values(
+    chunks: t.Iterable[bytes],
+    path: t.Sequence[str] = (),
+    bare_array: bool = False,
+    encoding: str = "utf-8",
+) -> t.Iterator[t.Any]:
+    """Stream the values at a path of a JSON document.
+
+    Args:
+        chunks: The byte chunks of the document.
+        path: The object keys leading to the records, e.g. ("menus",).
+        bare_array: Accept an array at the top level in place of the path.
+        encoding: The text encoding of the document.
+
+    Yields:
+        The elements of the array at the path, or the value itself if it is not
+        an array. Nothing is yielded for an empty document.
+    """
+    try:
+        yield from JSONStreamReader(chunks, encoding).iter_values(path, bare_array)
+    finally:
+        if hasattr(chunks, "close"):
+            # Stopping early closes the download and releases its SFTP session
+            chunks.close()
@@ -0,0 +1,223 @@
+"""Disk-backed record cache for tap-toast-sftp streams."""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import threading
+import typing as t
+import zlib
+
+
+class RecordCache:
+    """Cache of emitted records that spills to an SQLite file on disk.
+
+    Records are buffered in memory up to `batch_size` records, then written as one
+    compressed segment. Only one batch per writer is ever held in memory, so memory
+    use scales with the batch size rather than with the size of the stream.
+    """
+
+    def __init__(self, directory: t.Optional[str] = None, batch_size: int = 1000):
+        """Initialize the cache.
+
+        Args:
+            directory: Directory to create the cache file in. Defaults to the system
+                temporary directory.
+            batch_size: Number of records buffered in memory before a segment is written.
+        """
+        self.batch_size = max(1, int(batch_size))
+        self.logger = logging.getLogger("tap-toast-sftp.RecordCache")
+
+        self._directory = tempfile.mkdtemp(prefix="tap-toast-sftp-records-", dir=directory)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(self._directory, "records.db"),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        # The cache only lives for the run, so durability is not needed
+        self._connection.execute("PRAGMA journal_mode=OFF")
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.execute(
+            "CREATE TABLE segments ("
+            "stream TEXT, context_hash TEXT, seq INTEGER, records BLOB, "
+            "PRIMARY KEY (stream, context_hash, seq))"
+        )
+        # A context only counts as cached once all of its segments were written
+        self._connection.execute(
+            "CREATE TABLE complete ("
+            "stream TEXT, context_hash TEXT, record_count INTEGER, "
+            "PRIMARY KEY (stream, context_hash))"
+        )
+        self.logger.info(f"Created record cache in {self._directory}")
+
+    def _delete(self, stream: str, context_hash: t.Optional[str] = None) -> None:
+        """Delete the segments of a stream, or of one of its contexts.
+
+        Args:
+            stream: The stream name.
+            context_hash: Optional context hash to limit the deletion to.
+        """
+        where = "stream = ?"
+        params = (stream,)
+        if context_hash is not None:
+            where += " AND context_hash = ?"
+            params = (stream, context_hash)
+        with self._lock:
+            self._connection.execute(f"DELETE FROM segments WHERE {where}", params)
+            self._connection.execute(f"DELETE FROM complete WHERE {where}", params)
+
+    def writer(self, stream: str, context_hash: str) -> RecordCacheWriter:
+        """Start caching the records of a stream context, replacing any previous ones.
+
+        Args:
+            stream: The stream name.
+            context_hash: The context hash.
+
+        Returns:
+            A writer to append the records to.
+        """
+        self._delete(stream, context_hash)
+        return RecordCacheWriter(self, stream, context_hash)
+
+    def _write_segment(self, stream: str, context_hash: str, seq: int, records: list[dict]) -> None:
+        """Write one batch of records as a compressed segment.
+
+        Args:
+            stream: The stream name.
+            context_hash: The context hash.
+            seq: The segment number.
+            records: The records of the segment.
+        """
+        blob = zlib.compress(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO segments VALUES (?, ?, ?, ?)",
+                (stream, context_hash, seq, blob),
+            )
+
+    def _mark_complete(self, stream: str, context_hash: str, record_count: int) -> None:
+        """Mark a stream context as fully cached.
+
+        Args:
+            stream: The stream name.
+            context_hash: The context hash.
+            record_count: The number of records cached.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO complete VALUES (?, ?, ?)",
+                (stream, context_hash, record_count),
+            )
+
+    def count(self, stream: str, context_hash: str) -> t.Optional[int]:
+        """Get the number of cached records of a stream context.
+
+        Args:
+            stream: The stream name.
+            context_hash: The context hash.
+
+        Returns:
+            The number of records, or None if the context is not fully cached.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT record_count FROM complete WHERE stream = ? AND context_hash = ?",
+                (stream, context_hash),
+            ).fetchone()
+        return row[0] if row else None
+
+    def read(self, stream: str, context_hash: str) -> t.Iterator[dict]:
+        """Read back the records of a stream context, one segment at a time.
+
+        Args:
+            stream: The stream name.
+            context_hash: The context hash.
+
+        Yields:
+            The cached records in the order they were written.
+        """
+        seq = 0
+        while True:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT records FROM segments WHERE stream = ? AND context_hash = ? AND seq = ?",
+                    (stream, context_hash, seq),
+                ).fetchone()
+            if row is None:
+                return
+            yield from pickle.loads(zlib.decompress(row[0]))
+            seq += 1
+
+    def clear(self, stream: t.Optional[str] = None, context_hash: t.Optional[str] = None) -> None:
+        """Clear the cached records of one stream context, one stream, or all streams.
+
+        Args:
+            stream: Optional stream name to clear.
+            context_hash: Optional context hash of the stream to limit the clearing to.
+        """
+        if stream is not None:
+            self._delete(stream, context_hash)
+            return
+        with self._lock:
+            self._connection.execute("DELETE FROM segments")
+            self._connection.execute("DELETE FROM complete")
+
+    def close(self) -> None:
+        """Close the cache and remove its file from disk."""
+        with self._lock:
+            self._connection.close()
+        shutil.rmtree(self._directory, ignore_errors=True)
+        self.logger.info(f"Removed record cache in {self._directory}")
+
+
+class RecordCacheWriter:
+    """Appends the records of one stream context to a RecordCache."""
+
+    def __init__(self, cache: RecordCache, stream: str, context_hash: str):
+        """Initialize the writer.
+
+        Args:
+            cache: The cache to write to.
+            stream: The stream name.
+            context_hash: The context hash.
+        """
+        self.cache = cache
+        self.stream = stream
+        self.context_hash = context_hash
+        self.record_count = 0
+        self._seq = 0
+        self._batch = []
+
+    def append(self, record: dict) -> None:
+        """Add a record, writing the batch to disk once it is full.
+
+        Args:
+            record: The record to cache.
+        """
+        self._batch.append(record)
+        self.record_count += 1
+        if len(self._batch) >= self.cache.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write the buffered batch as a segment."""
+        if not self._batch:
+            return
+        self.cache._write_segment(self.stream, self.context_hash, self._seq, self._batch)
+        self._seq += 1
+        self._batch = []
+
+    def commit(self) -> int:
+        """Write the remaining records and mark the context as fully cached.
+
+        Returns:
+            The number of records cached.
+        """
+        self._flush()
+        self.cache._mark_complete(self.stream, self.context_hash, self.record_count)
+        return self.record_count
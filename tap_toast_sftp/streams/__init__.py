@@ -9,6 +9,7 @@ from tap_toast_sftp.streams.house_account_export import HouseAccountExportStream
 from tap_toast_sftp.streams.item_selection_details import ItemSelectionDetailsStream
 from tap_toast_sftp.streams.kitchen_timings import KitchenTimingsStream
 from tap_toast_sftp.streams.menu_streams import (
+    MenuExportStream,
     MenuMenusStream,
     MenuGroupsStream,
     MenuItemsStream,
@@ -32,6 +33,7 @@ __all__ = [
     "HouseAccountExportStream",
     "ItemSelectionDetailsStream",
     "KitchenTimingsStream",
+    "MenuExportStream",
     "MenuMenusStream",
     "MenuGroupsStream",
     "MenuItemsStream",
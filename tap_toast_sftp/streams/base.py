@@ -3,18 +3,195 @@
 from __future__ import annotations
 
 import typing as t
+import codecs
 import csv
 import io
-import json
 import os
 import pandas as pd
 import concurrent.futures
 import hashlib
 import uuid
 from pathlib import Path
-from functools import partial
+from functools import cached_property, lru_cache, partial
+
+from singer_sdk.helpers._typing import TypeConformanceLevel
 
 from tap_toast_sftp.client import ToastSFTPStream, SCHEMAS_DIR
+from tap_toast_sftp.codec import loads_json
+from tap_toast_sftp.coercion import CONVERTERS, coerce_series, compile_coercion_plan
+from tap_toast_sftp.json_stream import iter_json_values
+
+# pyarrow is optional, install the "arrow" extra to use the pyarrow CSV engine
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pa_csv = None
+
+# python-calamine is optional, pandas uses it as the fastest Excel reader when installed
+try:
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAS_CALAMINE = False
+
+# Supported values of the csv_engine setting
+CSV_ENGINES = ("python", "pyarrow", "pandas")
+
+# Supported values of the excel_engine setting
+EXCEL_ENGINES = ("auto", "xlrd", "openpyxl", "calamine")
+
+# Leading bytes of legacy .xls (OLE2) and .xlsx (zip) workbooks
+XLS_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+XLSX_SIGNATURE = b"PK\x03\x04"
+
+
+@lru_cache(maxsize=None)
+def transform_field_name(field_name: str) -> str:
+    """Transform field names to snake_case.
+
+    This is a pure function of the field name, so results are memoized for the
+    whole process and every header is only normalized once.
+
+    Args:
+        field_name: The original field name.
+
+    Returns:
+        The transformed field name in snake_case.
+    """
+    # Replace spaces and special characters with underscores
+    transformed = field_name.lower().replace(' ', '_').replace('-', '_')
+
+    # Replace special characters with descriptive names
+    transformed = transformed.replace('%', 'pct').replace('#', 'num')
+
+    # Remove question marks (e.g., "void?" becomes "void")
+    transformed = transformed.replace('?', '')
+
+    # Replace parentheses and other special characters with underscores
+    transformed = transformed.replace('(', '').replace(')', '').replace('/', '_')
+
+    # Remove any duplicate underscores
+    while '__' in transformed:
+        transformed = transformed.replace('__', '_')
+
+    # Remove leading and trailing underscores
+    transformed = transformed.strip('_')
+
+    return transformed
+
+
+def iter_text_lines(chunks: t.Iterable[bytes], encoding: str = "utf-8") -> t.Iterator[str]:
+    """Decode byte chunks incrementally into lines.
+
+    Multi-byte characters split across chunk boundaries are handled by the
+    incremental decoder, so only one chunk and one partial line are held at a time.
+
+    Args:
+        chunks: The byte chunks of a file.
+        encoding: The text encoding of the file.
+
+    Yields:
+        The lines of the file, including their line endings.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        # The last piece is an incomplete line until the next newline arrives
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+class ChunkedFile(io.RawIOBase):
+    """Read-only binary file over an iterator of byte chunks.
+
+    Lets parsers that expect a file object, like pandas and pyarrow, read a
+    remote file while it is still downloading.
+    """
+
+    def __init__(self, chunks: t.Iterable[bytes]):
+        """Initialize the file.
+
+        Args:
+            chunks: The byte chunks of the file.
+        """
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        """Return True, the file is readable."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Read bytes into a pre-allocated buffer.
+
+        Args:
+            buffer: The buffer to fill.
+
+        Returns:
+            The number of bytes read, 0 at the end of the file.
+        """
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        """Close the file and the underlying chunk iterator."""
+        if not self.closed and hasattr(self._chunks, "close"):
+            # Closing the generator early releases its SFTP session
+            self._chunks.close()
+        super().close()
+
+
+def iter_record_blocks(binary: t.BinaryIO, block_size: int, quotechar: str = '"') -> t.Iterator[bytes]:
+    """Read a CSV file in blocks that each end at a record boundary.
+
+    A newline ends a record when an even number of quote characters precede it,
+    so newlines inside quoted values never split a block.
+
+    Args:
+        binary: The binary file object.
+        block_size: The number of bytes read at a time.
+        quotechar: The quote character of the file.
+
+    Yields:
+        Blocks of whole records. A record longer than block_size makes its block larger.
+    """
+    quote = quotechar.encode("utf-8")
+    pending = b""
+    while True:
+        chunk = binary.read(block_size)
+        if not chunk:
+            break
+        pending += chunk
+        # Search backwards for the last newline outside of quotes
+        end = len(pending)
+        quotes = pending.count(quote)
+        while True:
+            newline = pending.rfind(b"\n", 0, end)
+            if newline < 0:
+                break
+            quotes -= pending.count(quote, newline, end)
+            if quotes % 2 == 0:
+                yield pending[:newline + 1]
+                pending = pending[newline + 1:]
+                break
+            end = newline
+    if pending:
+        yield pending
 
 
 class CSVSFTPStream(ToastSFTPStream):
@@ -33,9 +210,31 @@ class CSVSFTPStream(ToastSFTPStream):
     # Batch size for processing records
     batch_size = 1000
 
-    # Maximum number of worker threads for parallel processing
+    # Rows per chunk parsed by the pandas engine
+    csv_chunk_rows = 10000
+
+    # Bytes per block parsed by the pyarrow engine
+    csv_block_size = 4 * 1024 * 1024
+
+    # Number of locations processed concurrently unless location_workers is set
     max_workers = 4
 
+    # Whether the missing pyarrow fallback has been logged
+    _pyarrow_fallback_logged = False
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the stream.
+
+        Args:
+            *args: Positional arguments for ToastSFTPStream.
+            **kwargs: Keyword arguments for ToastSFTPStream.
+        """
+        super().__init__(*args, **kwargs)
+        if self.coerce_types:
+            # Records are typed and limited to schema properties while parsing, so the
+            # SDK's per-record, per-field conformance pass can be skipped
+            self.TYPE_CONFORMANCE_LEVEL = TypeConformanceLevel.NONE
+
     def transform_field_name(self, field_name: str) -> str:
         """Transform field names to snake_case.
 
@@ -45,65 +244,459 @@ class CSVSFTPStream(ToastSFTPStream):
         Returns:
             The transformed field name in snake_case.
         """
-        # Replace spaces and special characters with underscores
-        transformed = field_name.lower().replace(' ', '_').replace('-', '_')
+        return transform_field_name(field_name)
 
-        # Replace special characters with descriptive names
-        transformed = transformed.replace('%', 'pct').replace('#', 'num')
+    @property
+    def csv_engine(self) -> str:
+        """Get the engine used to parse CSV files.
 
-        # Remove question marks (e.g., "void?" becomes "void")
-        transformed = transformed.replace('?', '')
+        Returns:
+            "python", "pyarrow" or "pandas". The pyarrow engine falls back to
+            pandas when pyarrow is not installed.
+        """
+        engine = self.config.get("csv_engine") or "python"
+        if engine not in CSV_ENGINES:
+            raise ValueError(f"Unsupported csv_engine '{engine}', expected one of {', '.join(CSV_ENGINES)}")
+        if engine == "pyarrow" and pa_csv is None:
+            if not CSVSFTPStream._pyarrow_fallback_logged:
+                self.logger.warning("csv_engine 'pyarrow' requires pyarrow, falling back to 'pandas'")
+                CSVSFTPStream._pyarrow_fallback_logged = True
+            return "pandas"
+        return engine
 
-        # Replace parentheses and other special characters with underscores
-        transformed = transformed.replace('(', '').replace(')', '').replace('/', '_')
+    def compile_header(self, header: list[str]) -> tuple[t.Optional[str], ...]:
+        """Compile a file's header row into the record keys of its columns.
 
-        # Remove any duplicate underscores
-        while '__' in transformed:
-            transformed = transformed.replace('__', '_')
+        Field names are normalized once per file instead of once per cell.
 
-        # Remove leading and trailing underscores
-        transformed = transformed.strip('_')
+        Args:
+            header: The raw header row.
 
-        return transformed
+        Returns:
+            The transformed field name of each column, in column order. With
+            coerce_types enabled, columns without a schema property are None.
+        """
+        columns = tuple(self.transform_field_name(name) for name in header)
+        if not self.coerce_types:
+            return columns
 
-    def process_csv_file(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
-        """Process a single CSV file.
+        # Columns without a schema property are keyed None and dropped from records
+        properties = self.schema.get("properties", {})
+        unmapped = [name for name in columns if name not in properties]
+        if unmapped:
+            self.logger.debug(f"Dropping columns not in the {self.name} schema: {', '.join(unmapped)}")
+        return tuple(name if name in properties else None for name in columns)
+
+    @property
+    def coerce_types(self) -> bool:
+        """Whether values are converted to their schema types while parsing.
+
+        Returns:
+            True if the coerce_types setting is enabled.
+        """
+        return bool(self.config.get("coerce_types", False))
+
+    @cached_property
+    def coercion_plan(self) -> dict[str, str]:
+        """Get the coercion kind of each typed property, compiled once per stream.
+
+        Returns:
+            Mapping of property name to "integer", "number", "boolean" or "date-time".
+        """
+        return compile_coercion_plan(self.schema)
+
+    def compile_coercions(self, columns: tuple[t.Optional[str], ...]) -> list[tuple[int, str]]:
+        """Get the columns of a file that need a type conversion.
+
+        Args:
+            columns: The compiled record key of each column.
+
+        Returns:
+            (column index, coercion kind) pairs, empty when coercion is disabled.
+        """
+        if not self.coerce_types:
+            return []
+        plan = self.coercion_plan
+        return [(index, plan[name]) for index, name in enumerate(columns) if name in plan]
+
+    @property
+    def csv_streaming(self) -> bool:
+        """Whether CSV files are parsed while they download instead of after.
+
+        Returns:
+            True if the csv_streaming setting is enabled.
+        """
+        return bool(self.config.get("csv_streaming", False))
+
+    def prefetch_file_paths(self, location_id: str, date_folder: str) -> list[str]:
+        """Get the paths of the files this stream reads whole from a date folder.
+
+        Streamed CSV files are parsed while they download, so they are not prefetched.
 
         Args:
             location_id: The location ID.
             date_folder: The date folder name.
 
-        Yields:
-            Record-type dictionary objects.
+        Returns:
+            The file paths to download ahead of processing the folder.
         """
-        file_path = f"/{location_id}/{date_folder}/{self.file_name}"
-        self.logger.info(f"Processing file {file_path} for location {location_id}, date {date_folder}")
+        if self.csv_streaming and not self.parse_processes:
+            return []
+        return super().prefetch_file_paths(location_id, date_folder)
+
+    def open_csv_lines(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        content: t.Optional[bytes] = None,
+    ) -> t.Optional[t.Iterable[str]]:
+        """Open the lines of a CSV file for the csv reader.
+
+        In streaming mode the lines are decoded from the remote file as it
+        downloads. Otherwise the file is read through the file content cache and
+        decoded lazily from a single buffer.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            content: The file content if it was already downloaded.
+
+        Returns:
+            An iterable of lines, or None if the file is missing or empty.
+        """
+        if content is None:
+            if self.csv_streaming:
+                return iter_text_lines(self.sftp_client.iter_file_chunks(file_path))
 
-        try:
             # Use cached file content if available
             content = self.get_cached_file_content(location_id, date_folder, file_path)
+        if not content:
+            return None
+        return io.TextIOWrapper(io.BytesIO(content), encoding="utf-8", newline="")
 
-            # If file not found or empty, return empty generator
-            if not content:
-                self.logger.info(f"File {file_path} not found or empty. Skipping.")
-                return
+    def open_csv_binary(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        content: t.Optional[bytes] = None,
+    ) -> t.Optional[t.BinaryIO]:
+        """Open a CSV file as a binary file object for the vectorized engines.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            content: The file content if it was already downloaded.
+
+        Returns:
+            A binary file object, or None if the file is missing or empty.
+        """
+        if content is None:
+            if self.csv_streaming:
+                return io.BufferedReader(ChunkedFile(self.sftp_client.iter_file_chunks(file_path)))
+
+            # Use cached file content if available
+            content = self.get_cached_file_content(location_id, date_folder, file_path)
+        if not content:
+            return None
+        return io.BytesIO(content)
+
+    def read_binary_header(self, binary: t.BinaryIO) -> t.Optional[tuple[t.Optional[str], ...]]:
+        """Read the header row of a CSV file and compile it.
+
+        The vectorized engines parse the data rows without a header, so columns
+        are named exactly like the python engine names them.
+
+        Args:
+            binary: The binary file object, positioned at the start of the file.
+
+        Returns:
+            The transformed field name of each column, or None for an empty file.
+        """
+        line = binary.readline()
+        if not line:
+            return None
+        header = next(csv.reader([line.decode("utf-8")], delimiter=self.delimiter, quotechar=self.quotechar), [])
+        return self.compile_header(header)
+
+    def read_csv_python(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        content: t.Optional[bytes] = None,
+    ) -> t.Iterator[dict]:
+        """Parse a CSV file row by row with the csv module.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            content: The file content if it was already downloaded.
+
+        Yields:
+            Records keyed by the transformed field names.
+        """
+        lines = self.open_csv_lines(location_id, date_folder, file_path, content)
+        if lines is None:
+            return
+
+        reader = csv.reader(
+            lines,
+            delimiter=self.delimiter,
+            quotechar=self.quotechar,
+        )
+
+        # Normalize the header once into the record keys of each column
+        header = next(reader, None)
+        if header is None:
+            return
+        yield from self.iter_row_records(reader, self.compile_header(header))
+
+    def iter_row_records(self, rows: t.Iterable[list[str]], columns: tuple[t.Optional[str], ...]) -> t.Iterator[dict]:
+        """Build records from rows parsed by the csv module.
+
+        This defines how every engine treats ragged rows: short rows are padded
+        with None and cells beyond the header are dropped.
+
+        Args:
+            rows: The data rows, as lists of cells.
+            columns: The transformed field name of each column.
+
+        Yields:
+            Records keyed by the transformed field names.
+        """
+        width = len(columns)
+        coercions = [(index, CONVERTERS[kind]) for index, kind in self.compile_coercions(columns)]
+        drop_unmapped = None in columns
+
+        for row in rows:
+            # Skip blank lines, like csv.DictReader does
+            if not row:
+                continue
+            # Pad short rows so missing trailing cells become None
+            if len(row) < width:
+                row += [""] * (width - len(row))
+            # Convert empty strings to None
+            values = [v or None for v in row]
+            for index, convert in coercions:
+                if values[index] is not None:
+                    values[index] = convert(values[index])
+            # Cells beyond the header are dropped
+            record = dict(zip(columns, values))
+            if drop_unmapped:
+                del record[None]
+            yield record
+
+    def read_csv_pandas(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        content: t.Optional[bytes] = None,
+    ) -> t.Iterator[dict]:
+        """Parse a CSV file in chunks of csv_chunk_rows rows with pandas.
 
-            csv_data = content.decode("utf-8")
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            content: The file content if it was already downloaded.
+
+        Yields:
+            Records keyed by the transformed field names.
+        """
+        binary = self.open_csv_binary(location_id, date_folder, file_path, content)
+        if binary is None:
+            return
+
+        with binary:
+            columns = self.read_binary_header(binary)
+            if columns is None:
+                return
+            coercions = self.compile_coercions(columns)
+            drop_unmapped = None in columns
 
-            reader = csv.DictReader(
-                io.StringIO(csv_data),
-                delimiter=self.delimiter,
+            chunks = pd.read_csv(
+                binary,
+                sep=self.delimiter,
                 quotechar=self.quotechar,
+                header=None,
+                names=list(range(len(columns))),
+                # Cells beyond the header are dropped instead of becoming an index
+                index_col=False,
+                # Keep every value as a string and only treat empty cells as missing
+                dtype=object,
+                keep_default_na=False,
+                na_values=[""],
+                # Cells beyond the header are dropped instead of failing the file,
+                # and short rows are padded with NaN, like the python engine does
+                usecols=list(range(len(columns))),
+                encoding="utf-8",
+                chunksize=self.csv_chunk_rows,
             )
+            with chunks:
+                for chunk in chunks:
+                    # Typed columns are converted a whole column at a time
+                    for index, kind in coercions:
+                        chunk[index] = coerce_series(kind, chunk[index])
+                    values = chunk.to_numpy(dtype=object)
+                    # Empty and missing cells become None for the whole chunk at once
+                    values[pd.isna(values)] = None
+                    # tolist builds the rows in C, only the dicts are built in Python
+                    for row in values.tolist():
+                        record = dict(zip(columns, row))
+                        if drop_unmapped:
+                            del record[None]
+                        yield record
+
+    def read_csv_pyarrow(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        content: t.Optional[bytes] = None,
+    ) -> t.Iterator[dict]:
+        """Parse a CSV file in blocks of csv_block_size bytes with pyarrow.
+
+        pyarrow rejects rows whose cell count differs from the header. A block
+        holding such a row is parsed again with the csv module, so ragged rows
+        are padded and truncated like the python engine does, in file order.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            content: The file content if it was already downloaded.
+
+        Yields:
+            Records keyed by the transformed field names.
+        """
+        binary = self.open_csv_binary(location_id, date_folder, file_path, content)
+        if binary is None:
+            return
+
+        with binary:
+            columns = self.read_binary_header(binary)
+            if columns is None:
+                return
+            coercions = self.compile_coercions(columns)
+            drop_unmapped = None in columns
+
+            # Positional names keep duplicate headers apart
+            names = [f"column_{i}" for i in range(len(columns))]
+            read_options = pa_csv.ReadOptions(column_names=names, block_size=self.csv_block_size)
+            # Keep every value as a string and parse empty cells straight to null
+            convert_options = pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in names},
+                null_values=[""],
+                strings_can_be_null=True,
+            )
+            for block in iter_record_blocks(binary, self.csv_block_size, self.quotechar):
+                invalid_rows = []
+                table = pa_csv.read_csv(
+                    io.BytesIO(block),
+                    read_options=read_options,
+                    parse_options=pa_csv.ParseOptions(
+                        delimiter=self.delimiter,
+                        quote_char=self.quotechar,
+                        newlines_in_values=True,
+                        invalid_row_handler=lambda row: invalid_rows.append(row) or "skip",
+                    ),
+                    convert_options=convert_options,
+                )
+                if invalid_rows:
+                    # Rare, so the whole block is parsed again to keep the rows in order
+                    rows = csv.reader(
+                        io.StringIO(block.decode("utf-8"), newline=""),
+                        delimiter=self.delimiter,
+                        quotechar=self.quotechar,
+                    )
+                    yield from self.iter_row_records(rows, columns)
+                    continue
+
+                for batch in table.to_batches():
+                    values = [column.to_pylist() for column in batch.columns]
+                    # Typed columns are converted a whole column at a time
+                    for index, kind in coercions:
+                        values[index] = coerce_series(kind, pd.Series(values[index], dtype=object)).tolist()
+                    for row in zip(*values):
+                        record = dict(zip(columns, row))
+                        if drop_unmapped:
+                            del record[None]
+                        yield record
+
+    def read_csv_records(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        content: t.Optional[bytes] = None,
+    ) -> t.Iterator[dict]:
+        """Parse a CSV file with the configured engine.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            content: The file content if it was already downloaded.
+
+        Returns:
+            An iterator of records keyed by the transformed field names.
+        """
+        engine = self.csv_engine
+        if engine == "pyarrow":
+            return self.read_csv_pyarrow(location_id, date_folder, file_path, content)
+        if engine == "pandas":
+            return self.read_csv_pandas(location_id, date_folder, file_path, content)
+        return self.read_csv_python(location_id, date_folder, file_path, content)
+
+    def parse_csv_file(self, location_id: str, date_folder: str, file_path: str) -> t.Iterator[dict]:
+        """Parse a CSV file, in a parse worker process if parse_processes is set.
+
+        Worker processes receive the whole file content, so csv_streaming does not
+        apply to them.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+
+        Returns:
+            An iterator of records keyed by the transformed field names.
+        """
+        if not self.parse_processes:
+            return self.read_csv_records(location_id, date_folder, file_path)
+
+        # Use cached file content if available
+        content = self.get_cached_file_content(location_id, date_folder, file_path)
+        if not content:
+            return iter(())
+        return self.parse_in_process("read_csv_records", location_id, date_folder, file_path, content)
+
+    def process_csv_file(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
+        """Process a single CSV file.
+
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+
+        Yields:
+            Record-type dictionary objects.
+        """
+        file_path = f"/{location_id}/{date_folder}/{self.file_name}"
+        self.logger.info(f"Processing file {file_path} for location {location_id}, date {date_folder}")
+
+        try:
+            record_count = 0
 
             # Process records in batches
             batch = []
-            for row in reader:
-                # Convert empty strings to None and transform field names to snake_case
-                record = {
-                    self.transform_field_name(k): (v if v != "" else None)
-                    for k, v in row.items()
-                }
+            for record in self.parse_csv_file(location_id, date_folder, file_path):
+                record_count += 1
                 # Add location_id and date to the record
                 record["location_id"] = location_id
                 record["date"] = date_folder
@@ -122,10 +715,27 @@ class CSVSFTPStream(ToastSFTPStream):
             for record in batch:
                 yield record
 
+            # If file not found or empty, nothing was parsed
+            if not record_count:
+                self.logger.info(f"File {file_path} not found or empty. Skipping.")
+
+        except FileNotFoundError:
+            # Only raised in streaming mode, the cached path returns empty content
+            self.logger.info(f"File {file_path} not found or empty. Skipping.")
+            return
         except Exception as e:
-            self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
-            # Return empty generator instead of raising an exception
+            # A streamed file is resumed after transient errors, so this is a failure of
+            # the whole file even if some of its records were already emitted
+            self.logger.error(
+                f"Error processing file {file_path} for location {location_id}, date {date_folder} "
+                f"after {record_count} records: {e}"
+            )
+            # Not bookmarked, so the location is synced again on the next run
+            self._failed_locations.add(location_id)
             return
+        finally:
+            # Let the file content cache free the file once every consumer is done
+            self.release_file_content(location_id, date_folder, file_path)
 
     def _get_records(
         self,
@@ -153,16 +763,12 @@ class CSVSFTPStream(ToastSFTPStream):
         self.connect_sftp()
 
         try:
-            for location_id in location_ids:
-                # Process date folders in parallel
-                yield from self.process_date_folders_parallel(
-                    location_id,
-                    self.process_csv_file,
-                    max_workers=self.max_workers,
-                )
+            # Process the partition's location, with the next locations processed ahead
+            yield from self.process_partition(context, self.process_csv_file)
         finally:
-            # Only disconnect if we own the connection
-            self.disconnect_sftp()
+            # Only disconnect if we own the connection and no location is processed ahead
+            if self._location_pipeline is None:
+                self.disconnect_sftp()
 
 
 class XLSSFTPStream(ToastSFTPStream):
@@ -176,13 +782,132 @@ class XLSSFTPStream(ToastSFTPStream):
 
     # Excel parsing options
     sheet_name = 0  # Default to first sheet
+    header_row: t.ClassVar[t.Optional[int]] = 0  # Zero-based header row, None to detect it
+
+    # Number of leading rows searched when detecting the header row
+    header_scan_rows = 20
 
     # Batch size for processing records
     batch_size = 1000
 
-    # Maximum number of worker threads for parallel processing
+    # Number of locations processed concurrently unless location_workers is set
     max_workers = 4
 
+    def transform_field_name(self, field_name: str) -> str:
+        """Transform field names to snake_case.
+
+        Args:
+            field_name: The original field name.
+
+        Returns:
+            The transformed field name in snake_case.
+        """
+        return transform_field_name(field_name)
+
+    def resolve_excel_engine(self, content: bytes) -> t.Optional[str]:
+        """Pick the pandas reader for a workbook.
+
+        With the default "auto" setting, calamine is used when installed.
+        Otherwise the reader is chosen from the file signature: xlrd for legacy
+        .xls files and openpyxl for .xlsx files.
+
+        Args:
+            content: The workbook content.
+
+        Returns:
+            The pandas engine name.
+        """
+        engine = self.config.get("excel_engine") or "auto"
+        if engine not in EXCEL_ENGINES:
+            raise ValueError(f"Unsupported excel_engine '{engine}', expected one of {', '.join(EXCEL_ENGINES)}")
+        if engine != "auto":
+            return engine
+        if HAS_CALAMINE:
+            return "calamine"
+        if content.startswith(XLSX_SIGNATURE):
+            return "openpyxl"
+        if content.startswith(XLS_SIGNATURE):
+            return "xlrd"
+        # Fall back to pandas' own detection
+        return None
+
+    def detect_header_row(self, frame: pd.DataFrame) -> int:
+        """Find the header row of a sheet read without a header.
+
+        Report exports put titles and date ranges above the table, like the
+        AccountingReport.xls header on row 4. The header is the first row
+        among the leading rows that fills the most cells with text only.
+
+        Args:
+            frame: The sheet read with header=None.
+
+        Returns:
+            The zero-based index of the header row.
+        """
+        best_index, best_count = 0, 0
+        for index, row in enumerate(frame.head(self.header_scan_rows).itertuples(index=False)):
+            cells = [cell for cell in row if not pd.isna(cell)]
+            if len(cells) > best_count and all(isinstance(cell, str) for cell in cells):
+                best_index, best_count = index, len(cells)
+        return best_index
+
+    def compile_excel_header(self, header: t.Iterable[t.Any]) -> list[str]:
+        """Compile a header row into record keys, naming cells like pandas does.
+
+        Empty header cells become "Unnamed: <index>" and repeated names get a
+        ".<n>" suffix before the snake_case transformation.
+
+        Args:
+            header: The header row cells.
+
+        Returns:
+            The transformed field name of each column.
+        """
+        names = []
+        seen = {}
+        for index, cell in enumerate(header):
+            name = f"Unnamed: {index}" if pd.isna(cell) else str(cell)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            names.append(self.transform_field_name(name))
+        return names
+
+    def read_excel_records(self, content: bytes) -> t.Iterator[dict]:
+        """Parse a workbook into records without a Python loop per cell.
+
+        The sheet is read once without a header. The header row is taken from
+        header_row or detected, and missing values are replaced on the whole
+        frame at once.
+
+        Args:
+            content: The workbook content.
+
+        Yields:
+            Records keyed by the transformed field names.
+        """
+        frame = pd.read_excel(
+            io.BytesIO(content),
+            sheet_name=self.sheet_name,
+            header=None,
+            engine=self.resolve_excel_engine(content),
+        )
+        if frame.empty:
+            return
+
+        header_index = self.header_row if self.header_row is not None else self.detect_header_row(frame)
+        columns = self.compile_excel_header(frame.iloc[header_index])
+
+        # Rows without any value are skipped, like read_excel does with a header
+        data = frame.iloc[header_index + 1:].dropna(how="all")
+        values = data.to_numpy(dtype=object)
+        # NaN and NaT become None for the whole sheet at once
+        values[pd.isna(values)] = None
+        for row in values.tolist():
+            yield dict(zip(columns, row))
+
     def process_excel_file(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
         """Process a single Excel file.
 
@@ -205,23 +930,14 @@ class XLSSFTPStream(ToastSFTPStream):
                 self.logger.info(f"File {file_path} not found or empty. Skipping.")
                 return
 
-            # Create a BytesIO object from the content
-            excel_data = io.BytesIO(content)
-
-            # Read the Excel file into a pandas DataFrame
-            df = pd.read_excel(excel_data, sheet_name=self.sheet_name)
-
-            # Convert DataFrame to records
-            records = df.to_dict(orient="records")
+            if self.parse_processes:
+                records = self.parse_in_process("read_excel_records", content)
+            else:
+                records = self.read_excel_records(content)
 
             # Process records in batches
             batch = []
             for record in records:
-                # Convert NaN values to None and transform field names to snake_case
-                record = {
-                    self.transform_field_name(k): (None if pd.isna(v) else v)
-                    for k, v in record.items()
-                }
                 # Add location_id and date to the record
                 record["location_id"] = location_id
                 record["date"] = date_folder
@@ -242,8 +958,13 @@ class XLSSFTPStream(ToastSFTPStream):
 
         except Exception as e:
             self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
+            # Not bookmarked, so the location is synced again on the next run
+            self._failed_locations.add(location_id)
             # Return empty generator instead of raising an exception
             return
+        finally:
+            # Let the file content cache free the file once every consumer is done
+            self.release_file_content(location_id, date_folder, file_path)
 
     def _get_records(
         self,
@@ -271,16 +992,12 @@ class XLSSFTPStream(ToastSFTPStream):
         self.connect_sftp()
 
         try:
-            for location_id in location_ids:
-                # Process date folders in parallel
-                yield from self.process_date_folders_parallel(
-                    location_id,
-                    self.process_excel_file,
-                    max_workers=self.max_workers,
-                )
+            # Process the partition's location, with the next locations processed ahead
+            yield from self.process_partition(context, self.process_excel_file)
         finally:
-            # Only disconnect if we own the connection
-            self.disconnect_sftp()
+            # Only disconnect if we own the connection and no location is processed ahead
+            if self._location_pipeline is None:
+                self.disconnect_sftp()
 
 
 class JSONSFTPStream(ToastSFTPStream):
@@ -298,9 +1015,31 @@ class JSONSFTPStream(ToastSFTPStream):
     # Batch size for processing records
     batch_size = 1000
 
-    # Maximum number of worker threads for parallel processing
+    # Number of locations processed concurrently unless location_workers is set
     max_workers = 4
 
+    @property
+    def json_streaming(self) -> bool:
+        """Whether JSON files are parsed one record at a time while they download.
+
+        Returns:
+            True if the json_streaming setting is enabled.
+        """
+        return bool(self.config.get("json_streaming", False))
+
+    def iter_json_records(self, file_path: str) -> t.Iterator[t.Any]:
+        """Stream the records of a remote JSON file without loading the whole document.
+
+        Args:
+            file_path: The full file path.
+
+        Yields:
+            The elements of the array at records_path, or the value at records_path
+            if it is not an array.
+        """
+        path = self.records_path.split(".") if self.records_path else ()
+        yield from iter_json_values(self.sftp_client.iter_file_chunks(file_path), path)
+
     def process_json_files(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
         """Process JSON files in a date folder.
 
@@ -336,31 +1075,35 @@ class JSONSFTPStream(ToastSFTPStream):
                 self.logger.info(f"Processing file {file_path} for location {location_id}, date {date_folder}")
 
                 try:
-                    # Use cached file content if available
-                    content = self.get_cached_file_content(location_id, date_folder, file_path)
-
-                    # If file not found or empty, skip to next file
-                    if not content:
-                        self.logger.info(f"File {file_path} not found or empty. Skipping.")
-                        continue
-
-                    json_data = json.loads(content.decode("utf-8"))
-
-                    # Extract records based on records_path if provided
-                    records = json_data
-                    if self.records_path:
-                        try:
-                            for key in self.records_path.split("."):
-                                records = records[key]
-                        except (KeyError, TypeError):
-                            self.logger.warning(f"Could not find records at path '{self.records_path}' in {file_path}. Skipping.")
+                    if self.json_streaming:
+                        # Records are decoded one at a time while the file downloads
+                        records = self.iter_json_records(file_path)
+                    else:
+                        # Use cached file content if available
+                        content = self.get_cached_file_content(location_id, date_folder, file_path)
+
+                        # If file not found or empty, skip to next file
+                        if not content:
+                            self.logger.info(f"File {file_path} not found or empty. Skipping.")
                             continue
 
+                        json_data = loads_json(content)
+
+                        # Extract records based on records_path if provided
+                        records = json_data
+                        if self.records_path:
+                            try:
+                                for key in self.records_path.split("."):
+                                    records = records[key]
+                            except (KeyError, TypeError):
+                                self.logger.warning(f"Could not find records at path '{self.records_path}' in {file_path}. Skipping.")
+                                continue
+
                     # Process records in batches
                     batch = []
 
                     # Handle both array and object responses
-                    if isinstance(records, list):
+                    if not isinstance(records, dict):
                         for record in records:
                             # Add location_id and date to the record
                             record["location_id"] = location_id
@@ -388,12 +1131,24 @@ class JSONSFTPStream(ToastSFTPStream):
                     for record in batch:
                         yield record
 
+                except FileNotFoundError:
+                    self.logger.info(f"File {file_path} not found. Skipping.")
+                    continue
+                except KeyError as e:
+                    self.logger.warning(f"Could not find records at path '{self.records_path}' in {file_path} (missing key {e}). Skipping.")
+                    continue
                 except Exception as e:
                     self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
+                    # Not bookmarked, so the location is synced again on the next run
+                    self._failed_locations.add(location_id)
                     # Continue with next file instead of failing completely
                     continue
+                finally:
+                    # Let the file content cache free the file once every consumer is done
+                    self.release_file_content(location_id, date_folder, file_path)
         except Exception as e:
             self.logger.error(f"Error processing folder {folder_path} for location {location_id}: {e}")
+            self._failed_locations.add(location_id)
             # Return empty generator instead of raising an exception
             return
 
@@ -423,13 +1178,9 @@ class JSONSFTPStream(ToastSFTPStream):
         self.connect_sftp()
 
         try:
-            for location_id in location_ids:
-                # Process date folders in parallel
-                yield from self.process_date_folders_parallel(
-                    location_id,
-                    self.process_json_files,
-                    max_workers=self.max_workers,
-                )
+            # Process the partition's location, with the next locations processed ahead
+            yield from self.process_partition(context, self.process_json_files)
         finally:
-            # Only disconnect if we own the connection
-            self.disconnect_sftp()
+            # Only disconnect if we own the connection and no location is processed ahead
+            if self._location_pipeline is None:
+                self.disconnect_sftp()
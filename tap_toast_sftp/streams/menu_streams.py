@@ -1,8 +1,11 @@
 """Flattened Menu stream classes for tap-toast-sftp.
 
 These streams provide a simplified, flat structure for Menu data instead of the complex
-parent/child relationship approach. Each stream reads directly from the JSON files and
-includes all necessary parent context in each record.
+parent/child relationship approach. Each menu export file is downloaded and parsed once,
+then walked once by a single flattener that produces the rows of every selected menu
+entity type together. The rows are spilled to the record cache on disk, and every stream
+reads back its own entity's rows. With json_streaming enabled, menus are decoded and
+flattened one at a time while the file downloads.
 """
 
 from __future__ import annotations
@@ -10,416 +13,473 @@ from __future__ import annotations
 import typing as t
 import fnmatch
 import hashlib
-import json
+import logging
+import threading
 
+from tap_toast_sftp.codec import loads_json
+from tap_toast_sftp.json_stream import iter_json_values
 from tap_toast_sftp.streams.base import JSONSFTPStream
 
+# Entity types produced by the menu flattener, one per menu stream
+MENU_ENTITIES = ("menu", "group", "item", "option_group", "option_item", "price")
 
-class MenuMenusStream(JSONSFTPStream):
-    """Stream for Toast menu objects from menu export JSON files.
-
-    This stream extracts all menu records as flat objects, handling both
-    MenuExport (array format) and MenuExportV2 (object format) files.
-    """
+# Record cache stream under which flattened menu rows wait for their menu stream
+MENU_ROWS_CACHE = "_menu_export_rows"
 
-    name = "menu_menus"
-    file_pattern = "MenuExport*.json"  # Matches both MenuExport_*.json and MenuExportV2_*.json
-    primary_keys = ["location_id", "date", "guid"]
-    generate_unique_ids = True
 
-    def process_json_files(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
-        """Process JSON files in the given folder.
+def flatten_menu(menu: t.Any, location_id: str, date_folder: str, buffers: dict[str, list]) -> None:
+    """Flatten one menu and everything nested under it into per-entity buffers.
 
-        Args:
-            location_id: The location ID.
-            date_folder: The date folder name.
+    The menu is consumed in place: nested lists are popped off each object while
+    walking down, and the remaining object becomes the row, so no object is copied.
+    Rows are only built for the entity types present as keys in buffers.
 
-        Yields:
-            Menu record dictionaries.
-        """
-        folder_path = f"{location_id}/{date_folder}"
+    Args:
+        menu: A menu object from a MenuExport or MenuExportV2 file.
+        location_id: The location ID.
+        date_folder: The date folder name.
+        buffers: Mapping of entity type to the list, or any object with an
+            append method, receiving its rows.
+    """
+    if not isinstance(menu, dict) or not menu.get("guid"):
+        return
+
+    menu_guid = menu["guid"]
+    groups = menu.pop("groups", None) or []
+
+    if "menu" in buffers:
+        menu["location_id"] = location_id
+        menu["date"] = date_folder
+        buffers["menu"].append(menu)
+
+    for group in groups:
+        if not isinstance(group, dict) or not group.get("guid"):
+            continue
+
+        group_guid = group["guid"]
+        items = group.pop("items", None) or []
+        # Subgroups are not extracted, drop them from the group row
+        group.pop("subgroups", None)
+
+        if "group" in buffers:
+            group["location_id"] = location_id
+            group["date"] = date_folder
+            group["menu_guid"] = menu_guid
+            buffers["group"].append(group)
+
+        for item in items:
+            if not isinstance(item, dict) or not item.get("guid"):
+                continue
+
+            item_guid = item["guid"]
+            option_groups = item.pop("optionGroups", None) or []
+            prices = item.pop("prices", None) or []
+
+            if "item" in buffers:
+                item["location_id"] = location_id
+                item["date"] = date_folder
+                item["menu_guid"] = menu_guid
+                item["group_guid"] = group_guid
+                buffers["item"].append(item)
+
+            for option_group in option_groups:
+                if not isinstance(option_group, dict) or not option_group.get("guid"):
+                    continue
 
-        try:
-            # Get list of files in the folder
-            files = self._sftp_client.list_files(folder_path)
+                option_group_guid = option_group["guid"]
+                option_items = option_group.pop("items", None) or []
 
-            # Filter files that match our pattern
-            matching_files = [f for f in files if fnmatch.fnmatch(f, self.file_pattern)]
+                if "option_group" in buffers:
+                    option_group["location_id"] = location_id
+                    option_group["date"] = date_folder
+                    option_group["menu_guid"] = menu_guid
+                    option_group["group_guid"] = group_guid
+                    option_group["item_guid"] = item_guid
+                    buffers["option_group"].append(option_group)
 
-            if not matching_files:
-                self.logger.info(f"No files matching pattern '{self.file_pattern}' found in {folder_path}")
-                return
+                if "option_item" not in buffers:
+                    continue
 
-            record_count = 0
-            for file_name in matching_files:
-                file_path = f"{folder_path}/{file_name}"
-                try:
-                    # Get file content
-                    json_data = json.loads(self._sftp_client.get_file_content(file_path).decode("utf-8"))
-
-                    # Extract menus based on file format
-                    menus = []
-                    if isinstance(json_data, list):
-                        # MenuExport format - array of menus
-                        menus = json_data
-                    elif isinstance(json_data, dict) and 'menus' in json_data:
-                        # MenuExportV2 format - object with menus array
-                        menus = json_data.get('menus', [])
-                    else:
-                        self.logger.warning(f"Unknown format in file {file_path}")
+                for option_item in option_items:
+                    if not isinstance(option_item, dict) or not option_item.get("guid"):
                         continue
 
-                    # Process each menu
-                    for menu in menus:
-                        if not isinstance(menu, dict) or not menu.get("guid"):
-                            continue
-
-                        # Create a copy of the menu record
-                        menu_record = menu.copy()
-
-                        # Add location_id and date to the record
-                        menu_record["location_id"] = location_id
-                        menu_record["date"] = date_folder
-
-                        # Remove nested objects that will be in their own streams
-                        if "groups" in menu_record:
-                            del menu_record["groups"]
-
-                        # Validate primary keys before yielding
-                        if self.validate_primary_keys(menu_record):
-                            record_count += 1
-                            yield menu_record
-
-                except Exception as e:
-                    self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
-                    # Continue with next file instead of failing completely
+                    # Option items can have their own optionGroups, which are not extracted
+                    option_item.pop("optionGroups", None)
+                    option_item["location_id"] = location_id
+                    option_item["date"] = date_folder
+                    option_item["menu_guid"] = menu_guid
+                    option_item["group_guid"] = group_guid
+                    option_item["item_guid"] = item_guid
+                    option_item["option_group_guid"] = option_group_guid
+                    buffers["option_item"].append(option_item)
+
+            if "price" not in buffers:
+                continue
+
+            for price_index, price in enumerate(prices):
+                if not isinstance(price, dict):
                     continue
 
-            self.logger.info(f"Processed {record_count} menu records for location {location_id}, date {date_folder}")
+                # Generate a unique price_id since prices don't have their own guid
+                if "guid" in price:
+                    price_id = price["guid"]
+                elif "id" in price:
+                    price_id = str(price["id"])
+                else:
+                    # Create a hash-based ID from the price data
+                    price_data = f"{item_guid}_{price_index}_{price.get('amount', '')}_{price.get('currency', '')}"
+                    price_id = hashlib.md5(price_data.encode()).hexdigest()[:16]
+
+                price["location_id"] = location_id
+                price["date"] = date_folder
+                price["menu_guid"] = menu_guid
+                price["group_guid"] = group_guid
+                price["item_guid"] = item_guid
+                price["price_id"] = price_id
+                buffers["price"].append(price)
+
+
+def flatten_menus(
+    menus: t.Iterable[t.Any],
+    location_id: str,
+    date_folder: str,
+    entities: t.Iterable[str] = MENU_ENTITIES,
+    buffers: t.Optional[dict[str, t.Any]] = None,
+) -> dict[str, t.Any]:
+    """Flatten menus into rows of every requested entity type in a single pass.
+
+    Args:
+        menus: The menu objects, consumed in place.
+        location_id: The location ID.
+        date_folder: The date folder name.
+        entities: The entity types to build rows for.
+        buffers: Optional mapping of entity type to the object receiving its rows,
+            such as a RecordCacheWriter. Replaces the lists built for entities.
+
+    Returns:
+        Mapping of entity type to its rows.
+    """
+    if buffers is None:
+        buffers = {entity: [] for entity in entities}
+    for menu in menus:
+        flatten_menu(menu, location_id, date_folder, buffers)
+    return buffers
+
+
+class MenuExportStream(JSONSFTPStream):
+    """Base class for streams extracting entities from menu export JSON files.
+
+    Menu export files are downloaded through the shared file content cache, parsed
+    once and flattened once into rows for the entity types of the selected menu
+    streams. The rows are written to the record cache on disk, so they count
+    neither against memory nor against the file content cache budget. A
+    class-level cache keyed by remote path and fingerprint (size and modification
+    time) tracks which entity types still have rows waiting. Each stream drains
+    the rows of its own entity type, and the file's entry is removed once every
+    entity type was drained.
+    """
 
-        except Exception as e:
-            self.logger.error(f"Error processing folder {folder_path} for location {location_id}: {e}")
-            # Return empty generator instead of raising an exception
-            return
+    file_pattern = "MenuExport*.json"  # Matches both MenuExport_*.json and MenuExportV2_*.json
+    generate_unique_ids = True
 
+    # Entity type emitted by this stream, one of MENU_ENTITIES
+    entity = None
 
-class MenuGroupsStream(JSONSFTPStream):
-    """Stream for Toast menu group objects from menu export JSON files.
+    # Name of the extracted entity, used in log messages
+    entity_label = "menu"
 
-    This stream extracts all menu group records with parent menu context.
-    """
+    # Class-level cache for flattened menu rows not yet drained by their stream
+    # Structure: {(file_path, fingerprint): {"lock": Lock, "buffers": {entity: record cache context hash} | None}}
+    _menu_document_cache = {}
+    _menu_document_cache_lock = threading.Lock()
 
-    name = "menu_groups"
-    file_pattern = "MenuExport*.json"
-    primary_keys = ["location_id", "date", "menu_guid", "guid"]
-    generate_unique_ids = True
+    # Files whose buffers were all drained, so a stream reading one again flattens it on its own
+    # Structure: {(file_path, fingerprint)}
+    _drained_menu_documents = set()
 
-    def process_json_files(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
-        """Process JSON files in the given folder.
+    # Entity types of the selected menu streams, set by the tap before syncing
+    selected_entities: tuple[str, ...] = MENU_ENTITIES
+
+    def get_menu_files(self, location_id: str, date_folder: str) -> t.Iterable[tuple[str, tuple]]:
+        """Get the menu export files of a date folder.
 
         Args:
             location_id: The location ID.
             date_folder: The date folder name.
 
         Yields:
-            Menu group record dictionaries with parent menu context.
+            Tuples of (file_path, fingerprint) for each matching file.
         """
-        folder_path = f"{location_id}/{date_folder}"
-
-        try:
-            # Get list of files in the folder
-            files = self._sftp_client.list_files(folder_path)
-
-            # Filter files that match our pattern
-            matching_files = [f for f in files if fnmatch.fnmatch(f, self.file_pattern)]
-
-            if not matching_files:
-                self.logger.info(f"No files matching pattern '{self.file_pattern}' found in {folder_path}")
-                return
-
-            record_count = 0
-            for file_name in matching_files:
-                file_path = f"{folder_path}/{file_name}"
-                try:
-                    # Get file content
-                    json_data = json.loads(self._sftp_client.get_file_content(file_path).decode("utf-8"))
-
-                    # Extract menus based on file format
-                    menus = []
-                    if isinstance(json_data, list):
-                        # MenuExport format - array of menus
-                        menus = json_data
-                    elif isinstance(json_data, dict) and 'menus' in json_data:
-                        # MenuExportV2 format - object with menus array
-                        menus = json_data.get('menus', [])
-                    else:
-                        self.logger.warning(f"Unknown format in file {file_path}")
-                        continue
-
-                    # Process each menu and its groups
-                    for menu in menus:
-                        if not isinstance(menu, dict) or not menu.get("guid"):
-                            continue
-
-                        menu_guid = menu["guid"]
-
-                        for group in menu.get("groups", []):
-                            if not isinstance(group, dict) or not group.get("guid"):
-                                continue
-
-                            # Create a copy of the group record
-                            group_record = group.copy()
+        folder_path = f"/{location_id}/{date_folder}"
 
-                            # Add parent context
-                            group_record["location_id"] = location_id
-                            group_record["date"] = date_folder
-                            group_record["menu_guid"] = menu_guid
+        # List the folder with attributes so the files can be fingerprinted
+        entries = self.sftp_client.list_dir_attrs(folder_path)
 
-                            # Remove nested objects that will be in their own streams
-                            if "items" in group_record:
-                                del group_record["items"]
-                            if "subgroups" in group_record:
-                                del group_record["subgroups"]
+        # Filter files that match our pattern
+        matching_entries = [e for e in entries if fnmatch.fnmatch(e.filename, self.file_pattern)]
 
-                            # Validate primary keys before yielding
-                            if self.validate_primary_keys(group_record):
-                                record_count += 1
-                                yield group_record
-
-                except Exception as e:
-                    self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
-                    # Continue with next file instead of failing completely
-                    continue
-
-            self.logger.info(f"Processed {record_count} group records for location {location_id}, date {date_folder}")
-
-        except Exception as e:
-            self.logger.error(f"Error processing folder {folder_path} for location {location_id}: {e}")
-            # Return empty generator instead of raising an exception
+        if not matching_entries:
+            self.logger.info(f"No files matching pattern '{self.file_pattern}' found in {folder_path}")
             return
 
+        for entry in matching_entries:
+            yield f"{folder_path}/{entry.filename}", (entry.st_size, entry.st_mtime)
 
-class MenuItemsStream(JSONSFTPStream):
-    """Stream for Toast menu item objects from menu export JSON files.
-
-    This stream extracts all menu item records with full parent context.
-    """
-
-    name = "menu_items"
-    file_pattern = "MenuExport*.json"
-    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "guid"]
-    generate_unique_ids = True
-
-    def process_json_files(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
-        """Process JSON files in the given folder.
+    def read_menus(self, location_id: str, date_folder: str, file_path: str) -> t.Optional[t.Iterable[t.Any]]:
+        """Read the menus of a menu export file, streamed if json_streaming is enabled.
 
         Args:
             location_id: The location ID.
             date_folder: The date folder name.
+            file_path: The full file path.
 
-        Yields:
-            Menu item record dictionaries with full parent context.
+        Returns:
+            The menu objects, or None if the file is empty or has an unknown format.
         """
-        folder_path = f"{location_id}/{date_folder}"
-
-        try:
-            # Get list of files in the folder
-            files = self._sftp_client.list_files(folder_path)
-
-            # Filter files that match our pattern
-            matching_files = [f for f in files if fnmatch.fnmatch(f, self.file_pattern)]
-
-            if not matching_files:
-                self.logger.info(f"No files matching pattern '{self.file_pattern}' found in {folder_path}")
-                return
-
-            record_count = 0
-            for file_name in matching_files:
-                file_path = f"{folder_path}/{file_name}"
-                try:
-                    # Get file content
-                    json_data = json.loads(self._sftp_client.get_file_content(file_path).decode("utf-8"))
-
-                    # Extract menus based on file format
-                    menus = []
-                    if isinstance(json_data, list):
-                        # MenuExport format - array of menus
-                        menus = json_data
-                    elif isinstance(json_data, dict) and 'menus' in json_data:
-                        # MenuExportV2 format - object with menus array
-                        menus = json_data.get('menus', [])
-                    else:
-                        self.logger.warning(f"Unknown format in file {file_path}")
-                        continue
+        if self.json_streaming:
+            return self.iter_menus(location_id, date_folder, file_path)
+        return self.load_menus(location_id, date_folder, file_path)
 
-                    # Process each menu, group, and item
-                    for menu in menus:
-                        if not isinstance(menu, dict) or not menu.get("guid"):
-                            continue
+    def load_menus(self, location_id: str, date_folder: str, file_path: str) -> t.Optional[list]:
+        """Download and parse the menus of a menu export file.
 
-                        menu_guid = menu["guid"]
-
-                        for group in menu.get("groups", []):
-                            if not isinstance(group, dict) or not group.get("guid"):
-                                continue
-
-                            group_guid = group["guid"]
-
-                            for item in group.get("items", []):
-                                if not isinstance(item, dict) or not item.get("guid"):
-                                    continue
-
-                                # Create a copy of the item record
-                                item_record = item.copy()
-
-                                # Add parent context
-                                item_record["location_id"] = location_id
-                                item_record["date"] = date_folder
-                                item_record["menu_guid"] = menu_guid
-                                item_record["group_guid"] = group_guid
-
-                                # Remove nested objects that will be in their own streams
-                                if "optionGroups" in item_record:
-                                    del item_record["optionGroups"]
-                                if "prices" in item_record:
-                                    del item_record["prices"]
-
-                                # Validate primary keys before yielding
-                                if self.validate_primary_keys(item_record):
-                                    record_count += 1
-                                    yield item_record
-
-                except Exception as e:
-                    self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
-                    # Continue with next file instead of failing completely
-                    continue
-
-            self.logger.info(f"Processed {record_count} item records for location {location_id}, date {date_folder}")
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
 
-        except Exception as e:
-            self.logger.error(f"Error processing folder {folder_path} for location {location_id}: {e}")
-            # Return empty generator instead of raising an exception
-            return
+        Returns:
+            The list of menu objects, or None if the file is empty or has an unknown format.
+        """
+        # Use cached file content if available
+        content = self.get_cached_file_content(location_id, date_folder, file_path)
+        if not content:
+            self.logger.info(f"File {file_path} not found or empty. Skipping.")
+            return None
 
+        json_data = loads_json(content)
 
-class MenuOptionGroupsStream(JSONSFTPStream):
-    """Stream for Toast menu option group objects from menu export JSON files.
+        # Extract menus based on file format
+        if isinstance(json_data, list):
+            # MenuExport format - array of menus
+            return json_data
+        if isinstance(json_data, dict) and 'menus' in json_data:
+            # MenuExportV2 format - object with menus array
+            return json_data.get('menus', [])
 
-    This stream extracts all option group records with full parent context.
-    """
+        self.logger.warning(f"Unknown format in file {file_path}")
+        return None
 
-    name = "menu_option_groups"
-    file_pattern = "MenuExport*.json"
-    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "item_guid", "guid"]
-    generate_unique_ids = True
+    def iter_menus(self, location_id: str, date_folder: str, file_path: str) -> t.Iterator[t.Any]:
+        """Stream the menus of a menu export file one at a time while it downloads.
 
-    def process_json_files(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
-        """Process JSON files in the given folder.
+        Only the current menu is held in memory. The file bypasses the file content
+        cache, since it is flattened once for all menu streams anyway.
 
         Args:
             location_id: The location ID.
             date_folder: The date folder name.
+            file_path: The full file path.
 
         Yields:
-            Option group record dictionaries with full parent context.
+            The menu objects of either export format.
         """
-        folder_path = f"{location_id}/{date_folder}"
-
+        chunks = self.sftp_client.iter_file_chunks(file_path)
         try:
-            # Get list of files in the folder
-            files = self._sftp_client.list_files(folder_path)
+            # MenuExport files are an array of menus, MenuExportV2 files an object with a menus array
+            yield from iter_json_values(chunks, ("menus",), bare_array=True)
+        except FileNotFoundError:
+            self.logger.info(f"File {file_path} not found. Skipping.")
+        except KeyError:
+            self.logger.warning(f"Unknown format in file {file_path}")
+
+    def drain_menu_rows(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        fingerprint: tuple,
+    ) -> t.Optional[t.Iterable[dict]]:
+        """Take this stream's rows of a menu export file, flattening the file if needed.
+
+        The first menu stream to reach a file flattens it for the entity types of
+        all selected menu streams into the record cache, where the rows wait for
+        the remaining menu streams. Flattening holds the file's lock, so menu
+        streams syncing concurrently wait for it instead of flattening the file
+        twice. A stream that is the only selected menu stream, or whose rows were
+        already drained, flattens the file on its own and gets its rows menu by menu.
 
-            # Filter files that match our pattern
-            matching_files = [f for f in files if fnmatch.fnmatch(f, self.file_pattern)]
-
-            if not matching_files:
-                self.logger.info(f"No files matching pattern '{self.file_pattern}' found in {folder_path}")
-                return
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            fingerprint: The (size, mtime) of the remote file.
 
-            record_count = 0
-            for file_name in matching_files:
-                file_path = f"{folder_path}/{file_name}"
+        Returns:
+            The rows of this stream's entity type, or None if the file could not be read.
+        """
+        cache_key = (file_path, fingerprint)
+        entities = set(self.selected_entities) | {self.entity}
+        with self._menu_document_cache_lock:
+            if cache_key in self._drained_menu_documents or entities == {self.entity}:
+                document = None
+            else:
+                document = self._menu_document_cache.setdefault(
+                    cache_key, {"lock": threading.Lock(), "buffers": None}
+                )
+
+        if document is None:
+            return self.iter_menu_rows(location_id, date_folder, file_path)
+
+        with document["lock"]:
+            buffers = document["buffers"]
+            if buffers is None:
                 try:
-                    # Get file content
-                    json_data = json.loads(self._sftp_client.get_file_content(file_path).decode("utf-8"))
-
-                    # Extract menus based on file format
-                    menus = []
-                    if isinstance(json_data, list):
-                        # MenuExport format - array of menus
-                        menus = json_data
-                    elif isinstance(json_data, dict) and 'menus' in json_data:
-                        # MenuExportV2 format - object with menus array
-                        menus = json_data.get('menus', [])
-                    else:
-                        self.logger.warning(f"Unknown format in file {file_path}")
-                        continue
-
-                    # Process each menu, group, item, and option group
-                    for menu in menus:
-                        if not isinstance(menu, dict) or not menu.get("guid"):
-                            continue
+                    buffers = self.spill_menu_rows(location_id, date_folder, file_path, cache_key, entities)
+                finally:
+                    if buffers is None:
+                        # Unreadable, the next stream tries again
+                        self._discard_menu_document(cache_key, document)
+                if buffers is None:
+                    return None
+                document["buffers"] = buffers
+            elif self.entity in buffers:
+                self.logger.debug(f"Using cached {self.entity_label} rows for {file_path}")
+            else:
+                # Not a selected stream, or already drained during this sync
+                return self.iter_menu_rows(location_id, date_folder, file_path)
+
+            context_hash = buffers.pop(self.entity)
+            if not buffers:
+                self._discard_menu_document(cache_key, document, drained=True)
+        return self.read_spilled_rows(context_hash)
+
+    def iter_menu_rows(self, location_id: str, date_folder: str, file_path: str) -> t.Optional[t.Iterator[dict]]:
+        """Flatten a menu export file into rows of this stream's entity type only.
+
+        Rows are yielded menu by menu, so with json_streaming enabled only one
+        menu's rows are in memory at a time.
 
-                        menu_guid = menu["guid"]
-
-                        for group in menu.get("groups", []):
-                            if not isinstance(group, dict) or not group.get("guid"):
-                                continue
-
-                            group_guid = group["guid"]
-
-                            for item in group.get("items", []):
-                                if not isinstance(item, dict) or not item.get("guid"):
-                                    continue
-
-                                item_guid = item["guid"]
-
-                                for option_group in item.get("optionGroups", []):
-                                    if not isinstance(option_group, dict) or not option_group.get("guid"):
-                                        continue
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
 
-                                    # Create a copy of the option group record
-                                    option_group_record = option_group.copy()
+        Returns:
+            An iterator over the rows, or None if the file could not be read.
+        """
+        menus = self.read_menus(location_id, date_folder, file_path)
+        if menus is None:
+            return None
+
+        def rows() -> t.Iterator[dict]:
+            try:
+                for menu in menus:
+                    buffers = {self.entity: []}
+                    flatten_menu(menu, location_id, date_folder, buffers)
+                    yield from buffers[self.entity]
+            finally:
+                self.release_file_content(location_id, date_folder, file_path, all_consumers=True)
+
+        return rows()
+
+    def spill_menu_rows(
+        self,
+        location_id: str,
+        date_folder: str,
+        file_path: str,
+        cache_key: tuple,
+        entities: t.Iterable[str],
+    ) -> t.Optional[dict[str, str]]:
+        """Flatten a menu export file into the record cache for the given entity types.
+
+        Each entity type's rows are written through its own RecordCacheWriter, so
+        only one batch of rows per entity type is held in memory.
 
-                                    # Add parent context
-                                    option_group_record["location_id"] = location_id
-                                    option_group_record["date"] = date_folder
-                                    option_group_record["menu_guid"] = menu_guid
-                                    option_group_record["group_guid"] = group_guid
-                                    option_group_record["item_guid"] = item_guid
+        Args:
+            location_id: The location ID.
+            date_folder: The date folder name.
+            file_path: The full file path.
+            cache_key: The (file_path, fingerprint) of the file.
+            entities: The entity types to build rows for.
 
-                                    # Remove nested objects that will be in their own streams
-                                    if "items" in option_group_record:
-                                        del option_group_record["items"]
+        Returns:
+            Mapping of entity type to the record cache context hash of its rows,
+            or None if the file could not be read.
+        """
+        menus = self.read_menus(location_id, date_folder, file_path)
+        if menus is None:
+            return None
+
+        record_cache = self.get_record_cache()
+        context_hashes = {
+            entity: hashlib.md5(f"{cache_key}:{entity}".encode()).hexdigest() for entity in entities
+        }
+        writers = {entity: record_cache.writer(MENU_ROWS_CACHE, context_hashes[entity]) for entity in entities}
+        try:
+            flatten_menus(menus, location_id, date_folder, buffers=writers)
+            for writer in writers.values():
+                writer.commit()
+        except BaseException:
+            for context_hash in context_hashes.values():
+                record_cache.clear(MENU_ROWS_CACHE, context_hash)
+            raise
+        # The rows now hold everything the menu streams need, so the raw file can go
+        self.release_file_content(location_id, date_folder, file_path, all_consumers=True)
+        return context_hashes
+
+    def read_spilled_rows(self, context_hash: str) -> t.Iterator[dict]:
+        """Read back rows spilled to the record cache, deleting them once read.
 
-                                    # Validate primary keys before yielding
-                                    if self.validate_primary_keys(option_group_record):
-                                        record_count += 1
-                                        yield option_group_record
+        Args:
+            context_hash: The record cache context hash of the rows.
 
-                except Exception as e:
-                    self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
-                    # Continue with next file instead of failing completely
-                    continue
+        Yields:
+            The rows, one record cache segment at a time.
+        """
+        record_cache = self.get_record_cache()
+        try:
+            yield from record_cache.read(MENU_ROWS_CACHE, context_hash)
+        finally:
+            record_cache.clear(MENU_ROWS_CACHE, context_hash)
 
-            self.logger.info(f"Processed {record_count} option group records for location {location_id}, date {date_folder}")
+    def _discard_menu_document(self, cache_key: tuple, document: dict, drained: bool = False) -> None:
+        """Remove a file's entry from the menu document cache.
 
-        except Exception as e:
-            self.logger.error(f"Error processing folder {folder_path} for location {location_id}: {e}")
-            # Return empty generator instead of raising an exception
-            return
+        Args:
+            cache_key: The (file_path, fingerprint) of the file.
+            document: The entry being removed.
+            drained: Whether every selected menu stream has drained its rows.
+        """
+        with self._menu_document_cache_lock:
+            if self._menu_document_cache.get(cache_key) is document:
+                del self._menu_document_cache[cache_key]
+            if drained:
+                self._drained_menu_documents.add(cache_key)
 
+    @classmethod
+    def set_selected_entities(cls, entities: t.Iterable[str]) -> None:
+        """Set the entity types of the selected menu streams.
 
-class MenuOptionItemsStream(JSONSFTPStream):
-    """Stream for Toast menu option item objects from menu export JSON files.
+        Only these entity types are flattened when a menu stream first reads a file,
+        so no rows are buffered for streams that will never drain them.
 
-    This stream extracts all option item records with full parent context.
-    """
-
-    name = "menu_option_items"
-    file_pattern = "MenuExport*.json"
-    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "item_guid", "option_group_guid", "guid"]
-    generate_unique_ids = True
+        Args:
+            entities: The entity types of the selected menu streams.
+        """
+        MenuExportStream.selected_entities = tuple(entity for entity in MENU_ENTITIES if entity in set(entities))
+
+    @classmethod
+    def clear_menu_document_cache(cls) -> None:
+        """Clear the menu rows not yet drained by their streams."""
+        with cls._menu_document_cache_lock:
+            MenuExportStream._menu_document_cache = {}
+            MenuExportStream._drained_menu_documents = set()
+            if cls._record_cache is not None:
+                cls._record_cache.clear(MENU_ROWS_CACHE)
+        logger = logging.getLogger("tap-toast-sftp.MenuExportStream")
+        logger.info("Cleared menu document cache")
 
     def process_json_files(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
         """Process JSON files in the given folder.
@@ -429,215 +489,105 @@ class MenuOptionItemsStream(JSONSFTPStream):
             date_folder: The date folder name.
 
         Yields:
-            Option item record dictionaries with full parent context.
+            Record dictionaries with parent context.
         """
-        folder_path = f"{location_id}/{date_folder}"
+        folder_path = f"/{location_id}/{date_folder}"
 
         try:
-            # Get list of files in the folder
-            files = self._sftp_client.list_files(folder_path)
-
-            # Filter files that match our pattern
-            matching_files = [f for f in files if fnmatch.fnmatch(f, self.file_pattern)]
-
-            if not matching_files:
-                self.logger.info(f"No files matching pattern '{self.file_pattern}' found in {folder_path}")
-                return
-
             record_count = 0
-            for file_name in matching_files:
-                file_path = f"{folder_path}/{file_name}"
+            for file_path, fingerprint in self.get_menu_files(location_id, date_folder):
                 try:
-                    # Get file content
-                    json_data = json.loads(self._sftp_client.get_file_content(file_path).decode("utf-8"))
-
-                    # Extract menus based on file format
-                    menus = []
-                    if isinstance(json_data, list):
-                        # MenuExport format - array of menus
-                        menus = json_data
-                    elif isinstance(json_data, dict) and 'menus' in json_data:
-                        # MenuExportV2 format - object with menus array
-                        menus = json_data.get('menus', [])
-                    else:
-                        self.logger.warning(f"Unknown format in file {file_path}")
-                        continue
-
-                    # Process each menu, group, item, option group, and option item
-                    for menu in menus:
-                        if not isinstance(menu, dict) or not menu.get("guid"):
-                            continue
-
-                        menu_guid = menu["guid"]
-
-                        for group in menu.get("groups", []):
-                            if not isinstance(group, dict) or not group.get("guid"):
-                                continue
-
-                            group_guid = group["guid"]
-
-                            for item in group.get("items", []):
-                                if not isinstance(item, dict) or not item.get("guid"):
-                                    continue
-
-                                item_guid = item["guid"]
-
-                                for option_group in item.get("optionGroups", []):
-                                    if not isinstance(option_group, dict) or not option_group.get("guid"):
-                                        continue
-
-                                    option_group_guid = option_group["guid"]
-
-                                    for option_item in option_group.get("items", []):
-                                        if not isinstance(option_item, dict) or not option_item.get("guid"):
-                                            continue
-
-                                        # Create a copy of the option item record
-                                        option_item_record = option_item.copy()
-
-                                        # Add parent context
-                                        option_item_record["location_id"] = location_id
-                                        option_item_record["date"] = date_folder
-                                        option_item_record["menu_guid"] = menu_guid
-                                        option_item_record["group_guid"] = group_guid
-                                        option_item_record["item_guid"] = item_guid
-                                        option_item_record["option_group_guid"] = option_group_guid
-
-                                        # Remove nested objects (option items can have their own optionGroups)
-                                        if "optionGroups" in option_item_record:
-                                            del option_item_record["optionGroups"]
-
-                                        # Validate primary keys before yielding
-                                        if self.validate_primary_keys(option_item_record):
-                                            record_count += 1
-                                            yield option_item_record
-
+                    # Rows are read lazily, so errors of a streamed file are raised while iterating
+                    rows = self.drain_menu_rows(location_id, date_folder, file_path, fingerprint)
+                    for record in rows or []:
+                        # Validate primary keys before yielding
+                        if self.validate_primary_keys(record):
+                            record_count += 1
+                            yield record
                 except Exception as e:
                     self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
+                    # Not bookmarked, so the location is synced again on the next run
+                    self._failed_locations.add(location_id)
                     # Continue with next file instead of failing completely
                     continue
 
-            self.logger.info(f"Processed {record_count} option item records for location {location_id}, date {date_folder}")
+            self.logger.info(f"Processed {record_count} {self.entity_label} records for location {location_id}, date {date_folder}")
 
         except Exception as e:
             self.logger.error(f"Error processing folder {folder_path} for location {location_id}: {e}")
+            self._failed_locations.add(location_id)
             # Return empty generator instead of raising an exception
             return
 
 
-class MenuPricesStream(JSONSFTPStream):
-    """Stream for Toast menu item price objects from menu export JSON files.
+class MenuMenusStream(MenuExportStream):
+    """Stream for Toast menu objects from menu export JSON files.
 
-    This stream extracts all price records with full parent context.
+    This stream extracts all menu records as flat objects, handling both
+    MenuExport (array format) and MenuExportV2 (object format) files.
     """
 
-    name = "menu_prices"
-    file_pattern = "MenuExport*.json"
-    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "item_guid", "price_id"]
-    generate_unique_ids = True
-
-    def process_json_files(self, location_id: str, date_folder: str) -> t.Iterable[dict]:
-        """Process JSON files in the given folder.
-
-        Args:
-            location_id: The location ID.
-            date_folder: The date folder name.
+    name = "menu_menus"
+    primary_keys = ["location_id", "date", "guid"]
+    entity = "menu"
+    entity_label = "menu"
 
-        Yields:
-            Price record dictionaries with full parent context.
-        """
-        folder_path = f"{location_id}/{date_folder}"
 
-        try:
-            # Get list of files in the folder
-            files = self._sftp_client.list_files(folder_path)
+class MenuGroupsStream(MenuExportStream):
+    """Stream for Toast menu group objects from menu export JSON files.
 
-            # Filter files that match our pattern
-            matching_files = [f for f in files if fnmatch.fnmatch(f, self.file_pattern)]
+    This stream extracts all menu group records with parent menu context.
+    """
 
-            if not matching_files:
-                self.logger.info(f"No files matching pattern '{self.file_pattern}' found in {folder_path}")
-                return
+    name = "menu_groups"
+    primary_keys = ["location_id", "date", "menu_guid", "guid"]
+    entity = "group"
+    entity_label = "group"
 
-            record_count = 0
-            for file_name in matching_files:
-                file_path = f"{folder_path}/{file_name}"
-                try:
-                    # Get file content
-                    json_data = json.loads(self._sftp_client.get_file_content(file_path).decode("utf-8"))
-
-                    # Extract menus based on file format
-                    menus = []
-                    if isinstance(json_data, list):
-                        # MenuExport format - array of menus
-                        menus = json_data
-                    elif isinstance(json_data, dict) and 'menus' in json_data:
-                        # MenuExportV2 format - object with menus array
-                        menus = json_data.get('menus', [])
-                    else:
-                        self.logger.warning(f"Unknown format in file {file_path}")
-                        continue
 
-                    # Process each menu, group, item, and price
-                    for menu in menus:
-                        if not isinstance(menu, dict) or not menu.get("guid"):
-                            continue
+class MenuItemsStream(MenuExportStream):
+    """Stream for Toast menu item objects from menu export JSON files.
 
-                        menu_guid = menu["guid"]
+    This stream extracts all menu item records with full parent context.
+    """
 
-                        for group in menu.get("groups", []):
-                            if not isinstance(group, dict) or not group.get("guid"):
-                                continue
+    name = "menu_items"
+    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "guid"]
+    entity = "item"
+    entity_label = "item"
 
-                            group_guid = group["guid"]
 
-                            for item in group.get("items", []):
-                                if not isinstance(item, dict) or not item.get("guid"):
-                                    continue
+class MenuOptionGroupsStream(MenuExportStream):
+    """Stream for Toast menu option group objects from menu export JSON files.
 
-                                item_guid = item["guid"]
+    This stream extracts all option group records with full parent context.
+    """
 
-                                for price_index, price in enumerate(item.get("prices", [])):
-                                    if not isinstance(price, dict):
-                                        continue
+    name = "menu_option_groups"
+    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "item_guid", "guid"]
+    entity = "option_group"
+    entity_label = "option group"
 
-                                    # Create a copy of the price record
-                                    price_record = price.copy()
 
-                                    # Add parent context
-                                    price_record["location_id"] = location_id
-                                    price_record["date"] = date_folder
-                                    price_record["menu_guid"] = menu_guid
-                                    price_record["group_guid"] = group_guid
-                                    price_record["item_guid"] = item_guid
+class MenuOptionItemsStream(MenuExportStream):
+    """Stream for Toast menu option item objects from menu export JSON files.
 
-                                    # Generate a unique price_id since prices don't have their own guid
-                                    # Use a combination of item_guid and price_index
-                                    price_id = f"{item_guid}_{price_index}"
-                                    if "guid" in price_record:
-                                        price_id = price_record["guid"]
-                                    elif "id" in price_record:
-                                        price_id = str(price_record["id"])
-                                    else:
-                                        # Create a hash-based ID from the price data
-                                        price_data = f"{item_guid}_{price_index}_{price.get('amount', '')}_{price.get('currency', '')}"
-                                        price_id = hashlib.md5(price_data.encode()).hexdigest()[:16]
+    This stream extracts all option item records with full parent context.
+    """
 
-                                    price_record["price_id"] = price_id
+    name = "menu_option_items"
+    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "item_guid", "option_group_guid", "guid"]
+    entity = "option_item"
+    entity_label = "option item"
 
-                                    # Validate primary keys before yielding
-                                    if self.validate_primary_keys(price_record):
-                                        record_count += 1
-                                        yield price_record
 
-                except Exception as e:
-                    self.logger.error(f"Error processing file {file_path} for location {location_id}, date {date_folder}: {e}")
-                    # Continue with next file instead of failing completely
-                    continue
+class MenuPricesStream(MenuExportStream):
+    """Stream for Toast menu item price objects from menu export JSON files.
 
-            self.logger.info(f"Processed {record_count} price records for location {location_id}, date {date_folder}")
+    This stream extracts all price records with full parent context.
+    """
 
-        except Exception as e:
-            self.logger.error(f"Error processing folder {folder_path} for location {location_id}: {e}")
-            # Return empty generator instead of raising an exception
-            return
+    name = "menu_prices"
+    primary_keys = ["location_id", "date", "menu_guid", "group_guid", "item_guid", "price_id"]
+    entity = "price"
+    entity_label = "price"
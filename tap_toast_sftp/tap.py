@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from singer_sdk import Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk.singerlib import StateMessage
 
 from tap_toast_sftp import streams
 from tap_toast_sftp.client import SFTPClient
@@ -17,6 +22,16 @@ class TapToastSFTP(Tap):
     # Shared SFTP client for all streams
     _shared_sftp_client = None
 
+    # During a concurrent sync, stream threads hand their messages to the writing
+    # thread in batches of message_batch_size through a queue holding at most
+    # message_queue_size batches. Streams block while the queue is full.
+    message_batch_size = 500
+    message_queue_size = 64
+    _message_queue = None
+    _message_stop = None
+    _message_local = None
+    _writer_thread_id = None
+
     config_jsonschema = th.PropertiesList(
         th.Property(
             "sftp_host",
@@ -56,6 +71,200 @@ class TapToastSFTP(Tap):
             title="SFTP Port",
             description="The port of the SFTP server (default: 22)",
         ),
+        th.Property(
+            "sftp_max_sessions",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=4,
+            title="SFTP Max Sessions",
+            description="Maximum number of concurrent SFTP channels opened over the SSH connection (default: 4)",
+        ),
+        th.Property(
+            "transport",
+            th.StringType(nullable=True),
+            required=False,
+            default="paramiko",
+            allowed_values=["paramiko", "asyncio"],
+            title="Transport",
+            description="SFTP implementation: paramiko (blocking calls on a session pool) or asyncio "
+            "(asyncssh on an event loop, needs the asyncio extra). With asyncio, the listings and "
+            "downloads of every location are scheduled at once (default: paramiko)",
+        ),
+        th.Property(
+            "sftp_connections",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=2,
+            title="SFTP Connections",
+            description="Number of SSH connections the asyncio transport spreads its requests over (default: 2)",
+        ),
+        th.Property(
+            "sftp_max_requests",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=128,
+            title="SFTP Max Requests",
+            description="Maximum number of listings and downloads the asyncio transport keeps in flight "
+            "at once (default: 128)",
+        ),
+        th.Property(
+            "location_workers",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=4,
+            title="Location Workers",
+            description="Number of locations each stream downloads and parses concurrently. Records are "
+            "still emitted from a single thread (default: 4)",
+        ),
+        th.Property(
+            "parse_processes",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=0,
+            title="Parse Processes",
+            description="Number of worker processes CSV and Excel files are parsed in, so files of different "
+            "locations are parsed on several cores. 0 parses in the tap process (default: 0)",
+        ),
+        th.Property(
+            "stream_workers",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=1,
+            title="Stream Workers",
+            description="Number of streams synced concurrently. Messages are still written by a single thread "
+            "and only the final STATE message is emitted. 1 syncs streams one after another (default: 1)",
+        ),
+        th.Property(
+            "shard_count",
+            th.IntegerType(nullable=True, minimum=1),
+            required=False,
+            default=1,
+            title="Shard Count",
+            description="Number of tap processes the locations are split across. Each location belongs to "
+            "the shard given by a stable hash of its ID (default: 1)",
+        ),
+        th.Property(
+            "shard_index",
+            th.IntegerType(nullable=True, minimum=0),
+            required=False,
+            default=0,
+            title="Shard Index",
+            description="Shard synced by this tap process, from 0 to shard_count - 1. Bookmarks are kept per "
+            "location partition, and the shards' locations are disjoint (default: 0)",
+        ),
+        th.Property(
+            "sftp_prefetch",
+            th.BooleanType(nullable=True),
+            required=False,
+            default=True,
+            title="SFTP Prefetch",
+            description="Pipeline read requests when downloading files instead of waiting a round trip per read (default: true)",
+        ),
+        th.Property(
+            "sftp_prefetch_max_requests",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=64,
+            title="SFTP Prefetch Max Requests",
+            description="Maximum number of outstanding read requests per download when prefetching (default: 64)",
+        ),
+        th.Property(
+            "sftp_prefetch_request_size",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=32768,
+            title="SFTP Prefetch Request Size",
+            description="Size in bytes of each pipelined read request (default: 32768)",
+        ),
+        th.Property(
+            "listing_cache_ttl",
+            th.NumberType(nullable=True),
+            required=False,
+            default=300,
+            title="Listing Cache TTL",
+            description="Seconds to keep remote directory listings cached for the run, 0 disables the cache (default: 300)",
+        ),
+        th.Property(
+            "file_cache_max_mb",
+            th.NumberType(nullable=True),
+            required=False,
+            default=512,
+            title="File Cache Max MB",
+            description="Memory budget in MB for downloaded file contents kept for reuse across streams, "
+            "least recently used files are evicted first (default: 512)",
+        ),
+        th.Property(
+            "csv_engine",
+            th.StringType(nullable=True),
+            required=False,
+            default="python",
+            allowed_values=["python", "pyarrow", "pandas"],
+            title="CSV Engine",
+            description="Parser for CSV files: python (csv module), pandas or pyarrow. The vectorized engines "
+            "parse in chunks and are faster on large files. pyarrow needs the arrow extra and falls back "
+            "to pandas when it is not installed (default: python)",
+        ),
+        th.Property(
+            "coerce_types",
+            th.BooleanType(nullable=True),
+            required=False,
+            default=False,
+            title="Coerce Types",
+            description="Convert CSV values to the integer, number, boolean and date-time types of the stream "
+            "schema while parsing, and drop columns missing from the schema (default: false)",
+        ),
+        th.Property(
+            "csv_streaming",
+            th.BooleanType(nullable=True),
+            required=False,
+            default=False,
+            title="CSV Streaming",
+            description="Parse CSV files while they download instead of caching the whole file first, "
+            "so records are emitted earlier and peak memory stays at one read buffer (default: false)",
+        ),
+        th.Property(
+            "json_streaming",
+            th.BooleanType(nullable=True),
+            required=False,
+            default=False,
+            title="JSON Streaming",
+            description="Decode JSON files one record at a time while they download instead of loading "
+            "the whole document, so peak memory for menu streams no longer grows with menu size (default: false)",
+        ),
+        th.Property(
+            "excel_engine",
+            th.StringType(nullable=True),
+            required=False,
+            default="auto",
+            allowed_values=["auto", "xlrd", "openpyxl", "calamine"],
+            title="Excel Engine",
+            description="Reader for Excel files. auto uses calamine when python-calamine is installed, "
+            "otherwise xlrd for .xls and openpyxl for .xlsx content (default: auto)",
+        ),
+        th.Property(
+            "record_cache",
+            th.BooleanType(nullable=True),
+            required=False,
+            default=False,
+            title="Record Cache",
+            description="Cache emitted records on disk so a stream context read again in the same run "
+            "is replayed instead of re-parsed (default: false)",
+        ),
+        th.Property(
+            "record_cache_dir",
+            th.StringType(nullable=True),
+            required=False,
+            title="Record Cache Directory",
+            description="Directory for the record cache file (default: system temporary directory)",
+        ),
+        th.Property(
+            "record_cache_batch_size",
+            th.IntegerType(nullable=True),
+            required=False,
+            default=1000,
+            title="Record Cache Batch Size",
+            description="Number of records held in memory before they are written to the record cache (default: 1000)",
+        ),
         th.Property(
             "locations",
             th.ArrayType(
@@ -87,7 +296,7 @@ class TapToastSFTP(Tap):
         """
         if self._shared_sftp_client is None:
             self.logger.info("Creating shared SFTP client for all streams")
-            self._shared_sftp_client = SFTPClient(self.config)
+            self._shared_sftp_client = SFTPClient.for_config(self.config)
             self._shared_sftp_client.connect()
         return self._shared_sftp_client
 
@@ -120,25 +329,208 @@ class TapToastSFTP(Tap):
             streams.TimeEntriesStream(self, shared_sftp_client=shared_client),
         ]
 
+    def get_file_consumers(self) -> dict[str, int]:
+        """Count the selected streams reading each file.
+
+        Returns:
+            Mapping of file name or pattern to the number of selected streams reading it.
+        """
+        consumers = {}
+        for stream in self.streams.values():
+            if stream.selected and stream.file_key:
+                consumers[stream.file_key] = consumers.get(stream.file_key, 0) + 1
+        return consumers
+
     def sync_all(self):
         """Sync all streams."""
         try:
-            # Use the standard sync_all method
-            super().sync_all()
+            # Fails early on invalid shard settings
+            stream = next(iter(self.streams.values()), None)
+            if stream is not None and stream.shard is not None:
+                shard_index, shard_count = stream.shard
+                self.logger.info(
+                    f"Syncing shard {shard_index}/{shard_count}: "
+                    f"{len(stream.get_location_ids())} of {len(stream.locations)} locations"
+                )
+
+            # Tell the file content cache how many streams read each file, so a file
+            # is freed as soon as its last selected stream has processed it
+            self.get_shared_sftp_client().set_file_consumers(self.get_file_consumers())
+            # Menu export files are only flattened for the selected menu streams
+            streams.MenuExportStream.set_selected_entities(
+                stream.entity
+                for stream in self.streams.values()
+                if stream.selected and isinstance(stream, streams.MenuExportStream)
+            )
+
+            if self.stream_workers > 1:
+                self.sync_streams_concurrently()
+            else:
+                # Use the standard sync_all method
+                super().sync_all()
         finally:
-            # Clear any cached file content
+            # Clear any cached file content and directory listings
             if self._shared_sftp_client:
+                self.logger.info(f"File content cache stats: {self._shared_sftp_client.get_file_cache_stats()}")
                 self.logger.info("Clearing file content cache")
                 self._shared_sftp_client.clear_file_cache()
+                self.logger.info(f"Directory listing cache stats: {self._shared_sftp_client.get_listing_cache_stats()}")
+                self._shared_sftp_client.invalidate_listing_cache()
+
+            # Stop locations still processed ahead of partitions that were not synced
+            for stream in self.streams.values():
+                stream.close_location_pipeline()
 
             # Clear record caches
             from tap_toast_sftp.client import ToastSFTPStream
             self.logger.info("Clearing record caches")
             ToastSFTPStream.clear_all_record_caches()
+            ToastSFTPStream.clear_date_folder_cache()
+            ToastSFTPStream.shutdown_parse_pool()
+            streams.MenuExportStream.clear_menu_document_cache()
 
             # Ensure the shared SFTP client is closed when done
             self.close_shared_sftp_client()
 
+    @property
+    def stream_workers(self) -> int:
+        """Get the number of streams synced concurrently.
+
+        Returns:
+            The stream_workers setting.
+        """
+        return max(1, int(self.config.get("stream_workers") or 1))
+
+    @property
+    def is_syncing_concurrently(self) -> bool:
+        """Whether streams are currently being synced by sync_streams_concurrently."""
+        return self._message_queue is not None
+
+    def write_message(self, message) -> None:
+        """Write a message, or queue it for the writing thread during a concurrent sync.
+
+        Args:
+            message: The Singer message.
+        """
+        if self._message_queue is None or threading.get_ident() == self._writer_thread_id:
+            super().write_message(message)
+            return
+
+        buffer = getattr(self._message_local, "messages", None)
+        if buffer is None:
+            buffer = self._message_local.messages = []
+        buffer.append(message)
+        if len(buffer) >= self.message_batch_size:
+            self._flush_messages()
+
+    def _flush_messages(self) -> None:
+        """Queue the current thread's buffered messages for the writing thread."""
+        buffer = getattr(self._message_local, "messages", None)
+        if buffer:
+            self._message_local.messages = []
+            self._put_message_item(buffer)
+
+    def _put_message_item(self, item) -> None:
+        """Put an item on the message queue, waiting while it is full.
+
+        Args:
+            item: A batch of messages or a stream completion marker.
+
+        Raises:
+            RuntimeError: If the writing thread has stopped.
+        """
+        while not self._message_stop.is_set():
+            try:
+                self._message_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise RuntimeError("Concurrent sync was aborted")
+
+    def sync_streams_concurrently(self) -> None:
+        """Sync the selected streams on a pool of stream_workers threads.
+
+        Follows the SDK's sync_all, except that streams run concurrently. Each
+        stream's messages are queued in the order the stream writes them and
+        written out by the calling thread, so a stream's SCHEMA precedes its
+        RECORD messages and output lines never interleave. Streams do not write
+        intermediate STATE messages, since one stream's bookmark could be written
+        ahead of another stream's queued records. A single STATE message is written
+        once every stream has finished.
+        """
+        self._reset_state_progress_markers()
+        self._set_compatible_replication_methods()
+        if self.state:
+            self.write_message(StateMessage(value=self.state))
+
+        selected = []
+        for stream in self.streams.values():
+            if not stream.selected and not stream.has_selected_descendents:
+                self.logger.info("Skipping deselected stream '%s'.", stream.name)
+                continue
+            if stream.parent_stream_type:
+                # Child streams are synced by their parent stream
+                continue
+            selected.append(stream)
+
+        workers = min(self.stream_workers, len(selected)) or 1
+        self.logger.info(f"Syncing {len(selected)} streams with {workers} workers")
+
+        self._message_queue = queue.Queue(maxsize=self.message_queue_size)
+        self._message_stop = threading.Event()
+        self._message_local = threading.local()
+        self._writer_thread_id = threading.get_ident()
+
+        def run(stream) -> None:
+            error = None
+            try:
+                stream.sync()
+                stream.finalize_state_progress_markers()
+            except Exception as e:
+                error = e
+            try:
+                self._flush_messages()
+                self._put_message_item((stream, error))
+            except RuntimeError:
+                # The writing thread has stopped, nothing more is written
+                pass
+
+        errors = []
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stream")
+        try:
+            for stream in selected:
+                executor.submit(run, stream)
+
+            pending = len(selected)
+            while pending:
+                item = self._message_queue.get()
+                if isinstance(item, tuple):
+                    # A stream has finished and all of its messages were written
+                    stream, error = item
+                    pending -= 1
+                    if error is not None:
+                        self.logger.error(f"Stream {stream.name} failed: {error}")
+                        errors.append(error)
+                    continue
+                for message in item:
+                    self.write_message(message)
+        finally:
+            # Stops streams still writing when the writing thread fails
+            self._message_stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._message_queue = None
+            self._writer_thread_id = None
+
+        if errors:
+            raise errors[0]
+
+        # Every record is written, so the final state cannot run ahead of the output
+        if self.state:
+            self.write_message(StateMessage(value=self.state))
+
+        for stream in self.streams.values():
+            stream.log_sync_costs()
+
     def close_shared_sftp_client(self):
         """Close the shared SFTP client if it exists."""
         if self._shared_sftp_client is not None:
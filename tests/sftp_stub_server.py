@@ -0,0 +1,145 @@
+"""A local SFTP server serving a directory, for tests that need a real SSH transport."""
+
+import os
+import socket
+import threading
+
+import paramiko
+
+USERNAME = "test-user"
+PASSWORD = "test-password"
+
+
+class StubServer(paramiko.ServerInterface):
+    """SSH server accepting one username and password."""
+
+    def check_auth_password(self, username, password):
+        """Accept the test credentials."""
+        if (username, password) == (USERNAME, PASSWORD):
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        """Only allow password authentication."""
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        """Allow session channels."""
+        return paramiko.OPEN_SUCCEEDED
+
+
+class StubSFTPHandle(paramiko.SFTPHandle):
+    """Handle of a file opened for reading."""
+
+    def stat(self):
+        """Stat the open file."""
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+
+class StubSFTPInterface(paramiko.SFTPServerInterface):
+    """Read-only SFTP interface over a local directory."""
+
+    def __init__(self, server, root, stats, *args, **kwargs):
+        """Initialize the interface.
+
+        Args:
+            server: The SSH server interface.
+            root: The local directory served as "/".
+            stats: Shared counters of the stub server.
+        """
+        super().__init__(server, *args, **kwargs)
+        self.root = root
+        self.stats = stats
+
+    def session_started(self):
+        """Count the open SFTP sessions."""
+        with self.stats["lock"]:
+            self.stats["active"] += 1
+            self.stats["opened"] += 1
+            self.stats["max_active"] = max(self.stats["max_active"], self.stats["active"])
+
+    def session_ended(self):
+        """Count the open SFTP sessions."""
+        with self.stats["lock"]:
+            self.stats["active"] -= 1
+
+    def _local(self, path):
+        return os.path.join(self.root, self.canonicalize(path).lstrip("/"))
+
+    def canonicalize(self, path):
+        """Resolve a path relative to the root."""
+        return os.path.normpath("/" + path).replace(os.sep, "/")
+
+    def list_folder(self, path):
+        """List a directory with attributes."""
+        local = self._local(path)
+        try:
+            return [
+                paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(local, name)), filename=name)
+                for name in os.listdir(local)
+            ]
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    def stat(self, path):
+        """Stat a path."""
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._local(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        """Open a file for reading."""
+        try:
+            local_file = open(self._local(path), "rb")
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        handle = StubSFTPHandle(flags)
+        handle.filename = self._local(path)
+        handle.readfile = local_file
+        return handle
+
+
+class StubSFTPServer:
+    """SFTP server on a local port serving a directory, one thread per connection."""
+
+    def __init__(self, root):
+        """Start listening.
+
+        Args:
+            root: The local directory served as "/".
+        """
+        self.root = root
+        self.host_key = paramiko.RSAKey.generate(1024)
+        self.stats = {"lock": threading.Lock(), "active": 0, "opened": 0, "max_active": 0}
+        self.transports = []
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(8)
+        self.port = self._socket.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(connection)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler("sftp", paramiko.SFTPServer, StubSFTPInterface, self.root, self.stats)
+            transport.start_server(server=StubServer())
+            self.transports.append(transport)
+
+    def close(self):
+        """Stop listening and close every connection."""
+        self._socket.close()
+        for transport in self.transports:
+            transport.close()
@@ -59,8 +59,7 @@ def create_sample_excel():
 def mock_sftp_client():
     """Create a mock SFTP client."""
     mock_client = MagicMock()
-    mock_client.__enter__.return_value = mock_client
-    mock_client.get_file_content.return_value = create_sample_excel()
+    mock_client.get_cached_file_content.return_value = create_sample_excel()
     return mock_client
 
 
@@ -75,9 +74,8 @@ def test_process_excel_file(mock_sftp_client):
     handler.setLevel(logging.DEBUG)
     logger.addHandler(handler)
 
-    # Create a stream instance with a mock config
-    stream = AccountingReportStream(tap=MagicMock())
-    stream._sftp_client = mock_sftp_client
+    # Create a stream instance using the mock client as the tap's shared client
+    stream = AccountingReportStream(tap=MagicMock(), shared_sftp_client=mock_sftp_client)
 
     # Set up a mock logger for the stream
     mock_logger = MagicMock()
@@ -139,3 +137,19 @@ def test_process_excel_file(mock_sftp_client):
     assert records[1]["amount"] == 678.90
     assert records[1]["location_id"] == location_id
     assert records[1]["date"] == date_folder
+
+
+def test_process_excel_file_uses_shared_cached_client(mock_sftp_client):
+    """Test that the report is read through the file cache without reconnecting."""
+    stream = AccountingReportStream(tap=MagicMock(), shared_sftp_client=mock_sftp_client)
+
+    records = list(stream.process_excel_file("201419", "20250514"))
+
+    assert len(records) == 2
+    mock_sftp_client.get_cached_file_content.assert_called_once_with(
+        "201419", "20250514", "/201419/20250514/AccountingReport.xls"
+    )
+    mock_sftp_client.get_file_content.assert_not_called()
+    mock_sftp_client.__enter__.assert_not_called()
+    mock_sftp_client.disconnect.assert_not_called()
+    mock_sftp_client.release_file_content.assert_called_once()
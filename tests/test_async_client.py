@@ -0,0 +1,231 @@
+"""Tests for the asyncio SFTP transport."""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tap_toast_sftp.client import LocationPipeline, SFTPClient, ToastSFTPStream
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+from tests.sftp_stub_server import PASSWORD, USERNAME, StubSFTPServer
+
+try:
+    import asyncssh
+except ImportError:  # pragma: no cover - depends on the environment
+    asyncssh = None
+
+LOCATIONS = [str(location_id) for location_id in range(101, 113)]
+
+
+@unittest.skipIf(asyncssh is None, "asyncssh is not installed")
+class TestAsyncSFTPClient(unittest.TestCase):
+    """Test cases for AsyncSFTPClient against a local SFTP server."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Serve one OrderDetails.csv per location from a local SFTP server."""
+        cls.root = tempfile.mkdtemp()
+        cls.contents = {}
+        for location_id in LOCATIONS:
+            folder = os.path.join(cls.root, location_id, "20250514")
+            os.makedirs(folder)
+            content = os.urandom(150_000)
+            with open(os.path.join(folder, "OrderDetails.csv"), "wb") as f:
+                f.write(content)
+            cls.contents[f"/{location_id}/20250514/OrderDetails.csv"] = content
+        cls.server = StubSFTPServer(cls.root)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the server and remove the served files."""
+        cls.server.close()
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        """Connect an asyncio client."""
+        logging.disable(logging.CRITICAL)
+        self.config = {
+            "sftp_host": "127.0.0.1",
+            "sftp_port": self.server.port,
+            "sftp_username": USERNAME,
+            "sftp_password": PASSWORD,
+            "transport": "asyncio",
+            "sftp_connections": 2,
+            "sftp_max_requests": 64,
+            "sftp_prefetch_request_size": 16384,
+            "locations": [{"id": location_id} for location_id in LOCATIONS],
+        }
+        self.client = SFTPClient.for_config(self.config)
+        self.client.connect()
+        self.addCleanup(self.client.disconnect)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+        ToastSFTPStream.clear_date_folder_cache()
+
+    def test_blocking_interface(self):
+        """Test that the asyncio client answers like the paramiko client."""
+        path = f"/{LOCATIONS[0]}/20250514/OrderDetails.csv"
+
+        self.assertEqual(self.client.list_files(f"/{LOCATIONS[0]}"), ["20250514"])
+        self.assertTrue(self.client.is_directory(f"/{LOCATIONS[0]}"))
+        self.assertFalse(self.client.is_directory(path))
+        self.assertFalse(self.client.is_directory("/missing"))
+        self.assertEqual(self.client.get_file_content(path), self.contents[path])
+        self.assertEqual(self.client.get_file_content("/missing.csv"), b"")
+        self.assertEqual(b"".join(self.client.iter_file_chunks(path, chunk_size=32768)), self.contents[path])
+        with self.assertRaises(FileNotFoundError):
+            list(self.client.iter_file_chunks("/missing.csv"))
+
+    @patch("tap_toast_sftp.async_client.time.sleep")
+    def test_stream_resumes_after_dropped_connection(self, mock_sleep):
+        """Test that a stream whose connection drops midway resumes at the byte it reached."""
+        path = f"/{LOCATIONS[0]}/20250514/OrderDetails.csv"
+        chunks = self.client.iter_file_chunks(path, chunk_size=32768)
+        first = next(chunks)
+        for conn, _ in self.client._connections:
+            conn.close()
+
+        self.assertEqual(first + b"".join(chunks), self.contents[path])
+        mock_sleep.assert_called_once()
+
+    def test_list_dirs_lists_every_directory(self):
+        """Test that listing many directories at once returns each listing, empty for missing ones."""
+        paths = [f"/{location_id}" for location_id in LOCATIONS] + ["/missing"]
+
+        listings = self.client.list_dirs(paths)
+
+        self.assertEqual(set(listings), set(paths))
+        self.assertEqual(listings["/missing"], [])
+        for location_id in LOCATIONS:
+            self.assertEqual([e.filename for e in listings[f"/{location_id}"]], ["20250514"])
+
+    def test_prefetched_files_are_downloaded_once(self):
+        """Test that files read after prefetch_files wait for the scheduled download."""
+        keys = [(path.split("/")[1], "20250514", path) for path in self.contents]
+
+        with patch.object(self.client, "get_file_content") as mock_get:
+            self.client.prefetch_files(keys)
+            for key in keys:
+                self.assertEqual(self.client.get_cached_file_content(*key), self.contents[key[2]])
+
+        mock_get.assert_not_called()
+        self.assertEqual(self.client.get_file_cache_stats()["misses"], len(keys))
+
+    def test_cancelled_prefetch_fails_its_readers(self):
+        """Test that a download cancelled before it ran fails instead of leaving readers waiting."""
+        key = (LOCATIONS[0], "20250514", f"/{LOCATIONS[0]}/20250514/OrderDetails.csv")
+
+        # Holding the event loop keeps the download task from being created before the disconnect
+        with patch.object(self.client, "_start_prefetch_task"):
+            self.client.prefetch_files([key])
+        download = self.client._file_downloads[key]
+        self.client.disconnect()
+
+        self.assertIsInstance(download.exception(timeout=5), ConnectionError)
+        self.assertEqual(self.client._file_downloads, {})
+        self.assertEqual(self.client._prefetch_downloads, {})
+
+    def test_cancelled_running_prefetch_raises_connection_error(self):
+        """Test that a download cancelled while running fails with an ordinary exception."""
+        key = (LOCATIONS[0], "20250514", f"/{LOCATIONS[0]}/20250514/OrderDetails.csv")
+        started = threading.Event()
+
+        async def hang(path, timeout):
+            started.set()
+            await asyncio.sleep(60)
+
+        with patch.object(self.client, "_download_async", side_effect=hang):
+            self.client.prefetch_files([key])
+            self.assertTrue(started.wait(5))
+            download = self.client._file_downloads[key]
+            self.client.disconnect()
+
+        self.assertIsInstance(download.exception(timeout=5), ConnectionError)
+
+    def test_dropped_connection_is_reopened_alone(self):
+        """Test that reconnecting reopens only the dropped connection."""
+        (first, _), (second, _) = self.client._connections
+        first.close()
+        self.client._run(first.wait_closed())
+
+        self.client.connect()
+
+        self.assertIsNot(self.client._connections[0][0], first)
+        self.assertIs(self.client._connections[1][0], second)
+        self.assertFalse(second.is_closed())
+
+    def test_stream_lists_every_location(self):
+        """Test that a stream lists every location at once without downloading their files."""
+        mock_tap = MagicMock()
+        mock_tap.config = self.config
+        stream = OrderDetailsStream(tap=mock_tap, shared_sftp_client=self.client)
+        self.client.prefetch_files = MagicMock(wraps=self.client.prefetch_files)
+
+        stream.prefetch_locations(LOCATIONS)
+
+        self.assertEqual(stream.get_date_folders(LOCATIONS[0]), ["20250514"])
+        self.client.prefetch_files.assert_not_called()
+
+    def test_pipeline_prefetches_a_window_ahead(self):
+        """Test that the location pipeline downloads files only a few locations ahead."""
+        mock_tap = MagicMock()
+        mock_tap.config = {**self.config, "location_workers": 2}
+        stream = OrderDetailsStream(tap=mock_tap, shared_sftp_client=self.client)
+        stream.prefetch_locations(LOCATIONS)
+        stream.prefetch_location_files = MagicMock()
+        gate = threading.Event()
+
+        def process(location_id, date_folder):
+            gate.wait(5)
+            return iter(())
+
+        pipeline = LocationPipeline(stream, LOCATIONS, process, workers=2)
+        try:
+            (location_ids,), _ = stream.prefetch_location_files.call_args
+            self.assertEqual(location_ids, LOCATIONS[:4])
+            gate.set()
+            for location_id in LOCATIONS:
+                list(pipeline.iter_records(location_id))
+        finally:
+            pipeline.close()
+
+        prefetched = [
+            location_id
+            for call in stream.prefetch_location_files.call_args_list
+            for location_id in call.args[0]
+        ]
+        # Never twice, and never a location a worker had already started
+        self.assertEqual(len(prefetched), len(set(prefetched)))
+        self.assertLessEqual(len(prefetched), len(LOCATIONS))
+
+
+class TestTransportSelection(unittest.TestCase):
+    """Test cases for SFTPClient.for_config."""
+
+    def test_paramiko_is_the_default(self):
+        """Test that the paramiko client is used unless asyncio is configured."""
+        client = SFTPClient.for_config({"sftp_host": "localhost", "sftp_username": "u", "sftp_password": "p"})
+        self.assertIs(type(client), SFTPClient)
+
+    @patch("tap_toast_sftp.async_client.asyncssh", None)
+    def test_asyncio_needs_asyncssh(self):
+        """Test that the asyncio transport fails clearly without asyncssh."""
+        from singer_sdk.exceptions import ConfigValidationError
+
+        with self.assertRaises(ConfigValidationError):
+            SFTPClient.for_config({
+                "sftp_host": "localhost",
+                "sftp_username": "u",
+                "sftp_password": "p",
+                "transport": "asyncio",
+            })
+
+
+if __name__ == "__main__":
+    unittest.main()
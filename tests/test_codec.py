@@ -0,0 +1,46 @@
+"""Tests for the JSON codec."""
+
+import hashlib
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from tap_toast_sftp.codec import dumps_for_hash, loads_json
+from tap_toast_sftp.streams.menu_streams import MenuItemsStream
+
+
+class TestCodec(unittest.TestCase):
+    """Test cases for loads_json and dumps_for_hash."""
+
+    def test_loads_matches_stdlib(self):
+        """Test that documents decode the same as json.loads from bytes and str."""
+        document = '{"menus": [{"name": "Café ☕", "price": 12.5, "count": 3, "tags": [], "x": null}]}'
+        self.assertEqual(loads_json(document.encode("utf-8")), json.loads(document))
+        self.assertEqual(loads_json(document), json.loads(document))
+
+    def test_loads_falls_back_for_stdlib_only_documents(self):
+        """Test that NaN literals decode and malformed documents still raise."""
+        self.assertNotEqual(loads_json(b"[NaN]")[0], loads_json(b"[NaN]")[0])
+        with self.assertRaises(ValueError):
+            loads_json(b"{not json")
+
+    def test_hash_input_matches_json_dumps(self):
+        """Test that hash input is byte-identical to json.dumps with sorted keys."""
+        for value in ({"b": "Café", "a": "1", "c": "☃"}, {"location_id": "123", "date": "20250514"}, {}):
+            self.assertEqual(dumps_for_hash(value), json.dumps(value, sort_keys=True).encode("utf-8"))
+
+    def test_generated_ids_are_unchanged(self):
+        """Test that generated IDs keep their previous value."""
+        tap = MagicMock()
+        tap.config = {"locations": [{"id": "123"}]}
+        stream = MenuItemsStream(tap=tap, shared_sftp_client=MagicMock())
+        record = {"name": "Crème brûlée", "price": 8.5, "guid": None, "location_id": "123"}
+
+        expected = hashlib.md5(
+            json.dumps({"location_id": "123", "name": "Crème brûlée", "price": "8.5"}, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        self.assertEqual(stream.generate_hash_id(record), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Tests for schema-driven type coercion."""
+
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+from singer_sdk.helpers._typing import TypeConformanceLevel
+
+from tap_toast_sftp.coercion import (
+    CONVERTERS,
+    coerce_series,
+    compile_coercion_plan,
+    to_datetime_string,
+    to_integer,
+    to_number,
+)
+from tap_toast_sftp.streams.base import pa_csv
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+
+SAMPLE = (
+    "Order Id,Opened,# of Guests,Amount,Unknown Column\n"
+    "1,5/14/25 5:54 PM,2,$1,234.50,x\n"
+    "2,,,,\n"
+    "3,not a date,4,12.5,y\n"
+)
+
+
+class TestConverters(unittest.TestCase):
+    """Test cases for the value converters."""
+
+    def test_compile_plan_from_schema(self):
+        """Test that only typed properties end up in the plan."""
+        plan = compile_coercion_plan({
+            "properties": {
+                "order_id": {"type": ["string", "null"]},
+                "opened": {"type": ["string", "null"], "format": "date-time"},
+                "amount": {"type": ["number", "null"]},
+                "count": {"type": "integer"},
+                "voided": {"type": ["boolean", "null"]},
+            }
+        })
+
+        self.assertEqual(plan, {"opened": "date-time", "amount": "number", "count": "integer", "voided": "boolean"})
+
+    def test_converters_keep_unparseable_values(self):
+        """Test conversions and that unexpected formats are passed through."""
+        self.assertEqual(to_number("$1,234.50"), 1234.5)
+        self.assertIsNone(to_number("nan"))
+        self.assertEqual(to_number("n/a"), "n/a")
+        self.assertEqual(to_integer("3.0"), 3)
+        self.assertEqual(to_integer("3.5"), "3.5")
+        self.assertEqual(to_datetime_string("5/14/25 5:54 PM"), "2025-05-14T17:54:00")
+        self.assertEqual(to_datetime_string("not a date"), "not a date")
+
+    def test_bulk_conversion_matches_per_value(self):
+        """Test that column conversion gives the same values as the per-value converters."""
+        columns = {
+            "number": ["1.5", None, "$2,000", "n/a", "inf"],
+            "integer": ["1", "2.0", None, "x"],
+            "date-time": ["5/14/25 5:54 PM", None, "5/14/2025 11:02 AM", "later"],
+        }
+        for kind, values in columns.items():
+            expected = [None if v is None else CONVERTERS[kind](v) for v in values]
+            result = coerce_series(kind, pd.Series(values, dtype=object)).tolist()
+            self.assertEqual(result, expected, kind)
+
+
+class TestStreamCoercion(unittest.TestCase):
+    """Test cases for coerce_types in the CSV engines."""
+
+    def setUp(self):
+        """Disable logging."""
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def make_stream(self, **config):
+        """Create an OrderDetails stream serving the sample file."""
+        mock_client = MagicMock()
+        mock_client.get_cached_file_content.return_value = SAMPLE.replace("$1,234.50", '"$1,234.50"').encode("utf-8")
+        mock_tap = MagicMock()
+        mock_tap.config = {"locations": [{"id": "123"}], **config}
+        return OrderDetailsStream(tap=mock_tap, shared_sftp_client=mock_client)
+
+    def test_records_are_typed(self):
+        """Test that typed columns are converted and unknown columns dropped."""
+        stream = self.make_stream(coerce_types=True)
+        records = list(stream.process_csv_file("123", "20250514"))
+
+        self.assertEqual(records[0]["opened"], "2025-05-14T17:54:00")
+        self.assertEqual(records[0]["amount"], 1234.5)
+        self.assertEqual(records[2]["opened"], "not a date")
+        self.assertIsNone(records[1]["amount"])
+        self.assertNotIn("unknown_column", records[0])
+        self.assertEqual(stream.TYPE_CONFORMANCE_LEVEL, TypeConformanceLevel.NONE)
+
+    def test_coercion_is_off_by_default(self):
+        """Test that values stay strings unless coerce_types is enabled."""
+        stream = self.make_stream()
+        records = list(stream.process_csv_file("123", "20250514"))
+
+        self.assertEqual(records[0]["amount"], "$1,234.50")
+        self.assertEqual(records[0]["unknown_column"], "x")
+        self.assertEqual(stream.TYPE_CONFORMANCE_LEVEL, TypeConformanceLevel.RECURSIVE)
+
+    def test_engines_agree(self):
+        """Test that the vectorized engines produce the same typed records."""
+        expected = list(self.make_stream(coerce_types=True).process_csv_file("123", "20250514"))
+        engines = ["pandas"] + (["pyarrow"] if pa_csv is not None else [])
+        for engine in engines:
+            stream = self.make_stream(coerce_types=True, csv_engine=engine)
+            self.assertEqual(list(stream.process_csv_file("123", "20250514")), expected, engine)
+
+
+if __name__ == "__main__":
+    unittest.main()
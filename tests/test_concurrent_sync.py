@@ -0,0 +1,109 @@
+"""Tests for syncing streams concurrently."""
+
+import logging
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from singer_sdk.singerlib import RecordMessage, SchemaMessage, StateMessage
+
+from tap_toast_sftp.tap import TapToastSFTP
+
+CONFIG = {
+    "sftp_host": "sftp.toasttab.com",
+    "sftp_username": "test-username",
+    "sftp_password": "test-password",
+    "locations": [{"id": "123"}],
+    "stream_workers": 4,
+}
+
+
+class MessageCollector:
+    """Message writer recording messages and the threads writing them."""
+
+    def __init__(self):
+        """Initialize the collector."""
+        self.messages = []
+        self.threads = set()
+
+    def write_message(self, message):
+        """Record a message."""
+        self.threads.add(threading.current_thread())
+        self.messages.append(message)
+
+
+class TestConcurrentSync(unittest.TestCase):
+    """Test cases for TapToastSFTP.sync_streams_concurrently."""
+
+    def setUp(self):
+        """Create a tap whose streams emit generated records."""
+        logging.disable(logging.CRITICAL)
+        patcher = patch("tap_toast_sftp.tap.SFTPClient")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.tap = TapToastSFTP(config=CONFIG, parse_env_config=False)
+        self.tap.message_batch_size = 3
+        self.tap.message_queue_size = 2
+        self.writer = MessageCollector()
+        self.tap.message_writer = self.writer
+
+        for stream in self.tap.streams.values():
+            stream._get_records = MagicMock(side_effect=lambda context, stream=stream: self.records(stream))
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def records(self, stream, count=10):
+        """Generate records with every primary key set."""
+        for i in range(count):
+            record = {key: f"{stream.name}-{i}" for key in stream.primary_keys}
+            record.update({"location_id": "123", "date": "20250514"})
+            if stream.replication_key:
+                record[stream.replication_key] = f"2025-05-14T00:00:{i:02d}"
+            yield record
+
+    def test_messages_are_written_in_stream_order_by_one_thread(self):
+        """Test that each stream's SCHEMA precedes its records and only a final STATE is written."""
+        # Only passes if the first two streams run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        streams = list(self.tap.streams.values())
+
+        def overlapping_records(context, stream):
+            barrier.wait()
+            yield from self.records(stream)
+
+        for stream in streams[:2]:
+            stream._get_records = MagicMock(side_effect=lambda context, stream=stream: overlapping_records(context, stream))
+
+        self.tap.sync_all()
+
+        self.assertEqual(self.writer.threads, {threading.current_thread()})
+        for stream in streams:
+            stream_messages = [
+                m for m in self.writer.messages
+                if isinstance(m, (SchemaMessage, RecordMessage)) and m.stream == stream.name
+            ]
+            self.assertIsInstance(stream_messages[0], SchemaMessage, stream.name)
+            self.assertEqual(len(stream_messages), 11, stream.name)
+
+        states = [m for m in self.writer.messages if isinstance(m, StateMessage)]
+        self.assertEqual(len(states), 1)
+        self.assertIs(self.writer.messages[-1], states[0])
+
+    def test_failed_stream_is_raised_after_the_others(self):
+        """Test that a failing stream does not stop the other streams from being written."""
+        streams = list(self.tap.streams.values())
+        streams[0]._get_records = MagicMock(side_effect=RuntimeError("boom"))
+
+        with self.assertRaises(RuntimeError):
+            self.tap.sync_all()
+
+        written = {m.stream for m in self.writer.messages if isinstance(m, RecordMessage)}
+        self.assertEqual(written, {stream.name for stream in streams[1:]})
+        self.assertFalse(self.tap.is_syncing_concurrently)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""Tests for CSV parsing in CSVSFTPStream."""
+
+import io
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+from tap_toast_sftp.streams.base import iter_record_blocks, iter_text_lines, pa_csv, transform_field_name
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+
+
+class TestCSVStream(unittest.TestCase):
+    """Test cases for CSVSFTPStream.process_csv_file."""
+
+    def setUp(self):
+        """Set up a stream reading CSV content from a mock client."""
+        logging.disable(logging.CRITICAL)
+        self.mock_client = MagicMock()
+        self.mock_tap = MagicMock()
+        self.mock_tap.config = {"locations": [{"id": "123"}]}
+        self.stream = OrderDetailsStream(tap=self.mock_tap, shared_sftp_client=self.mock_client)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def process(self, content):
+        """Process CSV content and return the records."""
+        self.mock_client.get_cached_file_content.return_value = content.encode("utf-8")
+        return list(self.stream.process_csv_file("123", "20250514"))
+
+    def test_transform_field_name(self):
+        """Test the snake_case normalization of Toast column names."""
+        self.assertEqual(transform_field_name("Order Id"), "order_id")
+        self.assertEqual(transform_field_name("Discount %"), "discount_pct")
+        self.assertEqual(transform_field_name("Void?"), "void")
+        self.assertEqual(transform_field_name("Tab Name (Guest) / Table #"), "tab_name_guest_table_num")
+        self.assertEqual(self.stream.transform_field_name("Order #"), "order_num")
+
+    def test_rows_use_compiled_header(self):
+        """Test that rows are keyed by the normalized header with empty cells as None."""
+        records = self.process('Order Id,Order #,Tab Name\n1,100,"Smith, J"\n2,,\n')
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["order_id"], "1")
+        self.assertEqual(records[0]["tab_name"], "Smith, J")
+        self.assertIsNone(records[1]["order_num"])
+        self.assertEqual((records[1]["location_id"], records[1]["date"]), ("123", "20250514"))
+
+    def test_short_and_blank_rows(self):
+        """Test that short rows are padded with None and blank lines are skipped."""
+        records = self.process("Order Id,Order #,Tab Name\n\n1,100\n")
+
+        self.assertEqual(len(records), 1)
+        self.assertIsNone(records[0]["tab_name"])
+
+    def test_header_is_compiled_once_per_file(self):
+        """Test that field names are normalized once per file, not per cell."""
+        self.stream.transform_field_name = MagicMock(side_effect=transform_field_name)
+
+        self.process("Order Id,Order #\n" + "1,100\n" * 50)
+
+        self.assertEqual(self.stream.transform_field_name.call_count, 2)
+
+    def test_iter_text_lines_across_chunks(self):
+        """Test that lines and multi-byte characters split across chunks are rejoined."""
+        data = "Order Id,Tab Name\r\n1,Café\n2,Ünal".encode("utf-8")
+        # Split inside the two-byte "é" and inside a line
+        chunks = [data[:25], data[25:30], data[30:]]
+
+        self.assertEqual(
+            list(iter_text_lines(chunks)),
+            ["Order Id,Tab Name\r\n", "1,Café\n", "2,Ünal"],
+        )
+
+    def test_streaming_mode_reads_remote_chunks(self):
+        """Test that csv_streaming parses the remote file without the file cache."""
+        self.mock_tap.config["csv_streaming"] = True
+        stream = OrderDetailsStream(tap=self.mock_tap, shared_sftp_client=self.mock_client)
+        data = 'Order Id,Tab Name\n1,"multi\nline"\n2,Café\n'.encode("utf-8")
+        self.mock_client.iter_file_chunks.return_value = iter([data[i:i + 4] for i in range(0, len(data), 4)])
+
+        records = list(stream.process_csv_file("123", "20250514"))
+
+        self.assertEqual([r["tab_name"] for r in records], ["multi\nline", "Café"])
+        self.mock_client.iter_file_chunks.assert_called_once_with("/123/20250514/OrderDetails.csv")
+        self.mock_client.get_cached_file_content.assert_not_called()
+
+    def test_streaming_mode_missing_file(self):
+        """Test that a missing file is skipped in streaming mode."""
+        self.mock_tap.config["csv_streaming"] = True
+        stream = OrderDetailsStream(tap=self.mock_tap, shared_sftp_client=self.mock_client)
+        self.mock_client.iter_file_chunks.side_effect = FileNotFoundError("missing")
+
+        self.assertEqual(list(stream.process_csv_file("123", "20250514")), [])
+
+    def test_streaming_failure_fails_the_location(self):
+        """Test that a streamed file failing midway keeps its location from being bookmarked."""
+        self.mock_tap.config["csv_streaming"] = True
+        stream = OrderDetailsStream(tap=self.mock_tap, shared_sftp_client=self.mock_client)
+        stream.batch_size = 1
+
+        def chunks(path):
+            yield b"Order Id\n1\n"
+            raise EOFError("connection lost")
+
+        self.mock_client.iter_file_chunks.side_effect = chunks
+
+        self.assertEqual([r["order_id"] for r in stream.process_csv_file("123", "20250514")], ["1"])
+        self.assertEqual(stream._failed_locations, {"123"})
+
+
+class TestCSVEngines(unittest.TestCase):
+    """Test that the vectorized CSV engines produce the same records as the python engine."""
+
+    SAMPLE = (
+        'Order Id,Order #,Tab Name,Amount\n'
+        '1,100,"Smith, J",12.50\n'
+        '\n'
+        '2,,"multi\nline",\n'
+        '3,102\n'
+        '4,103,"",7\n'
+    )
+
+    def setUp(self):
+        """Disable logging."""
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    # Extra cells beyond the header after rows of the right width
+    EXTRA_CELLS = SAMPLE + '5,104,"Lee",3,extra,"more"\n6,105,,1\n'
+
+    HEADER_ONLY = 'Order Id,Order #,Tab Name,Amount\n'
+
+    def process(self, engine, sample, streaming=False, block_size=None):
+        """Process a sample with an engine and return the records."""
+        data = sample.encode("utf-8")
+        mock_client = MagicMock()
+        mock_client.get_cached_file_content.return_value = data
+        mock_client.iter_file_chunks.side_effect = lambda path: iter(
+            [data[i:i + 5] for i in range(0, len(data), 5)]
+        )
+        mock_tap = MagicMock()
+        mock_tap.config = {"locations": [{"id": "123"}], "csv_engine": engine, "csv_streaming": streaming}
+        stream = OrderDetailsStream(tap=mock_tap, shared_sftp_client=mock_client)
+        if block_size:
+            stream.csv_block_size = block_size
+        return list(stream.process_csv_file("123", "20250514"))
+
+    def assert_engine_matches_python(self, engine, **kwargs):
+        """Assert that an engine produces the python engine's records for every sample."""
+        for sample in (self.SAMPLE, self.EXTRA_CELLS, self.HEADER_ONLY):
+            expected = self.process("python", sample)
+            for streaming in (False, True):
+                with self.subTest(sample=sample, streaming=streaming):
+                    self.assertEqual(self.process(engine, sample, streaming=streaming, **kwargs), expected)
+
+    def test_python_pads_and_truncates_rows(self):
+        """Test the reference behavior of the python engine on ragged rows."""
+        records = self.process("python", self.EXTRA_CELLS)
+
+        self.assertEqual(len(records), 6)
+        self.assertIsNone(records[2]["tab_name"])
+        self.assertEqual(records[4]["tab_name"], "Lee")
+        self.assertEqual(len(records[4]), len(records[0]))
+        self.assertEqual(self.process("python", self.HEADER_ONLY), [])
+
+    def test_pandas_matches_python(self):
+        """Test the pandas engine with and without streaming."""
+        self.assert_engine_matches_python("pandas")
+
+    @unittest.skipIf(pa_csv is None, "pyarrow is not installed")
+    def test_pyarrow_matches_python(self):
+        """Test the pyarrow engine with and without streaming."""
+        self.assert_engine_matches_python("pyarrow")
+
+    @unittest.skipIf(pa_csv is None, "pyarrow is not installed")
+    def test_pyarrow_small_blocks(self):
+        """Test that blocks split between records, never inside a quoted newline."""
+        self.assert_engine_matches_python("pyarrow", block_size=16)
+
+    def test_record_blocks_end_outside_quotes(self):
+        """Test that record blocks only end at newlines outside of quoted values."""
+        data = b'1,"a\nb"\n2,"c"\n3,d\n'
+
+        blocks = list(iter_record_blocks(io.BytesIO(data), 4))
+
+        self.assertEqual(b"".join(blocks), data)
+        self.assertEqual(blocks[0], b'1,"a\nb"\n')
+        for block in blocks:
+            self.assertEqual(block.count(b'"') % 2, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
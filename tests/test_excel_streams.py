@@ -0,0 +1,96 @@
+"""Tests for Excel parsing in XLSSFTPStream."""
+
+import datetime
+import io
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from tap_toast_sftp.streams.base import XLSSFTPStream
+
+
+class SalesReportStream(XLSSFTPStream):
+    """Excel stream used by the tests."""
+
+    name = "accounting_report"
+    file_name = "SalesReport.xlsx"
+    primary_keys = ["location_id", "date", "gl_account"]
+
+
+def make_workbook(rows):
+    """Write rows to an in-memory .xlsx workbook without a header."""
+    buffer = io.BytesIO()
+    pd.DataFrame(rows).to_excel(buffer, index=False, header=False, engine="openpyxl")
+    return buffer.getvalue()
+
+
+REPORT_ROWS = [
+    ["Sales Export", None, None, "Generated 5/15/25 5:54 AM"],
+    ["5/14/25 - 5/14/25", None, None, None],
+    [None, None, None, None],
+    ["GL Account", "Description", "Amount", "Posted"],
+    [1001, "Food", 123.45, datetime.datetime(2025, 5, 14, 17, 54)],
+    [None, None, None, None],
+    [1002, None, 678.9, None],
+]
+
+
+class TestExcelStream(unittest.TestCase):
+    """Test cases for XLSSFTPStream.read_excel_records."""
+
+    def setUp(self):
+        """Set up a stream with a mock tap."""
+        logging.disable(logging.CRITICAL)
+        self.mock_tap = MagicMock()
+        self.mock_tap.config = {"locations": [{"id": "123"}]}
+        self.stream = SalesReportStream(tap=self.mock_tap, shared_sftp_client=MagicMock())
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def test_detected_header_row(self):
+        """Test that the header below report title rows is found and values are cleaned."""
+        self.stream.header_row = None
+
+        records = list(self.stream.read_excel_records(make_workbook(REPORT_ROWS)))
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["gl_account"], 1001)
+        self.assertEqual(records[0]["amount"], 123.45)
+        self.assertEqual(records[0]["posted"], datetime.datetime(2025, 5, 14, 17, 54))
+        self.assertIsNone(records[1]["description"])
+        self.assertIsNone(records[1]["posted"])
+
+    def test_fixed_header_row_matches_read_excel(self):
+        """Test that a fixed header row gives the same records as read_excel with a header."""
+        # read_excel keeps blank data rows, which are skipped here
+        content = make_workbook(REPORT_ROWS[:5] + REPORT_ROWS[6:])
+        self.stream.header_row = 3
+
+        expected = pd.read_excel(io.BytesIO(content), header=3)
+        expected.columns = [self.stream.transform_field_name(c) for c in expected.columns]
+        expected = [
+            {k: (None if pd.isna(v) else v) for k, v in record.items()}
+            for record in expected.to_dict(orient="records")
+        ]
+
+        self.assertEqual(list(self.stream.read_excel_records(content)), expected)
+
+    def test_unnamed_and_duplicate_headers(self):
+        """Test that header cells are named like pandas names them."""
+        self.assertEqual(
+            self.stream.compile_excel_header(["Amount", None, "Amount"]),
+            ["amount", "unnamed:_1", "amount.1"],
+        )
+
+    def test_engine_is_sniffed_from_content(self):
+        """Test that the reader matches the workbook format."""
+        self.assertEqual(self.stream.resolve_excel_engine(b"PK\x03\x04rest"), "openpyxl")
+        self.assertEqual(self.stream.resolve_excel_engine(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1rest"), "xlrd")
+
+
+if __name__ == "__main__":
+    unittest.main()
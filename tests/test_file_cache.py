@@ -0,0 +1,111 @@
+"""Tests for the file content cache of SFTPClient."""
+
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+from tap_toast_sftp.client import SFTPClient
+
+
+class TestFileContentCache(unittest.TestCase):
+    """Test cases for the byte-budgeted LRU file content cache."""
+
+    def setUp(self):
+        """Set up a client with a 1 KB file cache and mocked downloads."""
+        logging.disable(logging.CRITICAL)
+        self.config = {
+            "sftp_host": "test-host",
+            "sftp_username": "test-user",
+            "sftp_password": "test-password",
+            "file_cache_max_mb": 1 / 1024,
+        }
+        self.client = SFTPClient(self.config)
+        self.client.get_file_content = MagicMock(side_effect=lambda path: path.encode("utf-8").ljust(400, b"x"))
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def get(self, location_id, file_name):
+        """Get a file of the 20250514 folder through the cache."""
+        return self.client.get_cached_file_content(location_id, "20250514", f"/{location_id}/20250514/{file_name}")
+
+    def test_cached_content_is_reused(self):
+        """Test that a second read of the same file does not download it again."""
+        first = self.get("1", "OrderDetails.csv")
+        second = self.get("1", "OrderDetails.csv")
+
+        self.assertEqual(first, second)
+        self.client.get_file_content.assert_called_once()
+        stats = self.client.get_file_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["bytes"]), (1, 1, 400))
+
+    def test_least_recently_used_file_is_evicted(self):
+        """Test that the cache stays within its budget by evicting the oldest file."""
+        self.get("1", "OrderDetails.csv")
+        self.get("1", "CheckDetails.csv")
+        # Touch OrderDetails so CheckDetails becomes the least recently used
+        self.get("1", "OrderDetails.csv")
+        self.get("1", "PaymentDetails.csv")
+
+        stats = self.client.get_file_cache_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["bytes"], 800)
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+
+        self.get("1", "OrderDetails.csv")
+        self.get("1", "CheckDetails.csv")
+        self.assertEqual(self.client.get_file_content.call_count, 4)
+
+    def test_file_larger_than_budget_is_not_cached(self):
+        """Test that a file bigger than the whole budget is returned but not cached."""
+        self.client.get_file_content.side_effect = lambda path: b"x" * 2048
+
+        self.assertEqual(len(self.get("1", "ItemSelectionDetails.csv")), 2048)
+        self.assertEqual(self.client.get_file_cache_stats()["entries"], 0)
+
+    def test_clear_file_cache_by_location(self):
+        """Test that clearing a location keeps the other locations' files and byte count."""
+        self.get("1", "OrderDetails.csv")
+        self.get("2", "OrderDetails.csv")
+
+        self.client.clear_file_cache("1")
+
+        stats = self.client.get_file_cache_stats()
+        self.assertEqual((stats["entries"], stats["bytes"]), (1, 400))
+        self.get("2", "OrderDetails.csv")
+        self.assertEqual(self.client.get_file_content.call_count, 2)
+
+    def test_file_is_released_after_last_consumer(self):
+        """Test that a file stays cached until every registered consumer released it."""
+        self.client.set_file_consumers({"OrderDetails.csv": 2})
+        self.get("1", "OrderDetails.csv")
+
+        self.client.release_file_content("1", "20250514", "/1/20250514/OrderDetails.csv")
+        self.assertEqual(self.client.get_file_cache_stats()["entries"], 1)
+
+        self.client.release_file_content("1", "20250514", "/1/20250514/OrderDetails.csv")
+        stats = self.client.get_file_cache_stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["releases"]), (0, 0, 1))
+
+    def test_unregistered_file_is_kept(self):
+        """Test that releasing a file without registered consumers leaves it to the LRU."""
+        self.client.set_file_consumers({"MenuExport*.json": 6})
+        self.get("1", "OrderDetails.csv")
+
+        self.client.release_file_content("1", "20250514", "/1/20250514/OrderDetails.csv")
+
+        self.assertEqual(self.client.get_file_cache_stats()["entries"], 1)
+
+    def test_release_all_consumers(self):
+        """Test that a pattern-matched file can be freed at once for all its consumers."""
+        self.client.set_file_consumers({"MenuExport*.json": 6})
+        self.get("1", "MenuExportV2_1.json")
+
+        self.client.release_file_content("1", "20250514", "/1/20250514/MenuExportV2_1.json", all_consumers=True)
+
+        self.assertEqual(self.client.get_file_cache_stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
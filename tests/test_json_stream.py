@@ -0,0 +1,52 @@
+"""Tests for incremental JSON parsing."""
+
+import json
+import unittest
+
+from tap_toast_sftp.json_stream import iter_json_values
+
+
+def chunked(document, chunk_size):
+    """Encode a document and split it into chunks."""
+    data = json.dumps(document, ensure_ascii=False, indent=1).encode("utf-8")
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+class TestIterJSONValues(unittest.TestCase):
+    """Test cases for iter_json_values."""
+
+    DOCUMENT = {
+        "restaurantGuid": "r-1",
+        "lastUpdated": {"by": ["a", "b"]},
+        "menus": [{"name": "Café", "price": 12345.5}, 123456789, None, [True, "x"]],
+        "trailing": 1,
+    }
+
+    def test_elements_across_chunk_sizes(self):
+        """Test that elements, numbers and multi-byte characters split across chunks are decoded."""
+        for chunk_size in (1, 3, 8, 4096):
+            values = list(iter_json_values(chunked(self.DOCUMENT, chunk_size), ("menus",)))
+            self.assertEqual(values, self.DOCUMENT["menus"], chunk_size)
+
+    def test_bare_array_and_single_value(self):
+        """Test a top-level array in place of the path and a path to an object."""
+        self.assertEqual(list(iter_json_values(chunked([1, 2], 2), ("menus",), bare_array=True)), [1, 2])
+        self.assertEqual(list(iter_json_values(chunked(self.DOCUMENT, 5), ("lastUpdated",))), [{"by": ["a", "b"]}])
+        self.assertEqual(list(iter_json_values([b" "])), [])
+
+    def test_reading_stops_after_the_array(self):
+        """Test that chunks after the target array are not consumed."""
+        chunks = iter([b'{"menus": [1, 2]', b', "rest": ', b"never read"])
+        self.assertEqual(list(iter_json_values(chunks, ("menus",))), [1, 2])
+        self.assertEqual(next(chunks), b', "rest": ')
+
+    def test_missing_key_and_malformed_document(self):
+        """Test the errors for a missing path and a truncated document."""
+        with self.assertRaises(KeyError):
+            list(iter_json_values([b'{"restaurantGuid": "r-1"}'], ("menus",)))
+        with self.assertRaises(ValueError):
+            list(iter_json_values([b'{"menus": [{"a": 1}, '], ("menus",)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,25 @@
 """Tests for the latest date folder functionality."""
 
+import stat
 import unittest
 from unittest.mock import patch, MagicMock
+
+from paramiko import SFTPAttributes
+
 from tap_toast_sftp.client import ToastSFTPStream, SFTPClient
 
 
+def make_entries(names, mode=stat.S_IFDIR | 0o755):
+    """Create directory listing entries as returned by listdir_attr."""
+    entries = []
+    for name in names:
+        entry = SFTPAttributes()
+        entry.filename = name
+        entry.st_mode = mode
+        entries.append(entry)
+    return entries
+
+
 class MockToastSFTPStream(ToastSFTPStream):
     """Mock ToastSFTPStream class for testing."""
 
@@ -34,6 +49,10 @@ class TestLatestDateFolder(unittest.TestCase):
             "locations": [{"id": "123456"}]
         }
 
+        # Date folders are memoized for the run, start every test from scratch
+        ToastSFTPStream.clear_date_folder_cache()
+        self.addCleanup(ToastSFTPStream.clear_date_folder_cache)
+
         # Initialize the stream with the mock tap
         self.stream = MockToastSFTPStream(tap=mock_tap)
         self.stream.logger = MagicMock()
@@ -47,11 +66,10 @@ class TestLatestDateFolder(unittest.TestCase):
         mock_client.__enter__.return_value = mock_client
         mock_client_class.return_value = mock_client
 
-        # Mock the list_files method to return a list of date folders and some non-date folders
-        mock_client.list_files.return_value = ["20241116", "20250506", "20250514", "not_a_date", "123456"]
-
-        # Mock the is_directory method to return True for all folders
-        mock_client.is_directory.return_value = True
+        # Mock the directory listing to return date folders and some non-date folders
+        mock_client.list_dir_attrs.return_value = make_entries(
+            ["20241116", "20250506", "20250514", "not_a_date", "123456"]
+        )
 
         # Set the mock client on the stream
         self.stream._sftp_client = mock_client
@@ -73,8 +91,8 @@ class TestLatestDateFolder(unittest.TestCase):
         mock_client.__enter__.return_value = mock_client
         mock_client_class.return_value = mock_client
 
-        # Mock the list_files method to return an empty list
-        mock_client.list_files.return_value = []
+        # Mock the directory listing to return an empty list
+        mock_client.list_dir_attrs.return_value = []
 
         # Set the mock client on the stream
         self.stream._sftp_client = mock_client
@@ -96,11 +114,8 @@ class TestLatestDateFolder(unittest.TestCase):
         mock_client.__enter__.return_value = mock_client
         mock_client_class.return_value = mock_client
 
-        # Mock the list_files method to return a mix of date and non-date folders
-        mock_client.list_files.return_value = ["not_a_date", "text", "123", "20250514"]
-
-        # Set up the is_directory method to return True for all folders
-        mock_client.is_directory.return_value = True
+        # Mock the directory listing to return a mix of date and non-date folders
+        mock_client.list_dir_attrs.return_value = make_entries(["not_a_date", "text", "123", "20250514"])
 
         # Set the mock client on the stream
         self.stream._sftp_client = mock_client
@@ -114,6 +129,41 @@ class TestLatestDateFolder(unittest.TestCase):
         # Assert that the log message indicates we found only one date folder
         self.stream.logger.info.assert_any_call("Found 1 potential date folders. Using latest: 20250514")
 
+    def test_get_date_folders_skips_files_named_like_dates(self):
+        """Test that entries without the directory bit are not used as date folders."""
+        mock_client = MagicMock()
+        mock_client.list_dir_attrs.return_value = (
+            make_entries(["20250506"]) + make_entries(["20250514"], mode=stat.S_IFREG | 0o644)
+        )
+        self.stream._sftp_client = mock_client
+
+        result = self.stream.get_date_folders("123456")
+
+        self.assertEqual(result, ["20250506"])
+
+    def test_get_date_folders_is_memoized_per_location(self):
+        """Test that the location is listed once and reused by later calls and streams."""
+        mock_client = MagicMock()
+        mock_client.list_dir_attrs.return_value = make_entries(["20250506", "20250514"])
+        self.stream._sftp_client = mock_client
+
+        other_stream = MockToastSFTPStream(tap=self.stream._tap)
+        other_stream._sftp_client = mock_client
+
+        self.assertEqual(self.stream.get_date_folders("123456"), ["20250514"])
+        self.assertEqual(other_stream.get_date_folders("123456"), ["20250514"])
+        mock_client.list_dir_attrs.assert_called_once_with("/123456")
+        mock_client.is_directory.assert_not_called()
+
+    def test_empty_listing_is_not_memoized(self):
+        """Test that an empty (possibly failed) listing is retried by the next call."""
+        mock_client = MagicMock()
+        mock_client.list_dir_attrs.side_effect = [[], make_entries(["20250514"])]
+        self.stream._sftp_client = mock_client
+
+        self.assertEqual(self.stream.get_date_folders("123456"), [])
+        self.assertEqual(self.stream.get_date_folders("123456"), ["20250514"])
+
     @patch('tap_toast_sftp.client.SFTPClient')
     def test_process_date_folders_parallel(self, mock_client_class):
         """Test that process_date_folders_parallel processes only the latest folder."""
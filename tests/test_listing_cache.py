@@ -0,0 +1,94 @@
+"""Tests for the directory listing cache of SFTPClient."""
+
+import logging
+import unittest
+from unittest.mock import MagicMock, patch
+
+from paramiko import SFTPAttributes
+
+from tap_toast_sftp.client import SFTPClient
+
+
+def make_entry(name):
+    """Create a directory listing entry."""
+    entry = SFTPAttributes()
+    entry.filename = name
+    return entry
+
+
+class TestListingCache(unittest.TestCase):
+    """Test cases for cached directory listings."""
+
+    def setUp(self):
+        """Set up a client whose remote calls are mocked out."""
+        logging.disable(logging.CRITICAL)
+        self.config = {
+            "sftp_host": "test-host",
+            "sftp_username": "test-user",
+            "sftp_password": "test-password",
+        }
+        self.client = SFTPClient(self.config)
+        self.client.connect = MagicMock()
+        self.client._call_with_retries = MagicMock(
+            return_value=[make_entry("20250514"), make_entry("20250515")]
+        )
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def test_repeated_listing_is_served_from_cache(self):
+        """Test that the second listing of a path does not hit the server."""
+        self.assertEqual(self.client.list_files("/123"), ["20250514", "20250515"])
+        self.assertEqual(self.client.list_files("/123/"), ["20250514", "20250515"])
+        self.assertEqual(len(self.client.list_dir_attrs("/123")), 2)
+
+        self.client._call_with_retries.assert_called_once()
+        self.assertEqual(
+            self.client.get_listing_cache_stats(),
+            {"hits": 2, "misses": 1, "entries": 1},
+        )
+
+    @patch("tap_toast_sftp.client.time.monotonic")
+    def test_expired_listing_is_fetched_again(self, mock_monotonic):
+        """Test that a listing older than its TTL is refreshed."""
+        mock_monotonic.return_value = 1000.0
+        self.client.list_dir_attrs("/123", ttl=10)
+
+        mock_monotonic.return_value = 1011.0
+        self.client.list_dir_attrs("/123")
+
+        self.assertEqual(self.client._call_with_retries.call_count, 2)
+
+    def test_invalidate_path(self):
+        """Test that invalidating a path forces the next listing to the server."""
+        self.client.list_files("/123")
+        self.client.list_files("/456")
+        self.client.invalidate_listing_cache("/123")
+
+        self.client.list_files("/123")
+        self.client.list_files("/456")
+
+        self.assertEqual(self.client._call_with_retries.call_count, 3)
+
+    def test_failed_listing_is_not_cached(self):
+        """Test that errors are retried on the next call instead of being cached."""
+        self.client._call_with_retries.side_effect = [IOError("boom"), [make_entry("20250514")]]
+
+        self.assertEqual(self.client.list_files("/123"), [])
+        self.assertEqual(self.client.list_files("/123"), ["20250514"])
+
+    def test_zero_ttl_disables_cache(self):
+        """Test that listing_cache_ttl=0 turns the cache off."""
+        client = SFTPClient({**self.config, "listing_cache_ttl": 0})
+        client.connect = MagicMock()
+        client._call_with_retries = MagicMock(return_value=[make_entry("20250514")])
+
+        client.list_files("/123")
+        client.list_files("/123")
+
+        self.assertEqual(client._call_with_retries.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
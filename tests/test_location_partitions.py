@@ -0,0 +1,230 @@
+"""Tests for per-location stream partitions."""
+
+import logging
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from singer_sdk.singerlib import StateMessage
+
+from tap_toast_sftp.client import LocationPipeline, SFTPClient
+from tap_toast_sftp.streams.accounting_report import AccountingReportStream
+from tap_toast_sftp.streams.menu_streams import MenuExportStream, MenuItemsStream
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+from tap_toast_sftp.tap import TapToastSFTP
+
+
+class TestLocationPartitions(unittest.TestCase):
+    """Test cases for ToastSFTPStream.partitions and process_partition."""
+
+    def setUp(self):
+        """Disable logging."""
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def make_stream(self, state=None, **config):
+        """Create a stream whose locations all have one date folder."""
+        mock_tap = MagicMock()
+        mock_tap.config = {"locations": [{"id": "1"}, {"id": "2"}, {"id": "3"}], **config}
+        mock_tap.state = state if state is not None else {}
+        stream = OrderDetailsStream(tap=mock_tap, shared_sftp_client=MagicMock())
+        stream.get_date_folders = MagicMock(return_value=["20250514"])
+        stream._write_state_message = MagicMock()
+        self.addCleanup(stream.close_location_pipeline)
+        return stream
+
+    def records(self, location_id, count=3):
+        """Generate records of a location."""
+        for i in range(count):
+            yield {"location_id": location_id, "n": i}
+
+    def test_one_partition_per_location(self):
+        """Test that every location is its own partition."""
+        stream = self.make_stream()
+
+        self.assertEqual(stream.partitions, [{"location_id": "1"}, {"location_id": "2"}, {"location_id": "3"}])
+
+    def test_partitions_share_one_pipeline(self):
+        """Test that the next locations are processed while the first partition is read."""
+        stream = self.make_stream(location_workers=3)
+        # Only passes if all three locations are being processed at the same time
+        barrier = threading.Barrier(3, timeout=5)
+
+        def process(location_id, date_folder):
+            barrier.wait()
+            yield from self.records(location_id)
+
+        with patch("tap_toast_sftp.client.LocationPipeline", wraps=LocationPipeline) as mock_pipeline:
+            results = {
+                partition["location_id"]: list(stream.process_partition(partition, process))
+                for partition in stream.partitions
+            }
+
+        mock_pipeline.assert_called_once()
+        for location_id, records in results.items():
+            self.assertEqual(records, list(self.records(location_id)))
+        # Bookmarks are written as each location finishes
+        self.assertEqual(stream._write_state_message.call_count, 3)
+        self.assertIsNone(stream._location_pipeline)
+
+    def test_skipped_partition_restarts_the_pipeline(self):
+        """Test that a partition out of order does not wait on locations nobody reads."""
+        stream = self.make_stream(location_workers=2)
+        stream.location_queue_size = 1
+        stream.location_batch_size = 1
+        process = lambda location_id, date_folder: self.records(location_id, count=50)
+
+        self.assertEqual(len(list(stream.process_partition({"location_id": "1"}, process))), 50)
+        self.assertEqual(len(list(stream.process_partition({"location_id": "3"}, process))), 50)
+        self.assertIsNone(stream._location_pipeline)
+
+    def test_failed_location_stops_the_pipeline(self):
+        """Test that an error of a location is raised in its partition and stops the workers."""
+        stream = self.make_stream(location_workers=3)
+        stream.process_date_folders_parallel = MagicMock(side_effect=RuntimeError("boom"))
+
+        with self.assertRaises(RuntimeError):
+            list(stream.process_partition({"location_id": "1"}, MagicMock()))
+
+        self.assertIsNone(stream._location_pipeline)
+
+    def bookmarks(self, stream):
+        """Get the bookmarked date folder of each location."""
+        return {
+            partition["context"]["location_id"]: partition.get("date_folder")
+            for partition in stream.stream_state.get("partitions", [])
+        }
+
+    def test_synced_locations_are_bookmarked(self):
+        """Test that each fully read location bookmarks its date folder."""
+        for workers in (1, 3):
+            stream = self.make_stream(location_workers=workers)
+            process = lambda location_id, date_folder: self.records(location_id)
+
+            for partition in stream.partitions:
+                list(stream.process_partition(partition, process))
+
+            self.assertEqual(self.bookmarks(stream), {"1": "20250514", "2": "20250514", "3": "20250514"})
+            self.assertEqual(stream._write_state_message.call_count, 3)
+
+    def test_resume_skips_synced_locations(self):
+        """Test that a rerun with the STATE of an interrupted sync only syncs the remaining locations."""
+        state = {
+            "bookmarks": {
+                "order_details": {
+                    "partitions": [
+                        {"context": {"location_id": "1"}, "date_folder": "20250514"},
+                        {"context": {"location_id": "2"}, "date_folder": "20250513"},
+                    ]
+                }
+            }
+        }
+        stream = self.make_stream(state=state, location_workers=3)
+        process = MagicMock(side_effect=lambda location_id, date_folder: self.records(location_id))
+
+        results = {
+            partition["location_id"]: list(stream.process_partition(partition, process))
+            for partition in stream.partitions
+        }
+
+        self.assertEqual(results["1"], [])
+        self.assertEqual(results["2"], list(self.records("2")))
+        self.assertEqual(results["3"], list(self.records("3")))
+        self.assertEqual(sorted(call.args[0] for call in process.call_args_list), ["2", "3"])
+        self.assertEqual(self.bookmarks(stream), {"1": "20250514", "2": "20250514", "3": "20250514"})
+
+    def test_failed_folder_is_not_bookmarked(self):
+        """Test that a location whose date folder failed is synced again on the next run."""
+        stream = self.make_stream(location_workers=1)
+        process = MagicMock(side_effect=RuntimeError("boom"))
+
+        self.assertEqual(list(stream.process_partition({"location_id": "1"}, process)), [])
+
+        self.assertEqual(self.bookmarks(stream), {})
+
+    def test_failed_download_is_not_bookmarked(self):
+        """Test that a location whose file could not be downloaded is synced again on the next run."""
+        MenuExportStream.clear_menu_document_cache()
+        self.addCleanup(MenuExportStream.clear_menu_document_cache)
+        attrs = MagicMock(filename="MenuExportV2.json", st_size=100, st_mtime=1)
+        for stream_class in (OrderDetailsStream, AccountingReportStream, MenuItemsStream):
+            with self.subTest(stream=stream_class.name):
+                client = SFTPClient({"sftp_host": "sftp.toasttab.com", "sftp_username": "test-username", "sftp_password": "test-password"})
+                client.connect = MagicMock()
+                client.list_files = MagicMock(return_value=["MenuExportV2.json"])
+                client.list_dir_attrs = MagicMock(return_value=[attrs])
+                client._fetch_file = MagicMock(side_effect=OSError("connection lost"))
+                mock_tap = MagicMock()
+                mock_tap.config = {"locations": [{"id": "1"}], "location_workers": 1}
+                mock_tap.state = {}
+                stream = stream_class(tap=mock_tap, shared_sftp_client=client)
+                stream.get_date_folders = MagicMock(return_value=["20250514"])
+                stream._write_state_message = MagicMock()
+
+                self.assertEqual(list(stream.get_records({"location_id": "1"})), [])
+
+                client._fetch_file.assert_called()
+                self.assertEqual(self.bookmarks(stream), {})
+
+    def test_missing_context_processes_every_location(self):
+        """Test that a call without a location context processes all locations."""
+        stream = self.make_stream(location_workers=1)
+
+        records = list(stream.process_partition(None, lambda location_id, date_folder: self.records(location_id, 1)))
+
+        self.assertEqual([r["location_id"] for r in records], ["1", "2", "3"])
+
+
+class TestResumeFromState(unittest.TestCase):
+    """Test cases for resuming a tap sync from its STATE."""
+
+    CONFIG = {
+        "sftp_host": "sftp.toasttab.com",
+        "sftp_username": "test-username",
+        "sftp_password": "test-password",
+        "locations": [{"id": "1"}, {"id": "2"}],
+    }
+
+    def setUp(self):
+        """Serve one date folder per location without an SFTP server."""
+        logging.disable(logging.CRITICAL)
+        for target, kwargs in (
+            ("tap_toast_sftp.tap.SFTPClient", {}),
+            ("tap_toast_sftp.client.ToastSFTPStream.get_date_folders", {"return_value": ["20250514"]}),
+        ):
+            patcher = patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def sync(self, state=None):
+        """Sync every stream and return the last STATE and the processed folders."""
+        tap = TapToastSFTP(config=self.CONFIG, state=state, parse_env_config=False)
+        messages = []
+        tap.message_writer = MagicMock(write_message=messages.append)
+        with patch(
+            "tap_toast_sftp.client.ToastSFTPStream.process_date_folder", return_value=iter(())
+        ) as mock_process:
+            tap.sync_all()
+        return [m for m in messages if isinstance(m, StateMessage)][-1].value, mock_process
+
+    def test_rerun_skips_synced_folders(self):
+        """Test that a rerun with the written STATE does not process the synced folders again."""
+        state, mock_process = self.sync()
+        self.assertTrue(mock_process.called)
+        for stream_state in state["bookmarks"].values():
+            self.assertEqual([p["date_folder"] for p in stream_state["partitions"]], ["20250514", "20250514"])
+
+        _, mock_process = self.sync(state)
+
+        mock_process.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
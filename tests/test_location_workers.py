@@ -0,0 +1,96 @@
+"""Tests for processing locations concurrently."""
+
+import logging
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+
+
+class TestLocationWorkers(unittest.TestCase):
+    """Test cases for ToastSFTPStream.process_locations."""
+
+    def setUp(self):
+        """Disable logging."""
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def make_stream(self, **config):
+        """Create a stream whose locations all have one date folder."""
+        mock_tap = MagicMock()
+        mock_tap.config = {"locations": [{"id": "1"}, {"id": "2"}, {"id": "3"}], **config}
+        stream = OrderDetailsStream(tap=mock_tap, shared_sftp_client=MagicMock())
+        stream.get_date_folders = MagicMock(return_value=["20250514"])
+        stream.location_batch_size = 2
+        return stream
+
+    def test_locations_overlap_and_emit_from_caller(self):
+        """Test that locations are processed concurrently and records keep their per-location order."""
+        stream = self.make_stream(location_workers=3)
+        # Only passes if all three locations are being processed at the same time
+        barrier = threading.Barrier(3, timeout=5)
+        worker_threads = set()
+
+        def process(location_id, date_folder):
+            worker_threads.add(threading.current_thread())
+            barrier.wait()
+            for i in range(5):
+                yield {"location_id": location_id, "n": i}
+
+        records = list(stream.process_locations(["1", "2", "3"], process))
+
+        self.assertEqual(len(records), 15)
+        for location_id in ("1", "2", "3"):
+            self.assertEqual([r["n"] for r in records if r["location_id"] == location_id], list(range(5)))
+        self.assertNotIn(threading.current_thread(), worker_threads)
+
+    def test_single_worker_runs_inline(self):
+        """Test that location_workers of 1 processes locations in order on the calling thread."""
+        stream = self.make_stream(location_workers=1)
+        threads = set()
+
+        def process(location_id, date_folder):
+            threads.add(threading.current_thread())
+            yield {"location_id": location_id}
+
+        records = list(stream.process_locations(["1", "2", "3"], process))
+
+        self.assertEqual([r["location_id"] for r in records], ["1", "2", "3"])
+        self.assertEqual(threads, {threading.current_thread()})
+
+    def test_early_stop_releases_workers(self):
+        """Test that closing the generator stops workers blocked on a full queue."""
+        stream = self.make_stream(location_workers=2)
+        stream.location_queue_size = 1
+        closed = []
+        started = threading.Barrier(2, timeout=5)
+
+        def process(location_id, date_folder):
+            started.wait()
+            try:
+                for i in range(10000):
+                    yield {"location_id": location_id, "n": i}
+            finally:
+                closed.append(location_id)
+
+        records = stream.process_locations(["1", "2"], process)
+        next(records)
+        records.close()
+
+        self.assertEqual(sorted(closed), ["1", "2"])
+
+    def test_worker_errors_are_raised(self):
+        """Test that an unexpected error on a worker is raised in the emitting thread."""
+        stream = self.make_stream(location_workers=2)
+        stream.process_date_folders_parallel = MagicMock(side_effect=RuntimeError("boom"))
+
+        with self.assertRaises(RuntimeError):
+            list(stream.process_locations(["1", "2"], MagicMock()))
+
+
+if __name__ == "__main__":
+    unittest.main()
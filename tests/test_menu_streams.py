@@ -0,0 +1,299 @@
+"""Tests for the flattened menu streams."""
+
+import json
+import logging
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from paramiko import SFTPAttributes
+
+from tap_toast_sftp.client import ToastSFTPStream
+from tap_toast_sftp.codec import loads_json
+from tap_toast_sftp.streams.menu_streams import (
+    MENU_ENTITIES,
+    MENU_ROWS_CACHE,
+    MenuExportStream,
+    MenuGroupsStream,
+    MenuItemsStream,
+    MenuMenusStream,
+    MenuOptionGroupsStream,
+    MenuOptionItemsStream,
+    MenuPricesStream,
+    flatten_menus,
+)
+
+MENU_STREAM_CLASSES = [
+    MenuMenusStream,
+    MenuGroupsStream,
+    MenuItemsStream,
+    MenuOptionGroupsStream,
+    MenuOptionItemsStream,
+    MenuPricesStream,
+]
+
+SAMPLE_MENUS = [
+    {
+        "guid": "menu-1",
+        "name": "Lunch",
+        "groups": [
+            {
+                "guid": "group-1",
+                "name": "Burgers",
+                "items": [
+                    {
+                        "guid": "item-1",
+                        "name": "Cheeseburger",
+                        "prices": [{"amount": 12.5, "currency": "USD"}, {"guid": "price-2", "amount": 14}],
+                        "optionGroups": [
+                            {
+                                "guid": "og-1",
+                                "name": "Toppings",
+                                "items": [
+                                    {"guid": "oi-1", "name": "Bacon", "optionGroups": []},
+                                    {"guid": "oi-2", "name": "Onion"},
+                                ],
+                            }
+                        ],
+                    },
+                    {"name": "No guid item"},
+                ],
+            }
+        ],
+    },
+    {"name": "Menu without guid"},
+]
+
+
+def make_entry(name, size=100, mtime=1700000000):
+    """Create a directory listing entry."""
+    entry = SFTPAttributes()
+    entry.filename = name
+    entry.st_size = size
+    entry.st_mtime = mtime
+    return entry
+
+
+class TestMenuStreams(unittest.TestCase):
+    """Test cases for the menu streams sharing one flattened document."""
+
+    def setUp(self):
+        """Set up a mock client serving one MenuExportV2 file."""
+        logging.disable(logging.CRITICAL)
+        MenuExportStream.clear_menu_document_cache()
+        self.addCleanup(MenuExportStream.clear_menu_document_cache)
+        # Removes the record cache the flattened rows are spilled to
+        self.addCleanup(ToastSFTPStream.clear_all_record_caches)
+        # A tap sync sets the menu streams it selected
+        MenuExportStream.set_selected_entities(MENU_ENTITIES)
+
+        self.mock_client = MagicMock()
+        self.mock_client.list_dir_attrs.return_value = [
+            make_entry("MenuExportV2_1.json"),
+            make_entry("OrderDetails.csv"),
+        ]
+        self.mock_client.get_cached_file_content.return_value = json.dumps(
+            {"restaurantGuid": "r-1", "menus": SAMPLE_MENUS}
+        ).encode("utf-8")
+
+        self.mock_tap = MagicMock()
+        self.mock_tap.config = {"locations": [{"id": "123"}]}
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def make_stream(self, stream_class):
+        """Create a menu stream using the mock client."""
+        return stream_class(tap=self.mock_tap, shared_sftp_client=self.mock_client)
+
+    def collect(self, stream_class):
+        """Process the sample folder with a stream and return its records."""
+        return list(self.make_stream(stream_class).process_json_files("123", "20250514"))
+
+    def test_menu_file_is_downloaded_and_parsed_once(self):
+        """Test that all six menu streams share a single download and parse."""
+        streams = [self.make_stream(stream_class) for stream_class in MENU_STREAM_CLASSES]
+        with patch("tap_toast_sftp.streams.menu_streams.loads_json", wraps=loads_json) as mock_loads:
+            for stream in streams:
+                list(stream.process_json_files("123", "20250514"))
+
+        self.mock_client.get_cached_file_content.assert_called_once_with(
+            "123", "20250514", "/123/20250514/MenuExportV2_1.json"
+        )
+        mock_loads.assert_called_once()
+
+    def test_changed_file_is_parsed_again(self):
+        """Test that a new fingerprint for the same path invalidates the parsed document."""
+        self.collect(MenuMenusStream)
+        self.mock_client.list_dir_attrs.return_value = [make_entry("MenuExportV2_1.json", size=200)]
+        self.collect(MenuMenusStream)
+
+        self.assertEqual(self.mock_client.get_cached_file_content.call_count, 2)
+
+    def test_records_have_parent_context(self):
+        """Test the records produced for each entity type."""
+        menus = self.collect(MenuMenusStream)
+        groups = self.collect(MenuGroupsStream)
+        items = self.collect(MenuItemsStream)
+        option_groups = self.collect(MenuOptionGroupsStream)
+        option_items = self.collect(MenuOptionItemsStream)
+        prices = self.collect(MenuPricesStream)
+
+        self.assertEqual([r["guid"] for r in menus], ["menu-1"])
+        self.assertNotIn("groups", menus[0])
+        self.assertEqual(menus[0]["location_id"], "123")
+        self.assertEqual(menus[0]["date"], "20250514")
+
+        self.assertEqual(groups[0]["menu_guid"], "menu-1")
+        self.assertNotIn("items", groups[0])
+
+        self.assertEqual([r["guid"] for r in items], ["item-1"])
+        self.assertEqual(items[0]["group_guid"], "group-1")
+        self.assertNotIn("prices", items[0])
+        self.assertNotIn("optionGroups", items[0])
+
+        self.assertEqual(option_groups[0]["item_guid"], "item-1")
+        self.assertNotIn("items", option_groups[0])
+
+        self.assertEqual([r["guid"] for r in option_items], ["oi-1", "oi-2"])
+        self.assertEqual(option_items[0]["option_group_guid"], "og-1")
+        self.assertNotIn("optionGroups", option_items[0])
+
+        self.assertEqual(len(prices), 2)
+        self.assertEqual(len(prices[0]["price_id"]), 16)
+        self.assertEqual(prices[1]["price_id"], "price-2")
+
+    def test_buffers_are_released_once_drained(self):
+        """Test that rows are released once every menu stream drained its buffer."""
+        for stream_class in MENU_STREAM_CLASSES[:-1]:
+            self.collect(stream_class)
+        (document,) = MenuExportStream._menu_document_cache.values()
+        self.assertEqual(list(document["buffers"]), ["price"])
+
+        self.collect(MenuPricesStream)
+        self.assertEqual(MenuExportStream._menu_document_cache, {})
+
+    def test_waiting_rows_are_spilled_to_the_record_cache(self):
+        """Test that rows waiting for other menu streams are kept on disk and deleted once read."""
+        self.collect(MenuItemsStream)
+        (document,) = MenuExportStream._menu_document_cache.values()
+        context_hashes = dict(document["buffers"])
+        record_cache = ToastSFTPStream._record_cache
+
+        self.assertEqual(sorted(context_hashes), sorted(set(MENU_ENTITIES) - {"item"}))
+        self.assertEqual(record_cache.count(MENU_ROWS_CACHE, context_hashes["price"]), 2)
+
+        for stream_class in MENU_STREAM_CLASSES:
+            if stream_class is not MenuItemsStream:
+                self.collect(stream_class)
+        for context_hash in context_hashes.values():
+            self.assertIsNone(record_cache.count(MENU_ROWS_CACHE, context_hash))
+
+    def test_single_stream_streams_rows_per_menu(self):
+        """Test that a stream flattening a file on its own yields rows before the next menu is read."""
+        MenuExportStream.set_selected_entities(["menu"])
+        self.mock_tap.config["json_streaming"] = True
+        menus_read = []
+
+        def iter_menus(location_id, date_folder, file_path):
+            for menu in json.loads(json.dumps(SAMPLE_MENUS * 2)):
+                menus_read.append(menu)
+                yield menu
+
+        stream = self.make_stream(MenuMenusStream)
+        stream.iter_menus = iter_menus
+        records = stream.process_json_files("123", "20250514")
+
+        self.assertEqual(next(records)["guid"], "menu-1")
+        self.assertEqual(len(menus_read), 1)
+        self.assertEqual(len(list(records)), 1)
+        self.assertEqual(MenuExportStream._menu_document_cache, {})
+
+    def test_drained_stream_flattens_again_on_its_own(self):
+        """Test that a stream running twice gets its rows again without refilling other buffers."""
+        first = self.collect(MenuItemsStream)
+        for stream_class in MENU_STREAM_CLASSES:
+            if stream_class is not MenuItemsStream:
+                self.collect(stream_class)
+
+        second = self.collect(MenuItemsStream)
+
+        self.assertEqual(first, second)
+        self.assertEqual(MenuExportStream._menu_document_cache, {})
+
+    def test_only_selected_entities_are_buffered(self):
+        """Test that no rows are kept for menu streams that are not selected."""
+        MenuExportStream.set_selected_entities(["item", "price"])
+
+        self.collect(MenuItemsStream)
+        (document,) = MenuExportStream._menu_document_cache.values()
+        self.assertEqual(list(document["buffers"]), ["price"])
+
+        self.assertEqual(len(self.collect(MenuPricesStream)), 2)
+        self.assertEqual(MenuExportStream._menu_document_cache, {})
+
+    def test_concurrent_streams_flatten_once(self):
+        """Test that menu streams reaching a file at the same time share one flatten."""
+        streams = [self.make_stream(stream_class) for stream_class in MENU_STREAM_CLASSES]
+        barrier = threading.Barrier(len(streams), timeout=5)
+
+        def collect(stream):
+            barrier.wait()
+            return list(stream.process_json_files("123", "20250514"))
+
+        with patch("tap_toast_sftp.streams.menu_streams.flatten_menus", wraps=flatten_menus) as mock_flatten:
+            with ThreadPoolExecutor(max_workers=len(streams)) as executor:
+                results = list(executor.map(collect, streams))
+
+        mock_flatten.assert_called_once()
+        self.assertEqual([len(records) for records in results], [1, 1, 1, 1, 2, 2])
+        self.assertEqual(MenuExportStream._menu_document_cache, {})
+
+    def test_flatten_menus_single_pass(self):
+        """Test that the flattener builds rows for the requested entity types only."""
+        buffers = flatten_menus(json.loads(json.dumps(SAMPLE_MENUS)), "123", "20250514", ("item", "price"))
+
+        self.assertEqual(sorted(buffers), ["item", "price"])
+        self.assertEqual(len(buffers["item"]), 1)
+        self.assertEqual(len(buffers["price"]), 2)
+
+    def test_array_format(self):
+        """Test that MenuExport files holding a plain array of menus are supported."""
+        self.mock_client.list_dir_attrs.return_value = [make_entry("MenuExport_1.json")]
+        self.mock_client.get_cached_file_content.return_value = json.dumps(SAMPLE_MENUS).encode("utf-8")
+
+        self.assertEqual(len(self.collect(MenuOptionItemsStream)), 2)
+
+    def serve_chunks(self, document, chunk_size=16):
+        """Serve a document from iter_file_chunks in small chunks."""
+        data = json.dumps(document).encode("utf-8")
+        self.mock_client.iter_file_chunks.side_effect = lambda path: iter(
+            [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+        )
+
+    def test_streaming_matches_full_parse(self):
+        """Test that json_streaming produces the same records for both export formats."""
+        expected = {stream_class: self.collect(stream_class) for stream_class in MENU_STREAM_CLASSES}
+
+        self.mock_tap.config["json_streaming"] = True
+        for document in ({"restaurantGuid": "r-1", "menus": SAMPLE_MENUS}, SAMPLE_MENUS):
+            MenuExportStream.clear_menu_document_cache()
+            self.serve_chunks(document)
+            for stream_class in MENU_STREAM_CLASSES:
+                self.assertEqual(self.collect(stream_class), expected[stream_class], stream_class.name)
+
+        self.assertEqual(self.mock_client.iter_file_chunks.call_count, 2)
+        self.assertEqual(self.mock_client.get_cached_file_content.call_count, 1)
+
+    def test_streaming_unknown_format(self):
+        """Test that a streamed document without menus yields no records."""
+        self.mock_tap.config["json_streaming"] = True
+        self.serve_chunks({"restaurantGuid": "r-1"})
+
+        self.assertEqual(self.collect(MenuMenusStream), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for parsing files in worker processes."""
+
+import io
+import logging
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from tap_toast_sftp.client import ToastSFTPStream
+from tap_toast_sftp.streams.accounting_report import AccountingReportStream
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+
+CSV_SAMPLE = 'Order Id,Opened,Amount\n1,5/14/25 5:54 PM,"$1,234.50"\n2,,\n\n3,later,7\n'
+
+
+class TestParseProcesses(unittest.TestCase):
+    """Test cases for the parse_processes setting."""
+
+    def setUp(self):
+        """Disable logging."""
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(ToastSFTPStream.shutdown_parse_pool)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def make_stream(self, stream_class, content, **config):
+        """Create a stream serving one file from a mock client."""
+        mock_client = MagicMock()
+        mock_client.get_cached_file_content.return_value = content
+        mock_tap = MagicMock()
+        mock_tap.config = {"locations": [{"id": "123"}], **config}
+        return stream_class(tap=mock_tap, shared_sftp_client=mock_client)
+
+    def test_csv_records_match_in_process_parsing(self):
+        """Test that CSV files parsed by a worker give the same records for every engine."""
+        content = CSV_SAMPLE.encode("utf-8")
+        for config in ({}, {"coerce_types": True}, {"csv_engine": "pandas", "coerce_types": True}):
+            expected = list(self.make_stream(OrderDetailsStream, content, **config).process_csv_file("123", "20250514"))
+            stream = self.make_stream(OrderDetailsStream, content, parse_processes=2, **config)
+            stream.read_csv_records = MagicMock(side_effect=AssertionError("parsed in the tap process"))
+
+            self.assertEqual(list(stream.process_csv_file("123", "20250514")), expected, config)
+            self.assertEqual(len(expected), 3)
+
+    def test_excel_records_match_in_process_parsing(self):
+        """Test that Excel files parsed by a worker keep the stream's header row."""
+        buffer = io.BytesIO()
+        rows = [["Report", None], [None, None], [None, None], ["GL Account", "Amount"], [1001, 12.5], [1002, None]]
+        pd.DataFrame(rows).to_excel(buffer, index=False, header=False, engine="openpyxl")
+
+        expected = list(self.make_stream(AccountingReportStream, buffer.getvalue()).process_excel_file("123", "20250514"))
+        stream = self.make_stream(AccountingReportStream, buffer.getvalue(), parse_processes=1)
+
+        self.assertEqual(list(stream.process_excel_file("123", "20250514")), expected)
+        self.assertEqual([r["gl_account"] for r in expected], [1001, 1002])
+
+    def test_missing_file_is_not_sent_to_a_worker(self):
+        """Test that empty content is skipped without starting the pool."""
+        stream = self.make_stream(OrderDetailsStream, b"", parse_processes=2)
+
+        self.assertEqual(list(stream.process_csv_file("123", "20250514")), [])
+        self.assertIsNone(ToastSFTPStream._parse_pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for the opt-in disk-backed record cache."""
+
+import logging
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from tap_toast_sftp.client import ToastSFTPStream
+from tap_toast_sftp.record_cache import RecordCache
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+
+
+class TestRecordCache(unittest.TestCase):
+    """Test cases for the RecordCache store."""
+
+    def setUp(self):
+        """Set up a cache with small segments."""
+        self.cache = RecordCache(batch_size=2)
+        self.addCleanup(self.cache.close)
+
+    def test_records_round_trip_in_order(self):
+        """Test that records written across several segments are read back in order."""
+        writer = self.cache.writer("orders", "default")
+        for i in range(5):
+            writer.append({"id": i})
+        self.assertEqual(writer.commit(), 5)
+
+        self.assertEqual(self.cache.count("orders", "default"), 5)
+        self.assertEqual([r["id"] for r in self.cache.read("orders", "default")], [0, 1, 2, 3, 4])
+
+    def test_uncommitted_context_is_not_cached(self):
+        """Test that a partially written context does not count as cached."""
+        writer = self.cache.writer("orders", "default")
+        for i in range(3):
+            writer.append({"id": i})
+
+        self.assertIsNone(self.cache.count("orders", "default"))
+
+    def test_close_removes_cache_directory(self):
+        """Test that closing the cache deletes its file."""
+        cache = RecordCache()
+        directory = cache._directory
+        self.assertTrue(os.path.isdir(directory))
+
+        cache.close()
+        self.assertFalse(os.path.exists(directory))
+
+
+class TestStreamRecordCache(unittest.TestCase):
+    """Test cases for record caching in ToastSFTPStream.get_records."""
+
+    def setUp(self):
+        """Set up a mock tap and a clean record cache."""
+        logging.disable(logging.CRITICAL)
+        ToastSFTPStream.clear_all_record_caches()
+        self.addCleanup(ToastSFTPStream.clear_all_record_caches)
+
+        self.mock_tap = MagicMock()
+        self.mock_tap.config = {"locations": [{"id": "123"}]}
+
+    def make_stream(self):
+        """Create a stream whose records come from a mock."""
+        stream = OrderDetailsStream(tap=self.mock_tap, shared_sftp_client=MagicMock())
+        stream._get_records = MagicMock(side_effect=lambda context: iter([{"order_id": "1"}, {"order_id": "2"}]))
+        return stream
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def test_records_are_not_cached_by_default(self):
+        """Test that no cache is created unless record_cache is enabled."""
+        stream = self.make_stream()
+        list(stream.get_records(None))
+        list(stream.get_records(None))
+
+        self.assertEqual(stream._get_records.call_count, 2)
+        self.assertIsNone(ToastSFTPStream._record_cache)
+
+    def test_enabled_cache_replays_records(self):
+        """Test that a second read of the same context is served from the cache."""
+        self.mock_tap.config["record_cache"] = True
+
+        stream = self.make_stream()
+
+        first = list(stream.get_records(None))
+        second = list(stream.get_records(None))
+
+        self.assertEqual(first, second)
+        stream._get_records.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
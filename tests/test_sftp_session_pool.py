@@ -0,0 +1,255 @@
+"""Tests for the pooled SFTP sessions of SFTPClient."""
+
+import socket
+import threading
+import unittest
+import logging
+from unittest.mock import MagicMock, patch
+
+from tap_toast_sftp.client import SFTPClient
+
+
+def make_session():
+    """Create a mock paramiko SFTP session with an open channel."""
+    session = MagicMock()
+    session.get_channel.return_value.closed = False
+    session.get_channel.return_value.get_transport.return_value.is_active.return_value = True
+    return session
+
+
+class TestSFTPSessionPool(unittest.TestCase):
+    """Test cases for SFTP session checkout and return."""
+
+    def setUp(self):
+        """Set up a client whose SSH connection is mocked out."""
+        logging.disable(logging.CRITICAL)
+        self.config = {
+            "sftp_host": "test-host",
+            "sftp_username": "test-user",
+            "sftp_password": "test-password",
+            "sftp_max_sessions": 2,
+        }
+        patcher = patch("tap_toast_sftp.client.paramiko.SSHClient")
+        self.mock_ssh_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_ssh = self.mock_ssh_class.return_value
+        self.mock_ssh.get_transport.return_value.is_active.return_value = True
+        self.mock_ssh.open_sftp.side_effect = lambda: make_session()
+        self.client = SFTPClient(self.config)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def test_sessions_are_reused(self):
+        """Test that a returned session is handed out again."""
+        with self.client.session() as first:
+            pass
+        with self.client.session() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(self.mock_ssh.open_sftp.call_count, 1)
+
+    def test_pool_opens_up_to_max_sessions(self):
+        """Test that nested checkouts open new sessions up to the limit."""
+        with self.client.session() as first, self.client.session() as second:
+            self.assertIsNot(first, second)
+
+        self.assertEqual(self.mock_ssh.open_sftp.call_count, 2)
+
+    def test_checkout_blocks_when_pool_is_exhausted(self):
+        """Test that a third thread waits until a session is returned."""
+        acquired = threading.Event()
+
+        with self.client.session(), self.client.session():
+            def worker():
+                with self.client.session():
+                    acquired.set()
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            self.assertFalse(acquired.wait(0.2))
+
+        self.assertTrue(acquired.wait(2))
+        thread.join()
+        self.assertEqual(self.mock_ssh.open_sftp.call_count, 2)
+
+    def test_unhealthy_session_is_replaced(self):
+        """Test that a session with a closed channel is discarded on checkout."""
+        with self.client.session() as first:
+            pass
+        first.get_channel.return_value.closed = True
+
+        with self.client.session() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+
+    def test_session_is_discarded_on_error(self):
+        """Test that a session raising an error is closed instead of reused."""
+        with self.assertRaises(IOError):
+            with self.client.session() as failed:
+                raise IOError("channel broke")
+
+        with self.client.session() as fresh:
+            pass
+
+        self.assertIsNot(failed, fresh)
+        failed.close.assert_called_once()
+
+    def test_session_is_kept_on_missing_file(self):
+        """Test that a "no such file" status does not discard the session."""
+        with self.assertRaises(FileNotFoundError):
+            with self.client.session() as first:
+                raise FileNotFoundError("missing")
+
+        with self.client.session() as second:
+            pass
+
+        self.assertIs(first, second)
+
+    @patch("tap_toast_sftp.client.time.sleep")
+    def test_timed_out_operation_is_retried_on_fresh_session(self, mock_sleep):
+        """Test that a channel timeout discards the session before retrying."""
+        sessions = []
+
+        def operation(sftp):
+            sessions.append(sftp)
+            if len(sessions) == 1:
+                raise socket.timeout("timed out")
+            return ["20250514"]
+
+        result = self.client._call_with_retries("list files in /1", operation, timeout=5, max_retries=3)
+
+        self.assertEqual(result, ["20250514"])
+        self.assertIsNot(sessions[0], sessions[1])
+        sessions[0].close.assert_called_once()
+        sessions[0].get_channel.return_value.settimeout.assert_called_with(5)
+
+    @patch("tap_toast_sftp.client.time.sleep")
+    def test_list_files_gives_up_after_max_retries(self, mock_sleep):
+        """Test that list_files returns an empty list when every attempt times out."""
+        self.mock_ssh.open_sftp.side_effect = None
+        session = make_session()
+        session.listdir_attr.side_effect = socket.timeout("timed out")
+        self.mock_ssh.open_sftp.return_value = session
+
+        self.assertEqual(self.client.list_files("/1"), [])
+        self.assertEqual(session.listdir_attr.call_count, 3)
+
+    def test_iter_file_chunks_holds_session_until_done(self):
+        """Test that a streamed file keeps its session checked out until fully read."""
+        self.mock_ssh.open_sftp.side_effect = None
+        session = make_session()
+        session.open.return_value.read.side_effect = [b"ab", b"cd", b""]
+        self.mock_ssh.open_sftp.return_value = session
+
+        chunks = self.client.iter_file_chunks("/1/20250514/OrderDetails.csv", chunk_size=2)
+        self.assertEqual(next(chunks), b"ab")
+        self.assertEqual(self.client._idle_sessions, [])
+
+        self.assertEqual(list(chunks), [b"cd"])
+        self.assertEqual(self.client._idle_sessions, [session])
+        session.open.return_value.close.assert_called_once()
+
+    @patch("tap_toast_sftp.client.time.sleep")
+    def test_stream_resumes_at_offset_after_error(self, mock_sleep):
+        """Test that a stream failing midway resumes where it stopped on a fresh session."""
+        self.mock_ssh.open_sftp.side_effect = None
+        first, second = make_session(), make_session()
+        first.open.return_value.read.side_effect = [b"ab", EOFError("connection lost")]
+        second.open.return_value.read.side_effect = [b"cd", b""]
+        self.mock_ssh.open_sftp.side_effect = [first, second]
+        self.client.prefetch = False
+
+        chunks = list(self.client.iter_file_chunks("/1/20250514/OrderDetails.csv", chunk_size=2))
+
+        self.assertEqual(chunks, [b"ab", b"cd"])
+        second.open.return_value.seek.assert_called_once_with(2)
+        first.close.assert_called_once()
+        self.assertEqual(self.client._idle_sessions, [second])
+
+    @patch("tap_toast_sftp.client.time.sleep")
+    def test_stream_fails_after_max_retries(self, mock_sleep):
+        """Test that a stream failing on every attempt raises instead of ending early."""
+        self.mock_ssh.open_sftp.side_effect = None
+        session = make_session()
+        session.open.return_value.read.side_effect = socket.timeout("timed out")
+        self.mock_ssh.open_sftp.return_value = session
+        self.client.prefetch = False
+
+        with self.assertRaises(socket.timeout):
+            list(self.client.iter_file_chunks("/1/20250514/OrderDetails.csv"))
+        self.assertEqual(session.open.call_count, 5)
+
+    def test_session_from_before_reconnect_does_not_free_a_slot(self):
+        """Test that returning a session of a dropped connection keeps the pool within max_sessions."""
+        stale = self.client._checkout_session()
+        self.client.disconnect()
+        first = self.client._checkout_session()
+        second = self.client._checkout_session()
+
+        self.client._return_session(stale)
+
+        stale.close.assert_called_once()
+        self.assertEqual(self.client._session_count, 2)
+        self.assertEqual(self.client._idle_sessions, [])
+        self.client._return_session(first)
+        self.client._return_session(second)
+        self.assertEqual(self.client._session_count, 2)
+        self.assertEqual(self.client._idle_sessions, [first, second])
+
+    def test_reconnect_while_opening_a_session(self):
+        """Test that a session opened across a reconnect is replaced by one of the new connection."""
+        self.client.connect()
+        stale = self.client._checkout_session()
+        opened = []
+
+        def open_sftp():
+            opened.append(make_session())
+            if len(opened) == 1:
+                # Another thread resets the connection while this session is opened
+                self.client.disconnect()
+            return opened[-1]
+
+        self.mock_ssh.open_sftp.side_effect = open_sftp
+        session = self.client._checkout_session()
+
+        self.assertIs(session, opened[1])
+        opened[0].close.assert_called_once()
+        self.assertEqual(self.client._session_count, 1)
+        self.client._return_session(stale)
+        self.assertEqual(self.client._session_count, 1)
+        self.assertEqual(self.client._idle_sessions, [])
+
+    def test_prefetch_falls_back_to_public_api(self):
+        """Test that the public prefetch is used when paramiko's prefetch internals are missing."""
+        remote_file = MagicMock()
+        remote_file.stat.return_value.st_size = 100
+        del remote_file._prefetch_thread
+
+        stop = self.client._start_prefetch(remote_file, timeout=1)
+        stop()
+
+        remote_file.prefetch.assert_called_once_with(100, max_concurrent_requests=self.client.prefetch_max_requests)
+
+    def test_abandoned_stream_discards_session(self):
+        """Test that closing a stream early discards its session."""
+        self.mock_ssh.open_sftp.side_effect = None
+        session = make_session()
+        session.open.return_value.read.return_value = b"ab"
+        self.mock_ssh.open_sftp.return_value = session
+
+        chunks = self.client.iter_file_chunks("/1/20250514/OrderDetails.csv", chunk_size=2)
+        next(chunks)
+        chunks.close()
+
+        session.get_channel.return_value.close.assert_called_once()
+        session.close.assert_called_once()
+        self.assertEqual(self.client._idle_sessions, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
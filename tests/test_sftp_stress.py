@@ -0,0 +1,150 @@
+"""Stress tests for the shared SFTPClient against a local SFTP server."""
+
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from tap_toast_sftp.client import SFTPClient
+from tests.sftp_stub_server import PASSWORD, USERNAME, StubSFTPServer
+
+LOCATIONS = ["101", "102", "103"]
+FILES = ["OrderDetails.csv", "CheckDetails.csv", "MenuExportV2_1.json"]
+
+
+class TestSFTPClientStress(unittest.TestCase):
+    """Test cases hammering one shared client from many threads."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Serve a tree of location folders from a local SFTP server."""
+        cls.root = tempfile.mkdtemp()
+        cls.contents = {}
+        rng = random.Random(0)
+        for location_id in LOCATIONS:
+            folder = os.path.join(cls.root, location_id, "20250514")
+            os.makedirs(folder)
+            for name in FILES:
+                # Large enough for several pipelined read requests
+                content = rng.randbytes(rng.randint(100_000, 300_000))
+                with open(os.path.join(folder, name), "wb") as f:
+                    f.write(content)
+                cls.contents[f"/{location_id}/20250514/{name}"] = content
+        cls.server = StubSFTPServer(cls.root)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the server and remove the served files."""
+        cls.server.close()
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        """Connect a client with a small session pool and no listing cache."""
+        logging.disable(logging.CRITICAL)
+        # Let sessions of the previous test's client finish closing before counting
+        deadline = time.monotonic() + 5
+        while self.server.stats["active"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.server.stats["max_active"] = 0
+        self.client = SFTPClient({
+            "sftp_host": "127.0.0.1",
+            "sftp_port": self.server.port,
+            "sftp_username": USERNAME,
+            "sftp_password": PASSWORD,
+            "sftp_max_sessions": 4,
+            "listing_cache_ttl": 0,
+            "sftp_prefetch_request_size": 16384,
+        })
+        self.client.connect()
+        self.addCleanup(self.client.disconnect)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def run_threads(self, target, count):
+        """Run a function on several threads and return the errors they raised."""
+        errors = []
+
+        def run(index):
+            try:
+                target(index)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+        return errors
+
+    def test_many_threads_share_the_session_pool(self):
+        """Test that concurrent listings and downloads return correct results within max_sessions."""
+        paths = sorted(self.contents)
+
+        def work(index):
+            rng = random.Random(index)
+            for _ in range(15):
+                path = rng.choice(paths)
+                operation = rng.choice(["list", "attrs", "read", "stream"])
+                folder = path.rsplit("/", 1)[0]
+                if operation == "list":
+                    self.assertEqual(sorted(self.client.list_files(folder)), sorted(FILES))
+                elif operation == "attrs":
+                    sizes = {e.filename: e.st_size for e in self.client.list_dir_attrs(folder)}
+                    self.assertEqual(sizes[path.rsplit("/", 1)[1]], len(self.contents[path]))
+                elif operation == "read":
+                    self.assertEqual(self.client.get_file_content(path), self.contents[path])
+                else:
+                    chunks = self.client.iter_file_chunks(path, chunk_size=32768)
+                    self.assertEqual(b"".join(chunks), self.contents[path])
+
+        self.assertEqual(self.run_threads(work, 16), [])
+        self.assertLessEqual(self.server.stats["max_active"], 4)
+
+    def test_abandoned_streams_do_not_poison_the_pool(self):
+        """Test that closing downloads mid-file leaves the pool usable."""
+        paths = sorted(self.contents)
+        # The prefetch must be stopped before the channel is closed under it
+        thread_errors = []
+        patcher = patch("threading.excepthook", side_effect=thread_errors.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def work(index):
+            for path in paths:
+                chunks = self.client.iter_file_chunks(path, chunk_size=16384)
+                self.assertEqual(next(chunks), self.contents[path][:16384])
+                chunks.close()
+                self.assertEqual(self.client.get_file_content(path), self.contents[path])
+
+        self.assertEqual(self.run_threads(work, 8), [])
+        self.assertEqual(self.client.list_files(f"/{LOCATIONS[0]}"), ["20250514"])
+        self.assertEqual(thread_errors, [])
+
+    def test_concurrent_misses_download_once(self):
+        """Test that threads missing the same file share a single download."""
+        path = f"/{LOCATIONS[0]}/20250514/{FILES[0]}"
+        barrier = threading.Barrier(8, timeout=10)
+        results = []
+
+        def work(index):
+            barrier.wait()
+            results.append(self.client.get_cached_file_content(LOCATIONS[0], "20250514", path))
+
+        with patch.object(self.client, "get_file_content", wraps=self.client.get_file_content) as mock_get:
+            self.assertEqual(self.run_threads(work, 8), [])
+
+        self.assertEqual(results, [self.contents[path]] * 8)
+        mock_get.assert_called_once_with(path)
+        self.assertEqual(self.client.get_file_cache_stats()["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for sharding locations across tap processes."""
+
+import logging
+import unittest
+from unittest.mock import MagicMock, patch
+
+from singer_sdk.exceptions import ConfigValidationError
+from singer_sdk.singerlib import StateMessage
+
+from tap_toast_sftp.client import location_shard
+from tap_toast_sftp.streams.order_details import OrderDetailsStream
+from tap_toast_sftp.tap import TapToastSFTP
+
+LOCATIONS = [{"id": str(location_id)} for location_id in range(1000, 1200)]
+
+
+class TestLocationSharding(unittest.TestCase):
+    """Test cases for ToastSFTPStream.get_location_ids with shard settings."""
+
+    def make_stream(self, **config):
+        """Create a stream over 200 locations."""
+        mock_tap = MagicMock()
+        mock_tap.config = {"locations": LOCATIONS, **config}
+        return OrderDetailsStream(tap=mock_tap, shared_sftp_client=MagicMock())
+
+    def test_shards_split_every_location_once(self):
+        """Test that the shards are disjoint and together cover every location."""
+        shards = [self.make_stream(shard_index=i, shard_count=3).get_location_ids() for i in range(3)]
+
+        all_ids = [location_id for shard in shards for location_id in shard]
+        self.assertEqual(sorted(all_ids), sorted(location["id"] for location in LOCATIONS))
+        self.assertTrue(all(shards))
+
+    def test_shard_of_a_location_is_stable(self):
+        """Test that a location's shard depends only on its ID and the shard count."""
+        # md5("1000") starts with a9b7ba70783b617e9998dc4dd82eb3c5, an odd number
+        self.assertEqual(location_shard("1000", 2), 1)
+        stream = self.make_stream(shard_index=1, shard_count=2)
+        self.assertIn("1000", stream.get_location_ids())
+
+    def test_sharding_is_off_by_default(self):
+        """Test that every location is synced without shard settings."""
+        stream = self.make_stream()
+
+        self.assertEqual(stream.get_location_ids(), [location["id"] for location in LOCATIONS])
+
+    def test_shard_index_must_be_below_shard_count(self):
+        """Test that an out of range shard index is rejected."""
+        stream = self.make_stream(shard_index=3, shard_count=3)
+
+        with self.assertRaises(ConfigValidationError):
+            stream.get_location_ids()
+
+
+class TestShardState(unittest.TestCase):
+    """Test cases for the STATE written by a sharded tap."""
+
+    def setUp(self):
+        """Create a sharded tap whose streams emit no records."""
+        logging.disable(logging.CRITICAL)
+        patcher = patch("tap_toast_sftp.tap.SFTPClient")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Re-enable logging."""
+        logging.disable(logging.NOTSET)
+
+    def test_bookmarks_cover_only_the_shard(self):
+        """Test that each stream's bookmarks only hold the partitions of the shard's locations."""
+        config = {
+            "sftp_host": "sftp.toasttab.com",
+            "sftp_username": "test-username",
+            "sftp_password": "test-password",
+            "locations": LOCATIONS,
+            "shard_index": 1,
+            "shard_count": 4,
+        }
+        tap = TapToastSFTP(config=config, parse_env_config=False)
+        messages = []
+        tap.message_writer = MagicMock(write_message=messages.append)
+        for stream in tap.streams.values():
+            stream._get_records = MagicMock(return_value=iter(()))
+
+        tap.sync_all()
+
+        shard = [location["id"] for location in LOCATIONS if location_shard(location["id"], 4) == 1]
+        state = [m for m in messages if isinstance(m, StateMessage)][-1].value
+        for stream_name in tap.streams:
+            partitions = state["bookmarks"][stream_name]["partitions"]
+            self.assertEqual([p["context"]["location_id"] for p in partitions], shard, stream_name)
+
+
+if __name__ == "__main__":
+    unittest.main()